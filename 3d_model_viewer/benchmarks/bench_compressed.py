@@ -0,0 +1,89 @@
+"""
+Бенчмарк завантаження стиснених моделей (.gz/.bz2/.xz, .zst — якщо встановлено zstandard):
+розбір іде з потоку розпакування (utils/compressed.DecompressingReader), тож для кожного
+формату порівнюються розмір файлу, час розбору, окремо час лише розпакування
+і пік виділеної пам'яті (tracemalloc) відносно нестисненого файлу.
+
+Запуск (з теки 3d_model_viewer):
+    python -m benchmarks.bench_compressed --faces 1000000 --formats obj ply stl
+"""
+import argparse
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import grid_faces, cells_for_faces
+from utils.compressed import DecompressingReader, zstandard
+from utils.exporters import export_obj, export_ply, export_stl
+from utils.load_pipeline import load_mesh
+from utils.mesh import Mesh
+
+EXPORTERS = {".obj": export_obj, ".ply": export_ply, ".stl": export_stl}
+
+
+def compress(path, suffix):
+    """
+    Стискає файл поруч (path + suffix). Повертає шлях стисненого файлу.
+    """
+    target = path + suffix
+    if suffix == ".zst":
+        with open(path, "rb") as f, open(target, "wb") as out:
+            zstandard.ZstdCompressor().copy_stream(f, out)
+        return target
+    opener = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}[suffix]
+    with open(path, "rb") as f, opener(target, "wb") as out:
+        shutil.copyfileobj(f, out, 1 << 20)
+    return target
+
+
+def measure(action):
+    """
+    (секунди, пік виділеної пам'яті у МБ) одного виклику.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    action()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2 ** 20
+
+
+def decompress_only(path):
+    with DecompressingReader(path) as stream:
+        while stream.read(1 << 22):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Завантаження стиснених моделей")
+    parser.add_argument("--faces", type=int, default=1_000_000, help="Приблизна кількість граней")
+    parser.add_argument("--formats", nargs="+", default=["obj", "ply", "stl"], choices=["obj", "ply", "stl"])
+    args = parser.parse_args()
+    suffixes = [".gz", ".bz2", ".xz"] + ([".zst"] if zstandard is not None else [])
+
+    cells = cells_for_faces(args.faces, "tri")
+    mesh = Mesh(*grid_faces(cells, cells, "tri"))
+    print(f"{'файл':>12} {'МБ':>8} {'розбір, с':>10} {'розпак., с':>11} {'пік, МБ':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in args.formats:
+            path = os.path.join(tmp, f"model.{fmt}")
+            EXPORTERS["." + fmt](mesh, path)
+            seconds, peak = measure(lambda: load_mesh(path, workers=1))
+            print(f"{'.' + fmt:>12} {os.path.getsize(path) / 2 ** 20:>8.1f} {seconds:>10.3f} {'':>11} {peak:>9.1f}")
+            for suffix in suffixes:
+                packed = compress(path, suffix)
+                seconds, peak = measure(lambda: load_mesh(packed, workers=1))
+                unpack = measure(lambda: decompress_only(packed))[0]
+                print(f"{'.' + fmt + suffix:>12} {os.path.getsize(packed) / 2 ** 20:>8.1f} "
+                      f"{seconds:>10.3f} {unpack:>11.3f} {peak:>9.1f}")
+                os.remove(packed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Бенчмарк пам'яті моделі: старий кортеж (список кортежів, список списків)
+проти Mesh на масивах. Пам'ять рахується через tracemalloc
+(NumPy також реєструє свої буфери у tracemalloc).
+
+Запуск (з теки 3d_model_viewer):
+    python -m benchmarks.bench_memory --size 700
+"""
+import argparse
+import os
+import tempfile
+import tracemalloc
+import numpy as np
+
+from benchmarks.synthetic import grid_mesh
+from utils.model_loader import load_obj_with_texture, load_ply
+
+
+def write_obj(path, vertices, triangles):
+    """
+    Записує трикутну модель у OBJ (масивно, через np.savetxt).
+    """
+    with open(path, "w") as f:
+        np.savetxt(f, vertices, fmt="v %.6f %.6f %.6f")
+        np.savetxt(f, triangles + 1, fmt="f %d %d %d")
+
+
+def write_binary_ply(path, vertices, triangles):
+    """
+    Записує трикутну модель у binary_little_endian PLY.
+    """
+    records = np.empty(len(triangles), dtype=[("n", "u1"), ("i", "<i4", (3,))])
+    records["n"] = 3
+    records["i"] = triangles
+    with open(path, "wb") as f:
+        f.write((f"ply\nformat binary_little_endian 1.0\nelement vertex {len(vertices)}\n"
+                 "property float x\nproperty float y\nproperty float z\n"
+                 f"element face {len(triangles)}\nproperty list uchar int vertex_indices\nend_header\n").encode())
+        f.write(vertices.astype("<f4").tobytes())
+        f.write(records.tobytes())
+
+
+def measure(build):
+    """
+    Виконує build() і повертає (результат, утримана пам'ять, пікова пам'ять) у байтах.
+    """
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк пам'яті моделі")
+    parser.add_argument("--size", type=int, default=700, help="Розмір сітки (клітинок по стороні)")
+    args = parser.parse_args()
+
+    vertices, faces = grid_mesh(args.size, args.size, "tri")
+    triangles = np.array(faces, dtype=np.uint32)
+    raw = vertices.nbytes + triangles.nbytes
+    print(f"Вершин: {len(vertices)}, граней: {len(triangles)}, сирі буфери: {raw / 2**20:.1f} МБ")
+
+    vertex_list = vertices.tolist()
+    face_list = triangles.tolist()
+    _, legacy, _ = measure(lambda: ([tuple(v) for v in vertex_list], [list(f) for f in face_list]))
+    del vertex_list, face_list
+
+    with tempfile.TemporaryDirectory() as tmp:
+        obj_path = os.path.join(tmp, "mesh.obj")
+        ply_path = os.path.join(tmp, "mesh.ply")
+        write_obj(obj_path, vertices, triangles)
+        write_binary_ply(ply_path, vertices, triangles)
+
+        (obj_mesh, _), obj_current, obj_peak = measure(lambda: load_obj_with_texture(obj_path))
+        ply_mesh, ply_current, ply_peak = measure(lambda: load_ply(ply_path))
+
+        print(f"{'подання':<28} {'утримано, МБ':>13} {'пік, МБ':>9} {'x сирих':>8}")
+        print(f"{'списки (старе)':<28} {legacy / 2**20:>13.1f} {'-':>9} {legacy / raw:>8.2f}")
+        print(f"{'Mesh з OBJ':<28} {obj_current / 2**20:>13.1f} {obj_peak / 2**20:>9.1f} {obj_current / raw:>8.2f}")
+        # Вершини PLY відображені з файлу (memmap) і не рахуються як виділена пам'ять
+        print(f"{'Mesh з PLY (memmap)':<28} {ply_current / 2**20:>13.1f} {ply_peak / 2**20:>9.1f} {ply_current / raw:>8.2f}")
+        print(f"Mesh.nbytes (OBJ): {obj_mesh.nbytes / 2**20:.1f} МБ, (PLY): {ply_mesh.nbytes / 2**20:.1f} МБ")
+        del obj_mesh, ply_mesh
+
+
+if __name__ == "__main__":
+    main()
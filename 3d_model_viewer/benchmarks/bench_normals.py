@@ -0,0 +1,105 @@
+"""
+Бенчмарк обчислення нормалей: старий покомпонентний цикл prepare_arrays
+проти векторизованих smooth_render_arrays / flat_render_arrays (utils/normals.py).
+
+Запуск (з теки 3d_model_viewer):
+    python -m benchmarks.bench_normals --sizes 50 200 1000 --legacy-max 200
+"""
+import argparse
+import time
+import numpy as np
+
+from benchmarks.synthetic import grid_mesh
+from utils.normals import faces_to_csr, smooth_render_arrays, flat_render_arrays
+
+
+def legacy_normals(vertices, faces):
+    """
+    Копія старого циклу з SimpleGLWidget.prepare_arrays (гладкі + плоскі нормалі).
+    """
+    vertex_normals_list = [np.zeros(3, dtype=np.float32) for _ in vertices]
+    for f in faces:
+        verts = [np.array(vertices[i]) for i in f]
+        if len(verts) < 3: continue
+        v1 = verts[1] - verts[0]
+        v2 = verts[2] - verts[0]
+        n = np.cross(v1, v2)
+        n = n / (np.linalg.norm(n) if np.linalg.norm(n) > 0 else 1)
+        for idx in f:
+            vertex_normals_list[idx] += n
+    vertex_normals_list = [n / (np.linalg.norm(n) if np.linalg.norm(n) > 0 else 1) for n in vertex_normals_list]
+    normal_array = np.array(vertex_normals_list, dtype=np.float32)
+
+    flat_tri_vertices = []
+    flat_tri_normals = []
+    flat_quad_vertices = []
+    flat_quad_normals = []
+    for f in faces:
+        verts = [np.array(vertices[i]) for i in f]
+        if len(f) == 3 or len(f) == 4:
+            v1 = verts[1] - verts[0]
+            v2 = verts[2] - verts[0]
+            n = np.cross(v1, v2)
+            n = n / (np.linalg.norm(n) if np.linalg.norm(n) > 0 else 1)
+            target_v, target_n = (flat_tri_vertices, flat_tri_normals) if len(f) == 3 else (flat_quad_vertices, flat_quad_normals)
+            for i in range(len(f)):
+                target_v.append(vertices[f[i]])
+                target_n.append(n)
+        elif len(f) > 4:
+            for i in range(1, len(f)-1):
+                tri = [f[0], f[i], f[i+1]]
+                tri_verts = [np.array(vertices[idx]) for idx in tri]
+                v1 = tri_verts[1] - tri_verts[0]
+                v2 = tri_verts[2] - tri_verts[0]
+                n = np.cross(v1, v2)
+                n = n / (np.linalg.norm(n) if np.linalg.norm(n) > 0 else 1)
+                for idx in tri:
+                    flat_tri_vertices.append(vertices[idx])
+                    flat_tri_normals.append(n)
+    return normal_array, np.array(flat_tri_normals, dtype=np.float32), np.array(flat_quad_normals, dtype=np.float32)
+
+
+def vectorized_normals(vertices, faces, weighting):
+    """
+    Новий шлях, як у рендері: CSR + гладкі нормалі з єдиним потоком трикутників
+    і плоскі потоки (utils/normals.py).
+    """
+    offsets, indices = faces_to_csr(faces)
+    smooth = smooth_render_arrays(vertices, offsets, indices, weighting)
+    flat = flat_render_arrays(vertices, offsets, indices)
+    return smooth["vertex_normals"], flat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк обчислення нормалей")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000],
+                        help="Розмір сітки (клітинок по стороні)")
+    parser.add_argument("--kind", default="mixed", choices=["tri", "quad", "ngon", "mixed"])
+    parser.add_argument("--legacy-max", type=int, default=200,
+                        help="Найбільший розмір, для якого запускати старий цикл")
+    args = parser.parse_args()
+
+    print(f"{'сітка':>8} {'граней':>10} {'старий, с':>11} {'новий, с':>10} {'прискорення':>12}")
+    for size in args.sizes:
+        vertices, faces = grid_mesh(size, size, args.kind)
+        vertex_list = [tuple(v) for v in vertices.tolist()]
+
+        start = time.perf_counter()
+        new_normals, _ = vectorized_normals(vertices, faces, "uniform")
+        new_time = time.perf_counter() - start
+
+        if size <= args.legacy_max:
+            start = time.perf_counter()
+            old_normals, _, _ = legacy_normals(vertex_list, faces)
+            old_time = time.perf_counter() - start
+            # "uniform" відтворює старе зважування; для трикутників результати збігаються,
+            # для неплоских квадів/n-кутників старий цикл брав лише перші три вершини
+            if args.kind == "tri":
+                assert np.allclose(old_normals, new_normals, atol=1e-5)
+            print(f"{size:>8} {len(faces):>10} {old_time:>11.3f} {new_time:>10.3f} {old_time / new_time:>11.1f}x")
+        else:
+            print(f"{size:>8} {len(faces):>10} {'-':>11} {new_time:>10.3f} {'-':>12}")
+
+
+if __name__ == "__main__":
+    main()
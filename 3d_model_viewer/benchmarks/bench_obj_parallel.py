@@ -0,0 +1,82 @@
+"""
+Бенчмарк масштабування розбору OBJ за кількістю процесів: файл ділиться на діапазони
+байтів, які розбираються пулом процесів (utils/obj_parser.parse_obj_parallel).
+Для кожної кількості процесів — час, прискорення відносно одного процесу, ефективність
+і пропускна здатність; результат звіряється з послідовним розбором.
+
+Запуск (з теки 3d_model_viewer):
+    python -m benchmarks.bench_obj_parallel --faces 4000000 --workers 1 2 4 8
+    python -m benchmarks.bench_obj_parallel --path scan.obj
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+
+from benchmarks.synthetic import grid_faces, cells_for_faces, write_obj_faces
+from utils.obj_parser import parse_obj
+
+# Повторів для кожної кількості процесів (береться найкращий час)
+REPEATS = 2
+
+
+def default_workers():
+    """
+    1, 2, 4, ... до кількості ядер (і сама кількість ядер).
+    """
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 < cores:
+        counts.append(counts[-1] * 2)
+    if cores > 1:
+        counts.append(cores)
+    return counts
+
+
+def same_result(a, b):
+    return all(np.array_equal(a[key], b[key]) if a[key] is not None else b[key] is None
+               for key in ("positions", "texcoords", "normals", "face_offsets", "face_indices",
+                           "face_texcoords", "face_normals"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Масштабування паралельного розбору OBJ")
+    parser.add_argument("--path", help="Готовий OBJ-файл (інакше генерується синтетична сітка)")
+    parser.add_argument("--faces", type=int, default=2_000_000, help="Граней синтетичної сітки")
+    parser.add_argument("--kind", default="tri", choices=["tri", "quad", "ngon"])
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers(),
+                        help="Кількості процесів для виміру")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.path
+        if path is None:
+            path = os.path.join(tmp, f"{args.kind}_{args.faces}.obj")
+            cells = cells_for_faces(args.faces, args.kind)
+            write_obj_faces(path, *grid_faces(cells, cells, args.kind))
+        size_mb = os.path.getsize(path) / 2 ** 20
+        print(f"Файл: {path} ({size_mb:.1f} МБ), ядер: {os.cpu_count()}")
+        print(f"{'процесів':>9} {'час, с':>8} {'прискорення':>12} {'ефективність':>13} {'МБ/с':>8}")
+
+        reference = None
+        base_time = None
+        for workers in args.workers:
+            times = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                result = parse_obj(path, workers=workers)
+                times.append(time.perf_counter() - start)
+            seconds = min(times)
+            if reference is None:
+                reference, base_time = result, seconds
+            elif not same_result(reference, result):
+                raise SystemExit(f"Результат з {workers} процесами відрізняється від першого виміру")
+            speedup = base_time / seconds
+            print(f"{workers:>9} {seconds:>8.3f} {speedup:>11.2f}x {speedup / workers * 100:>12.0f}% "
+                  f"{size_mb / seconds:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
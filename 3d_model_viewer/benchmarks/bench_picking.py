@@ -0,0 +1,66 @@
+"""
+Бенчмарк вибору точки променем: час побудови BVH і затримка одного запиту
+(медіана та 95-й перцентиль) для моделей ~1M і ~10M трикутників,
+а також порівняння з повним перебором усіх трикутників.
+
+Запуск (з теки 3d_model_viewer):
+    python -m benchmarks.bench_picking --sizes 708 2237 --rays 200
+"""
+import argparse
+import time
+import numpy as np
+
+from benchmarks.synthetic import grid_triangles
+from utils.bvh import TriangleBVH, ray_triangles
+from utils.index_optimizer import morton_order
+
+# Повний перебір — лише для моделей до цієї кількості трикутників
+BRUTE_FORCE_LIMIT = 2_000_000
+
+
+def _rays(rng, count):
+    """
+    Промені згори вниз на хвилясту сітку [-1, 1]^2.
+    """
+    origins = np.column_stack([rng.uniform(-0.95, 0.95, (count, 2)), np.ones(count)])
+    directions = np.column_stack([rng.normal(0, 0.05, (count, 2)), -np.ones(count)])
+    return origins, directions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк вибору точки променем (BVH)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[708, 2237],
+                        help="Розміри сітки (клітинок по стороні, 2 трикутники на клітинку)")
+    parser.add_argument("--rays", type=int, default=200, help="Кількість променів")
+    args = parser.parse_args()
+
+    print(f"{'трикутників':>12} {'BVH, с':>7} {'медіана, мс':>12} {'p95, мс':>8} {'перебір, мс':>12}")
+    rng = np.random.default_rng(0)
+    for size in args.sizes:
+        vertices, triangles = grid_triangles(size, size)
+        triangles = triangles[morton_order(vertices, triangles)]
+        start = time.perf_counter()
+        bvh = TriangleBVH(vertices, triangles.ravel())
+        build = time.perf_counter() - start
+
+        origins, directions = _rays(rng, args.rays)
+        latencies = []
+        for origin, direction in zip(origins, directions):
+            start = time.perf_counter()
+            bvh.intersect(origin, direction)
+            latencies.append(time.perf_counter() - start)
+        latencies = np.array(latencies) * 1000
+
+        brute = "-"
+        if len(triangles) <= BRUTE_FORCE_LIMIT:
+            v0, v1, v2 = (vertices[triangles[:, k]].astype(np.float64) for k in range(3))
+            start = time.perf_counter()
+            for origin, direction in zip(origins[:5], directions[:5]):
+                ray_triangles(origin, direction, v0, v1, v2)
+            brute = f"{(time.perf_counter() - start) / 5 * 1000:.1f}"
+        print(f"{len(triangles):>12} {build:>7.2f} {np.median(latencies):>12.2f} "
+              f"{np.percentile(latencies, 95):>8.2f} {brute:>12}")
+
+
+if __name__ == "__main__":
+    main()
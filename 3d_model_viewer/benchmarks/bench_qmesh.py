@@ -0,0 +1,80 @@
+"""
+Бенчмарк компактного контейнера .qmesh проти OBJ і binary PLY: розмір файлу,
+час завантаження (розбір/розпакування) і похибка квантування; для .qmesh —
+розпакування в один потік і паралельно, а також обсяг вершинних буферів GPU.
+
+Запуск (з теки 3d_model_viewer):
+    python -m benchmarks.bench_qmesh --faces 100000 1000000 --kinds tri quad
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+
+from benchmarks.synthetic import grid_faces, cells_for_faces
+from utils.exporters import export_obj, export_ply, export_qmesh
+from utils.load_pipeline import load_mesh, optimize_mesh, prepare_render_arrays
+from utils.model_loader import load_qmesh
+from utils.mesh import Mesh
+
+# Повторів завантаження (береться найкращий час)
+REPEATS = 3
+
+
+def best_time(action, repeats=REPEATS):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        action()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк контейнера .qmesh")
+    parser.add_argument("--faces", type=int, nargs="+", default=[100_000, 1_000_000],
+                        help="Приблизна кількість граней")
+    parser.add_argument("--kinds", nargs="+", default=["tri", "quad"], choices=["tri", "quad", "ngon"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Потоків розпакування для паралельного виміру")
+    args = parser.parse_args()
+
+    print(f"{'тип':>6} {'граней':>10} {'формат':>12} {'МБ':>8} {'стиснення':>10} {'завант., с':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in args.kinds:
+            for faces in args.faces:
+                cells = cells_for_faces(faces, kind)
+                mesh, _ = optimize_mesh(Mesh(*grid_faces(cells, cells, kind)))
+                arrays = prepare_render_arrays(mesh)
+                paths = {name: os.path.join(tmp, f"{kind}_{faces}{ext}")
+                         for name, ext in (("obj", ".obj"), ("ply_binary", ".ply"), ("qmesh", ".qmesh"))}
+                export_obj(mesh, paths["obj"])
+                export_ply(mesh, paths["ply_binary"])
+                export_qmesh(mesh, paths["qmesh"], normals=arrays["vertex_normals"],
+                             triangles=arrays["indices"], triangle_faces=arrays["triangle_faces"])
+                obj_size = os.path.getsize(paths["obj"])
+                rows = [(name, os.path.getsize(path), best_time(lambda: load_mesh(path)))
+                        for name, path in paths.items() if name != "qmesh"]
+                qmesh_size = os.path.getsize(paths["qmesh"])
+                rows.append(("qmesh x1", qmesh_size, best_time(lambda: load_qmesh(paths["qmesh"], workers=1))))
+                if args.workers > 1:
+                    rows.append((f"qmesh x{args.workers}", qmesh_size,
+                                 best_time(lambda: load_qmesh(paths["qmesh"], workers=args.workers))))
+                for name, size, seconds in rows:
+                    print(f"{kind:>6} {mesh.face_count:>10} {name:>12} {size / 2 ** 20:>8.2f} "
+                          f"{obj_size / size:>9.1f}x {seconds:>11.3f}")
+
+                loaded, loaded_arrays = load_qmesh(paths["qmesh"])
+                extent = float((mesh.positions.max(axis=0) - mesh.positions.min(axis=0)).max())
+                position_error = float(np.abs(loaded.positions - mesh.positions).max()) / extent
+                cosines = np.einsum("ij,ij->i", loaded_arrays["vertex_normals"], arrays["vertex_normals"])
+                normal_error = float(np.degrees(np.arccos(np.clip(cosines, -1.0, 1.0))).max())
+                float_bytes = mesh.positions.nbytes + arrays["vertex_normals"].nbytes
+                quantized_bytes = loaded_arrays["quantized_positions"].nbytes + loaded_arrays["quantized_normals"].nbytes
+                print(f"{'':>6} похибка позицій {position_error:.2e} від розміру, нормалей {normal_error:.3f}°; "
+                      f"вершинні буфери GPU {float_bytes / 2 ** 20:.1f} -> {quantized_bytes / 2 ** 20:.1f} МБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Відтворюваний набір бенчмарків конвеєра: синтетичні моделі різного масштабу
+(трикутники, чотирикутники, n-кутники; OBJ, ASCII та binary PLY, binary STL, .qmesh), час кожного етапу
+(розбір, оптимізація, prepare_render_arrays, експорт, рендер без вікна) і пікова RSS.
+Кожен випадок виконується в окремому процесі, щоб пікова пам'ять не змішувалась.
+Результати пишуться у JSON і порівнюються зі збереженою базою.
+
+Запуск (з теки 3d_model_viewer):
+    python -m benchmarks.bench_suite --faces 10000 100000 1000000 --output results.json
+    python -m benchmarks.bench_suite --faces 10000000 --kinds tri --formats ply_binary
+    python -m benchmarks.bench_suite --baseline baseline.json --output results.json
+"""
+# Рендер без вікна: платформа PyOpenGL має бути обрана до першого імпорту OpenGL
+import widgets.offscreen  # noqa: F401
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import numpy as np
+
+from benchmarks.synthetic import grid_faces, cells_for_faces, write_obj_faces, write_ply_faces
+from utils.load_pipeline import load_mesh, optimize_mesh, prepare_render_arrays
+from utils.mesh import Mesh
+
+try:
+    import resource
+except ImportError:           # Windows: пікова RSS недоступна
+    resource = None
+
+FORMATS = {"obj": ".obj", "ply_ascii": ".ply", "ply_binary": ".ply", "stl_binary": ".stl", "qmesh": ".qmesh"}
+STAGES = ("load", "optimize", "prepare", "export_obj", "export_ply", "upload", "render")
+# Кадрів для медіани часу рендера
+RENDER_FRAMES = 5
+# Регресія — якщо етап повільніший за базу більш ніж на частку tolerance і на стільки секунд
+MIN_REGRESSION_SECONDS = 0.01
+
+
+def peak_rss_mb():
+    """
+    Пікова резидентна пам'ять процесу (МБ) або None.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux — КБ, macOS — байти
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 1024), 1)
+
+
+def model_path(data_dir, kind, faces, fmt):
+    """
+    Синтетична модель на диску (генерується один раз і перевикористовується).
+    """
+    name = f"{kind}_{faces}_{fmt}{FORMATS[fmt]}"
+    path = os.path.join(data_dir, name)
+    if not os.path.exists(path):
+        cells = cells_for_faces(faces, kind)
+        vertices, offsets, indices = grid_faces(cells, cells, kind)
+        tmp = path + ".tmp"
+        if fmt == "obj":
+            write_obj_faces(tmp, vertices, offsets, indices)
+        elif fmt == "stl_binary":
+            from utils.exporters import export_stl
+            export_stl(Mesh(vertices, offsets, indices), tmp)
+        elif fmt == "qmesh":
+            from utils.exporters import export_qmesh
+            export_qmesh(Mesh(vertices, offsets, indices), tmp)
+        else:
+            write_ply_faces(tmp, vertices, offsets, indices, binary=fmt == "ply_binary")
+        os.replace(tmp, path)
+    return path
+
+
+def _exporters():
+    """
+    Поточні експортери моделі (OBJ, binary PLY).
+    """
+    from utils.exporters import export_obj, export_ply
+    return {
+        "export_obj": (".obj", export_obj),
+        "export_ply": (".ply", export_ply),
+    }
+
+
+def run_case(path, stages, render_size, software=False):
+    """
+    Виконує етапи для однієї моделі (в окремому процесі).
+    Повертає словник: час кожного етапу (с), пікова RSS після кожного етапу.
+    """
+    times, rss = {}, {}
+
+    def timed(stage, action):
+        start = time.perf_counter()
+        result = action()
+        times[stage] = round(time.perf_counter() - start, 4)
+        rss[stage] = peak_rss_mb()
+        return result
+
+    mesh = timed("load", lambda: load_mesh(path))
+    result = {"vertices": mesh.vertex_count, "faces": mesh.face_count}
+    if "optimize" in stages:
+        mesh, acmr = timed("optimize", lambda: optimize_mesh(mesh, measure_acmr=True))
+        result["acmr"] = [round(a, 3) for a in acmr]
+    arrays = timed("prepare", lambda: prepare_render_arrays(mesh))
+    with tempfile.TemporaryDirectory() as tmp:
+        for stage, (ext, export) in _exporters().items():
+            if stage in stages:
+                timed(stage, lambda: export(mesh, os.path.join(tmp, "export" + ext)))
+    if "upload" in stages or "render" in stages:
+        from widgets.offscreen import OffscreenRenderer, OffscreenError
+        from utils.software_rasterizer import SoftwareRenderer
+        try:
+            renderer = (SoftwareRenderer(render_size, render_size) if software
+                        else OffscreenRenderer(render_size, render_size))
+        except OffscreenError as e:
+            result["render_error"] = str(e)
+        else:
+            result["renderer"] = renderer.renderer_name
+            timed("upload", lambda: (renderer.set_model(mesh, arrays), renderer.render()))
+            if "render" in stages:
+                frames = []
+                for frame in range(RENDER_FRAMES):
+                    start = time.perf_counter()
+                    renderer.render(azimuth=45.0 + frame * 10)
+                    frames.append(time.perf_counter() - start)
+                times["render"] = round(float(np.median(frames)), 4)
+                rss["render"] = peak_rss_mb()
+            renderer.release()
+    result.update(times=times, peak_rss_mb=rss)
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """
+    Порівнює час етапів з базою. Повертає список регресій (рядки для друку).
+    """
+    base_cases = {case["case"]: case for case in baseline.get("cases", [])}
+    regressions = []
+    print(f"\n{'випадок':<28} {'етап':<11} {'база, с':>9} {'зараз, с':>9} {'x':>6}")
+    for case in results["cases"]:
+        base = base_cases.get(case["case"])
+        if base is None:
+            continue
+        for stage, seconds in case.get("times", {}).items():
+            before = base.get("times", {}).get(stage)
+            if before is None:
+                continue
+            ratio = seconds / before if before > 0 else float("inf")
+            mark = ""
+            if seconds > before * (1 + tolerance) and seconds - before > MIN_REGRESSION_SECONDS:
+                mark = "  <-- регресія"
+                regressions.append(f"{case['case']} {stage}: {before:.3f} -> {seconds:.3f} с")
+            print(f"{case['case']:<28} {stage:<11} {before:>9.3f} {seconds:>9.3f} {ratio:>6.2f}{mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Набір бенчмарків конвеєра завантаження та рендера")
+    parser.add_argument("--faces", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Кількість граней (до 10M)")
+    parser.add_argument("--kinds", nargs="+", default=["tri", "quad", "ngon"], choices=["tri", "quad", "ngon"])
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS), choices=list(FORMATS))
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=list(STAGES))
+    parser.add_argument("--render-size", type=int, default=512, help="Розмір кадру рендера без вікна")
+    parser.add_argument("--software", action="store_true", help="Програмний рендер на NumPy замість OpenGL")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "3d_model_viewer_bench"),
+                        help="Тека для синтетичних моделей (перевикористовуються між запусками)")
+    parser.add_argument("--output", help="JSON з результатами")
+    parser.add_argument("--baseline", help="JSON попереднього запуску для порівняння")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Допустиме уповільнення (частка)")
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = {
+        "meta": {"created": time.time(), "platform": platform.platform(), "python": platform.python_version(),
+                 "numpy": np.__version__, "cpus": os.cpu_count()},
+        "cases": [],
+    }
+    # Окремий процес на кожен випадок: чиста пікова RSS і відсутність взаємного кешування
+    context = multiprocessing.get_context("spawn")
+    print(f"{'випадок':<28} " + " ".join(f"{s:>10}" for s in STAGES) + f" {'RSS, МБ':>8}")
+    for faces in args.faces:
+        for kind in args.kinds:
+            for fmt in args.formats:
+                path = model_path(args.data_dir, kind, faces, fmt)
+                # Експорт не залежить від формату вхідного файлу — лише для першого формату
+                stages = [s for s in args.stages if not s.startswith("export") or fmt == args.formats[0]]
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    case = pool.submit(run_case, path, stages, args.render_size, args.software).result()
+                case.update(case=f"{kind}-{faces}-{fmt}", kind=kind, format=fmt, file_bytes=os.path.getsize(path))
+                results["cases"].append(case)
+                peak = max((v for v in case["peak_rss_mb"].values() if v is not None), default=None)
+                cells = " ".join(f"{case['times'][s]:>10.3f}" if s in case["times"] else f"{'-':>10}"
+                                 for s in STAGES)
+                print(f"{case['case']:<28} {cells} {peak if peak is not None else '-':>8}")
+                if "render_error" in case:
+                    print(f"    рендер пропущено: {case['render_error']}")
+
+    renderers = {case["renderer"] for case in results["cases"] if "renderer" in case}
+    results["meta"]["renderer"] = ", ".join(sorted(renderers)) or None
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+        print(f"\nРезультати: {args.output}")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nРегресії:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
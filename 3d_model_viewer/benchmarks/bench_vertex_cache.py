@@ -0,0 +1,41 @@
+"""
+Бенчмарк оптимізації порядку індексів під кеш вершин GPU:
+ACMR (промахи FIFO-кешу на трикутник) для порядку з файлу, випадкового порядку,
+Morton-порядку та Morton + Tipsify, а також час оптимізації.
+
+Запуск (з теки 3d_model_viewer):
+    python -m benchmarks.bench_vertex_cache --sizes 100 300 700 --kind mixed
+"""
+import argparse
+import time
+import numpy as np
+
+from benchmarks.synthetic import grid_mesh
+from utils.normals import faces_to_csr, fan_triangulate
+from utils.index_optimizer import VERTEX_CACHE_SIZE, acmr, morton_order, optimize_triangles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк оптимізації під кеш вершин")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 700], help="Розміри сітки (клітинок по стороні)")
+    parser.add_argument("--kind", default="mixed", choices=["tri", "quad", "ngon", "mixed"], help="Тип граней")
+    parser.add_argument("--cache", type=int, default=VERTEX_CACHE_SIZE, help="Розмір кешу вершин")
+    args = parser.parse_args()
+
+    print(f"{'трикутників':>12} {'файл':>7} {'випадк.':>8} {'Morton':>7} {'Tipsify':>8} {'час, с':>7}")
+    rng = np.random.default_rng(0)
+    for size in args.sizes:
+        vertices, faces = grid_mesh(size, size, args.kind)
+        offsets, indices = faces_to_csr(faces)
+        triangles, _ = fan_triangulate(offsets, indices)
+        shuffled = triangles[rng.permutation(len(triangles))]
+        morton = triangles[morton_order(vertices, triangles)]
+        start = time.perf_counter()
+        order = optimize_triangles(vertices, triangles, args.cache)
+        elapsed = time.perf_counter() - start
+        print(f"{len(triangles):>12} {acmr(triangles, args.cache):>7.3f} {acmr(shuffled, args.cache):>8.3f} "
+              f"{acmr(morton, args.cache):>7.3f} {acmr(triangles[order], args.cache):>8.3f} {elapsed:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
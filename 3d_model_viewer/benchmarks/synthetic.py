@@ -0,0 +1,124 @@
+import numpy as np
+
+
+def grid_mesh(cells_x, cells_y, kind="tri"):
+    """
+    Генерує хвилясту сітку cells_x * cells_y клітинок.
+    kind: "tri" — два трикутники на клітинку, "quad" — чотирикутник,
+    "ngon" — п'ятикутник (квад з додатковою вершиною в центрі ребра), "mixed" — усе разом.
+    Повертає (vertices (N, 3) float32, faces — список списків індексів).
+    """
+    xs, ys = np.meshgrid(np.linspace(-1, 1, cells_x + 1), np.linspace(-1, 1, cells_y + 1))
+    zs = 0.1 * np.sin(4 * xs) * np.cos(3 * ys)
+    vertices = np.stack([xs.ravel(), ys.ravel(), zs.ravel()], axis=1).astype(np.float32)
+    row = cells_x + 1
+    i, j = np.meshgrid(np.arange(cells_x), np.arange(cells_y))
+    a = (j * row + i).ravel()
+    b, c, d = a + 1, a + row + 1, a + row
+
+    kinds = np.full(len(a), {"tri": 0, "quad": 1, "ngon": 2, "mixed": -1}[kind])
+    if kind == "mixed":
+        kinds = np.arange(len(a)) % 3
+
+    # Додаткові вершини посередині ребра a-b для п'ятикутників
+    ngon = np.nonzero(kinds == 2)[0]
+    mids = ((vertices[a[ngon]] + vertices[b[ngon]]) / 2).astype(np.float32)
+    mid_ids = len(vertices) + np.arange(len(ngon))
+    vertices = np.concatenate([vertices, mids])
+    mid_of = dict(zip(ngon.tolist(), mid_ids.tolist()))
+
+    faces = []
+    for k, (fa, fb, fc, fd, kk) in enumerate(zip(a.tolist(), b.tolist(), c.tolist(), d.tolist(), kinds.tolist())):
+        if kk == 0:
+            faces.append([fa, fb, fc])
+            faces.append([fa, fc, fd])
+        elif kk == 1:
+            faces.append([fa, fb, fc, fd])
+        else:
+            faces.append([fa, mid_of[k], fb, fc, fd])
+    return vertices, faces
+
+
+def grid_triangles(cells_x, cells_y):
+    """
+    Та сама хвиляста сітка з двома трикутниками на клітинку, але одразу масивами
+    (для великих моделей, де список граней занадто дорогий).
+    Повертає (vertices (N, 3) float32, triangles (T, 3) uint32).
+    """
+    xs, ys = np.meshgrid(np.linspace(-1, 1, cells_x + 1, dtype=np.float32),
+                         np.linspace(-1, 1, cells_y + 1, dtype=np.float32))
+    zs = 0.1 * np.sin(4 * xs) * np.cos(3 * ys)
+    vertices = np.stack([xs.ravel(), ys.ravel(), zs.ravel()], axis=1).astype(np.float32)
+    row = cells_x + 1
+    i, j = np.meshgrid(np.arange(cells_x, dtype=np.uint32), np.arange(cells_y, dtype=np.uint32))
+    a = (j * row + i).ravel()
+    b, c, d = a + 1, a + row + 1, a + row
+    triangles = np.empty((2 * len(a), 3), dtype=np.uint32)
+    triangles[0::2] = np.stack([a, b, c], axis=1)
+    triangles[1::2] = np.stack([a, c, d], axis=1)
+    return vertices, triangles
+
+
+def grid_faces(cells_x, cells_y, kind="tri"):
+    """
+    Хвиляста сітка одразу у CSR-поданні (векторно, для моделей до десятків мільйонів граней).
+    kind: "tri" — два трикутники на клітинку, "quad" — чотирикутник, "ngon" — п'ятикутник
+    (з вершиною посередині ребра a-b). Повертає (vertices float32, offsets int64, indices uint32).
+    """
+    vertices, triangles = grid_triangles(cells_x, cells_y)
+    if kind == "tri":
+        sides, corners = 3, triangles
+    else:
+        a, c, d = triangles[1::2].T
+        b = triangles[0::2, 1]
+        if kind == "quad":
+            sides, corners = 4, np.stack([a, b, c, d], axis=1)
+        elif kind == "ngon":
+            mids = len(vertices) + np.arange(len(a), dtype=np.uint32)
+            vertices = np.concatenate([vertices, ((vertices[a] + vertices[b]) / 2).astype(np.float32)])
+            sides, corners = 5, np.stack([a, mids, b, c, d], axis=1)
+        else:
+            raise ValueError(f"Невідомий тип граней: {kind}")
+    offsets = np.arange(len(corners) + 1, dtype=np.int64) * sides
+    return vertices, offsets, np.ascontiguousarray(corners, dtype=np.uint32).ravel()
+
+
+def cells_for_faces(faces, kind="tri"):
+    """
+    Сторона квадратної сітки, що дає приблизно faces граней заданого типу.
+    """
+    per_cell = 2 if kind == "tri" else 1
+    return max(int(round(np.sqrt(faces / per_cell))), 1)
+
+
+def write_obj_faces(path, vertices, offsets, indices):
+    """
+    Записує модель з однаковою кількістю вершин у гранях (CSR) у OBJ.
+    """
+    sides = int(offsets[1] - offsets[0])
+    with open(path, "w") as f:
+        np.savetxt(f, vertices, fmt="v %.6f %.6f %.6f")
+        np.savetxt(f, indices.reshape(-1, sides).astype(np.int64) + 1, fmt="f" + " %d" * sides)
+
+
+def write_ply_faces(path, vertices, offsets, indices, binary=True):
+    """
+    Записує модель з однаковою кількістю вершин у гранях (CSR) у PLY:
+    binary_little_endian або ascii.
+    """
+    sides = int(offsets[1] - offsets[0])
+    corners = indices.reshape(-1, sides)
+    header = (f"ply\nformat {'binary_little_endian' if binary else 'ascii'} 1.0\n"
+              f"element vertex {len(vertices)}\nproperty float x\nproperty float y\nproperty float z\n"
+              f"element face {len(corners)}\nproperty list uchar int vertex_indices\nend_header\n")
+    with open(path, "wb") as f:
+        f.write(header.encode("ascii"))
+        if binary:
+            records = np.empty(len(corners), dtype=[("n", "u1"), ("i", "<i4", (sides,))])
+            records["n"] = sides
+            records["i"] = corners
+            f.write(vertices.astype("<f4").tobytes())
+            f.write(records.tobytes())
+        else:
+            np.savetxt(f, vertices, fmt="%.6f %.6f %.6f")
+            np.savetxt(f, corners, fmt=f"{sides}" + " %d" * sides)
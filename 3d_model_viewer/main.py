@@ -1,10 +1,12 @@
 import sys
 import os
+import multiprocessing
 from PyQt5.QtWidgets import QApplication, QMainWindow, QStackedWidget, QFileDialog
 from pages.home_page import HomePage
 from pages.viewer_3d_page import Viewer3DPage
 from pages.file_search_page import FileSearchPage
 from utils.last_path import load_last_path, save_last_path
+from utils.load_pipeline import MODEL_FILE_PATTERNS
 from ui.theme_manager import ThemeManager
 
 def resource_path(relative_path):
@@ -78,7 +80,7 @@ class MainWindow(QMainWindow):
         Відкриває діалог вибору файлу моделі. Після вибору — перемикає на вікно перегляду.
         """
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Виберіть 3D модель", "", "OBJ/PLY файли (*.obj *.ply)"
+            self, "Виберіть 3D модель", "", f"3D-моделі ({MODEL_FILE_PATTERNS})"
         )
         if file_path:
             self.viewer_page.set_obj_file(file_path)
@@ -103,6 +105,8 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == "__main__":
+    # Процеси паралельного розбору OBJ ("spawn") у збірці PyInstaller інакше запускали б копії застосунку
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     theme_manager = ThemeManager()
     theme_manager.apply_current_theme()  # тільки тут!
@@ -1,5 +1,6 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QFileDialog, QLabel
 from ui.constants import BUTTON_STYLE, LABEL_STYLE
+from utils.load_pipeline import MODEL_FILE_PATTERNS
 
 class FileSearchPage(QWidget):
     """
@@ -12,7 +13,7 @@ class FileSearchPage(QWidget):
         layout = QVBoxLayout()
 
         # Текстове пояснення
-        label = QLabel("Оберіть файл .obj або .ply для перегляду")
+        label = QLabel("Оберіть файл .obj, .ply або .stl для перегляду")
         label.setStyleSheet(LABEL_STYLE)
         layout.addWidget(label)
 
@@ -29,6 +30,6 @@ class FileSearchPage(QWidget):
         Відкриває файловий діалог та передає обраний файл у головне вікно для перегляду.
         """
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Виберіть файл", "", "OBJ/PLY Files (*.obj *.ply)")
+            self, "Виберіть файл", "", f"3D Models ({MODEL_FILE_PATTERNS})")
         if file_path:
             self.main_window.open_3d_viewer(file_path)
@@ -1,9 +1,17 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QFileDialog,
-    QSlider, QToolBar, QAction, QSizePolicy, QMessageBox, QColorDialog
+    QSlider, QToolBar, QAction, QSizePolicy, QMessageBox, QColorDialog, QProgressBar,
+    QInputDialog, QProgressDialog, QApplication
 )
 from PyQt5.QtCore import Qt, QSize, QTimer
+from PyQt5.QtGui import QImage
 from widgets.simple_gl_widget import SimpleGLWidget
+from widgets.model_load_worker import ExportWorker
+from utils.load_pipeline import LOAD_STAGES, STAGE_TITLES
+from utils.exporters import EXPORTERS
+from utils.hires import render_tiled, save_image, MAX_SUPERSAMPLE
+from utils.turntable import FrameEncoder, render_turntable, DEFAULT_FRAMES, DEFAULT_FPS
+from utils.transforms import orbit_matrices
 from ui.theme_manager import ThemeManager
 from ui.constants import LABEL_STYLE
 import os
@@ -11,6 +19,21 @@ import os
 BASEDIR = os.path.dirname(os.path.abspath(__file__))
 STYLE_DARK_PATH = os.path.join(BASEDIR, "ui", "styles_dark.qss")
 STYLE_LIGHT_PATH = os.path.join(BASEDIR, "ui", "styles_light.qss")
+# Роздільності знімка високої якості (ширина, висота)
+HIRES_PRESETS = {"4K (3840x2160)": (3840, 2160), "8K (7680x4320)": (7680, 4320),
+                 "16K (15360x8640)": (15360, 8640)}
+# Фільтри діалогу експорту: розширення за замовчуванням і параметри формату
+EXPORT_FILTERS = {
+    "OBJ файли (*.obj)": {"ext": ".obj"},
+    "PLY binary (*.ply)": {"ext": ".ply", "options": {"binary": True}},
+    "PLY ASCII (*.ply)": {"ext": ".ply", "options": {"binary": False}},
+    "STL binary (*.stl)": {"ext": ".stl", "options": {"binary": True}},
+    "STL ASCII (*.stl)": {"ext": ".stl", "options": {"binary": False}},
+    "Компактний QMESH (*.qmesh)": {"ext": ".qmesh"},
+}
+# Роздільності анімації оберту (парні — для відеокодеків)
+TURNTABLE_PRESETS = {"480p (854x480)": (854, 480), "720p (1280x720)": (1280, 720),
+                     "1080p (1920x1080)": (1920, 1080), "Квадрат (800x800)": (800, 800)}
 
 class Viewer3DPage(QWidget):
     """
@@ -24,6 +47,7 @@ class Viewer3DPage(QWidget):
         self.shadow_enabled = False                # (зарезервовано під тіні)
         self.auto_rotate_enabled = False           # Автоматичне обертання моделі
         self.current_view_mode = 0                 # Режим камери (0 - перспектива, 1 - top...)
+        self._export_worker = None                 # Фоновий експорт моделі
 
         # Таймер для автоповороту моделі
         self.rotate_timer = QTimer(self)
@@ -38,6 +62,14 @@ class Viewer3DPage(QWidget):
         screenshot_btn.triggered.connect(self.save_screenshot)
         toolbar.addAction(screenshot_btn)
 
+        hires_btn = QAction("🖼️ Знімок високої роздільності", self)
+        hires_btn.triggered.connect(self.save_hires_screenshot)
+        toolbar.addAction(hires_btn)
+
+        turntable_btn = QAction("🎞️ Анімація оберту", self)
+        turntable_btn.triggered.connect(self.export_turntable)
+        toolbar.addAction(turntable_btn)
+
         export_btn = QAction("💾 Експортувати як...", self)
         export_btn.triggered.connect(self.export_model_dialog)
         toolbar.addAction(export_btn)
@@ -73,9 +105,26 @@ class Viewer3DPage(QWidget):
         self.info_label.setStyleSheet(LABEL_STYLE)
         center_layout.addWidget(self.info_label)
 
+        # --- Прогрес фонового завантаження моделі ---
+        load_layout = QHBoxLayout()
+        self.load_progress_bar = QProgressBar()
+        self.load_progress_bar.setRange(0, 100)
+        load_layout.addWidget(self.load_progress_bar)
+        self.cancel_load_btn = QPushButton("✖ Скасувати")
+        self.cancel_load_btn.setObjectName("MainButton")
+        load_layout.addWidget(self.cancel_load_btn)
+        center_layout.addLayout(load_layout)
+        self.set_loading_visible(False)
+
         self.gl_widget = SimpleGLWidget(self.info_label)
         self.gl_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         center_layout.addWidget(self.gl_widget)
+        self.cancel_load_btn.clicked.connect(self.gl_widget.cancel_loading)
+        self.gl_widget.load_started.connect(self.on_load_started)
+        self.gl_widget.load_progress.connect(self.on_load_progress)
+        self.gl_widget.load_finished.connect(lambda _: self.set_loading_visible(False))
+        self.gl_widget.load_cancelled.connect(lambda _: self.set_loading_visible(False))
+        self.gl_widget.load_failed.connect(lambda *_: self.set_loading_visible(False))
 
         # --- Нижні кнопки (керування переглядом) ---
         bottom_controls = QHBoxLayout()
@@ -93,6 +142,13 @@ class Viewer3DPage(QWidget):
         self.wire_btn.clicked.connect(self.toggle_wireframe)
         bottom_controls.addWidget(self.wire_btn)
 
+        self.feature_btn = QPushButton("📐 Лише злами")
+        self.feature_btn.setObjectName("MainButton")
+        self.feature_btn.setCheckable(True)
+        self.feature_btn.setChecked(False)
+        self.feature_btn.clicked.connect(self.toggle_feature_edges)
+        bottom_controls.addWidget(self.feature_btn)
+
         self.smooth_btn = QPushButton("🟢 Гладке освітлення")
         self.smooth_btn.setObjectName("MainButton")
         self.smooth_btn.setCheckable(True)
@@ -172,15 +228,118 @@ class Viewer3DPage(QWidget):
         self.wire_btn.setChecked(self.gl_widget.wireframe)
         self.gl_widget.update()
 
+    def toggle_feature_edges(self):
+        """
+        Каркас: усі ребра або лише граничні ребра та ребра-злами.
+        """
+        self.gl_widget.set_feature_edges(not self.gl_widget.feature_edges_only)
+        self.feature_btn.setChecked(self.gl_widget.feature_edges_only)
+
     def save_screenshot(self):
         """
-        Зберігає знімок вікна з моделлю у PNG.
+        Зберігає знімок вікна з моделлю у PNG (без GL-контексту — програмним рендером).
         """
-        img = self.gl_widget.grabFramebuffer()
+        if self.gl_widget.isValid():
+            img = self.gl_widget.grabFramebuffer()
+        else:
+            pixels = self.gl_widget.software_snapshot()
+            height, width = pixels.shape[:2]
+            img = QImage(pixels.data, width, height, width * 4, QImage.Format_RGBA8888).copy()
         file, _ = QFileDialog.getSaveFileName(self, "Зберегти скріншот", "model.png", "PNG (*.png)")
         if file:
             img.save(file)
 
+    def save_hires_screenshot(self):
+        """
+        Знімок поточного вигляду у роздільності, більшій за вікно: рендер фрагментами
+        у FBO (з проекціями під-пірамід) і збереження у PNG/TIFF.
+        """
+        preset, ok = QInputDialog.getItem(self, "Знімок високої роздільності", "Роздільність:",
+                                          list(HIRES_PRESETS), 1, False)
+        if not ok:
+            return
+        supersample, ok = QInputDialog.getInt(self, "Знімок високої роздільності",
+                                              "Суперсемплінг (згладжування), разів:", 1, 1, MAX_SUPERSAMPLE)
+        if not ok:
+            return
+        file, _ = QFileDialog.getSaveFileName(self, "Зберегти знімок", "model.png",
+                                              "PNG (*.png);;TIFF (*.tif *.tiff)")
+        if not file:
+            return
+        width, height = HIRES_PRESETS[preset]
+        widget = self.gl_widget
+        matrices = orbit_matrices(widget.target, widget.distance, widget.azimuth, widget.elevation,
+                                  widget.model_rotation_y, width / height)
+        dialog = QProgressDialog("Рендер фрагментів...", "Скасувати", 0, 100, self)
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(0)
+
+        def progress(done, total):
+            dialog.setValue(int(done * 100 / total))
+            QApplication.processEvents()
+            return not dialog.wasCanceled()
+
+        try:
+            image = render_tiled(widget.render_view, matrices, width, height, supersample, progress=progress)
+            if image is not None:
+                dialog.setLabelText("Збереження...")
+                QApplication.processEvents()
+                save_image(file, image)
+        except Exception as e:
+            QMessageBox.critical(self, "Помилка", f"Не вдалося зберегти знімок:\n{e}")
+        finally:
+            dialog.close()
+
+    def export_turntable(self):
+        """
+        Анімація повного оберту моделі (GIF, MP4 або послідовність PNG): кадри рендеряться
+        у FBO, кодування йде паралельно в окремому потоці.
+        """
+        if self.gl_widget.model.is_empty():
+            QMessageBox.warning(self, "Анімація", "Модель не завантажена!")
+            return
+        preset, ok = QInputDialog.getItem(self, "Анімація оберту", "Роздільність:",
+                                          list(TURNTABLE_PRESETS), 1, False)
+        if not ok:
+            return
+        frames, ok = QInputDialog.getInt(self, "Анімація оберту", "Кадрів на оберт:", DEFAULT_FRAMES, 2, 3600)
+        if not ok:
+            return
+        file, _ = QFileDialog.getSaveFileName(self, "Зберегти анімацію", "turntable.gif",
+                                              "GIF (*.gif);;MP4 (*.mp4);;Послідовність PNG (*.png)")
+        if not file:
+            return
+        width, height = TURNTABLE_PRESETS[preset]
+        widget = self.gl_widget
+        try:
+            encoder = FrameEncoder(file, DEFAULT_FPS)
+        except Exception as e:
+            QMessageBox.critical(self, "Помилка", f"Не вдалося створити файл анімації:\n{e}")
+            return
+
+        def render_frame(angle):
+            model, view, projection = orbit_matrices(widget.target, widget.distance, widget.azimuth,
+                                                     widget.elevation, widget.model_rotation_y + angle,
+                                                     width / height)
+            return widget.render_view(model, view, projection, width, height)
+
+        dialog = QProgressDialog("Рендер кадрів...", "Скасувати", 0, frames, self)
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(0)
+
+        def progress(done, total):
+            dialog.setValue(done)
+            QApplication.processEvents()
+            return not dialog.wasCanceled()
+
+        try:
+            if render_turntable(render_frame, encoder, frames, progress=progress):
+                print(f"[DEBUG] Анімація оберту: {frames} кадрів -> {file}")
+        except Exception as e:
+            QMessageBox.critical(self, "Помилка", f"Не вдалося зберегти анімацію:\n{e}")
+        finally:
+            dialog.close()
+
     def set_light_angle(self, value, mode):
         """
         Встановлює кут освітлення (азимут або підйом).
@@ -193,10 +352,33 @@ class Viewer3DPage(QWidget):
 
     def set_obj_file(self, file_path):
         """
-        Завантажує модель для перегляду у OpenGL-віджет.
+        Завантажує модель для перегляду у OpenGL-віджет (у фоновому потоці).
         """
         self.gl_widget.load_model(file_path)
 
+    def set_loading_visible(self, visible):
+        """
+        Показує/ховає індикатор завантаження та кнопку скасування.
+        """
+        self.load_progress_bar.setVisible(visible)
+        self.cancel_load_btn.setVisible(visible)
+
+    def on_load_started(self, file_path):
+        """
+        Початок фонового завантаження моделі.
+        """
+        self.load_progress_bar.setValue(0)
+        self.load_progress_bar.setFormat(f"{os.path.basename(file_path)}: %p%")
+        self.set_loading_visible(True)
+
+    def on_load_progress(self, stage, fraction):
+        """
+        Оновлює індикатор: кожен етап займає рівну частку шкали.
+        """
+        index = LOAD_STAGES.index(stage)
+        self.load_progress_bar.setValue(int(100 * (index + fraction) / len(LOAD_STAGES)))
+        self.load_progress_bar.setFormat(f"{STAGE_TITLES[stage]}: %p%")
+
     def change_bg_color(self):
         """
         Відкриває діалог вибору кольору для фону 3D сцени.
@@ -208,56 +390,55 @@ class Viewer3DPage(QWidget):
 
     def export_model_dialog(self):
         """
-        Діалог експорту моделі у .obj або .ply (викликає відповідний метод).
+        Діалог експорту моделі у .obj, .ply, .stl (binary чи ASCII) або .qmesh; запис — у фоновому потоці.
         """
-        vertices, faces = self.gl_widget.model
-        if not vertices or not faces:
+        mesh = self.gl_widget.model
+        if mesh.is_empty():
             QMessageBox.warning(self, "Експорт", "Модель не завантажена!")
             return
+        if self._export_worker is not None:
+            QMessageBox.warning(self, "Експорт", "Попередній експорт ще триває.")
+            return
         file_path, selected_filter = QFileDialog.getSaveFileName(
-            self, "Експортувати модель", "model",
-            "OBJ файли (*.obj);;PLY файли (*.ply)"
+            self, "Експортувати модель", "model", ";;".join(EXPORT_FILTERS)
         )
         if not file_path:
             return
         ext = os.path.splitext(file_path)[1].lower()
-        try:
-            if ext == ".obj":
-                self.export_obj(vertices, faces, file_path)
-            elif ext == ".ply":
-                self.export_ply(vertices, faces, file_path)
-            else:
-                QMessageBox.warning(self, "Експорт", "Непідтримуваний формат!")
-                return
-            QMessageBox.information(self, "Експорт", "Експорт виконано успішно!")
-        except Exception as e:
-            QMessageBox.critical(self, "Експорт", f"Помилка експорту: {e}")
-
-    def export_obj(self, vertices, faces, file_path):
-        """
-        Експортує модель у формат OBJ.
-        """
-        with open(file_path, "w", encoding="utf-8") as f:
-            for v in vertices:
-                f.write(f"v {v[0]} {v[1]} {v[2]}\n")
-            for face in faces:
-                indices = [str(idx + 1) for idx in face]
-                f.write(f"f {' '.join(indices)}\n")
-
-    def export_ply(self, vertices, faces, file_path):
-        """
-        Експортує модель у формат PLY.
-        """
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write("ply\nformat ascii 1.0\n")
-            f.write(f"element vertex {len(vertices)}\n")
-            f.write("property float x\nproperty float y\nproperty float z\n")
-            f.write(f"element face {len(faces)}\n")
-            f.write("property list uchar int vertex_indices\nend_header\n")
-            for v in vertices:
-                f.write(f"{v[0]} {v[1]} {v[2]}\n")
-            for face in faces:
-                f.write(f"{len(face)} {' '.join(str(idx) for idx in face)}\n")
+        if not ext:
+            ext = EXPORT_FILTERS.get(selected_filter, {}).get("ext", "")
+            file_path += ext
+        if ext not in EXPORTERS:
+            QMessageBox.warning(self, "Експорт", "Непідтримуваний формат!")
+            return
+        options = dict(EXPORT_FILTERS.get(selected_filter, {}).get("options", {}))
+        if ext == ".ply":
+            options.update(normals=mesh.normals, colors=mesh.colors)
+        elif ext == ".obj":
+            options.update(normals=mesh.normals)
+        elif ext == ".qmesh":
+            # Гладкі нормалі й оптимізований потік трикутників — як у рендері
+            arrays = self.gl_widget.render_arrays()
+            options.update(normals=arrays["vertex_normals"], triangles=arrays["indices"],
+                           triangle_faces=arrays["triangle_faces"])
+
+        self._export_worker = ExportWorker(mesh, file_path, options, self)
+        dialog = QProgressDialog("Експорт моделі...", "Скасувати", 0, 100, self)
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(300)
+        dialog.canceled.connect(self._export_worker.cancel)
+        self._export_worker.progress.connect(lambda fraction: dialog.setValue(int(fraction * 100)))
+        self._export_worker.exported.connect(
+            lambda path: QMessageBox.information(self, "Експорт", "Експорт виконано успішно!"))
+        self._export_worker.failed.connect(
+            lambda path, error: QMessageBox.critical(self, "Експорт", f"Помилка експорту: {error}"))
+        self._export_worker.finished.connect(dialog.close)
+        self._export_worker.finished.connect(self.on_export_finished)
+        self._export_worker.start()
+
+    def on_export_finished(self):
+        self._export_worker.deleteLater()
+        self._export_worker = None
 
     def toggle_smooth_shading(self):
         """
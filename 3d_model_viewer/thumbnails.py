@@ -0,0 +1,184 @@
+"""
+Пакетні мініатюри моделей без GUI: рендер без вікна (те саме кадрування камери
+і освітлення, що у переглядачі) паралельно у пулі процесів. Без OpenGL
+(або з --software) мініатюри малює програмний рендер на NumPy.
+Результат — PNG і manifest.json у вихідній теці; моделі, у яких не змінилися
+ні вихідний файл, ні мініатюра, пропускаються.
+
+Запуск (з теки 3d_model_viewer):
+    python thumbnails.py models/ "assets/**/*.ply" -o thumbnails --size 256 --workers 4
+"""
+# Рендер без вікна: платформа PyOpenGL має бути обрана до першого імпорту OpenGL
+import widgets.offscreen  # noqa: F401
+
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+from utils.load_pipeline import is_model_file, load_mesh
+from utils.normals import smooth_render_arrays
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Рендерер одного процесу пулу (створюється initializer'ом)
+_renderer = None
+
+
+def find_models(inputs):
+    """
+    Файли моделей з тек (рекурсивно), glob-шаблонів і окремих шляхів; без дублікатів.
+    """
+    found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths = glob.glob(os.path.join(item, "**", "*"), recursive=True)
+        else:
+            paths = glob.glob(item, recursive=True) or [item]
+        found.extend(os.path.abspath(p) for p in paths
+                     if os.path.isfile(p) and is_model_file(p))
+    return sorted(set(found))
+
+
+def thumbnail_name(path):
+    """
+    Ім'я мініатюри: назва файлу + короткий хеш шляху (однакові назви з різних тек не конфліктують).
+    """
+    digest = hashlib.sha1(path.encode("utf-8")).hexdigest()[:8]
+    return f"{os.path.splitext(os.path.basename(path))[0]}_{digest}.png"
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "models": {}}
+
+
+def save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def is_up_to_date(entry, path, output_dir):
+    """
+    Мініатюра актуальна, якщо mtime вихідного файлу і самої мініатюри збігаються із записаними.
+    """
+    if not entry or "error" in entry:
+        return False
+    thumbnail = os.path.join(output_dir, entry["thumbnail"])
+    try:
+        return (os.stat(path).st_mtime_ns == entry["source_mtime_ns"]
+                and os.stat(thumbnail).st_mtime_ns == entry["thumbnail_mtime_ns"])
+    except (OSError, KeyError):
+        return False
+
+
+def _init_worker(size, background, software):
+    """
+    Один рендерер на процес: GL-контекст і шейдери створюються лише раз.
+    """
+    global _renderer
+    from widgets.offscreen import create_renderer
+    try:
+        _renderer = create_renderer(size, size, background=background, software=software)
+    except Exception as e:
+        # Помилка повідомляється для кожної моделі, а не ламає весь пул
+        _renderer = e
+
+
+def render_thumbnail(path, target, azimuth, elevation):
+    """
+    Рендер однієї моделі у PNG (у процесі пулу). Повертає запис для маніфесту.
+    """
+    from PIL import Image
+    if isinstance(_renderer, Exception):
+        raise _renderer
+    start = time.perf_counter()
+    source_mtime = os.stat(path).st_mtime_ns
+    # Паралельність — на рівні моделей, тож OBJ розбирається без власного пулу
+    mesh = load_mesh(path, workers=1)
+    if mesh.is_empty():
+        raise ValueError("Порожня модель")
+    # Для мініатюри досить гладких нормалей і трикутників (без оптимізації та кешу)
+    arrays = smooth_render_arrays(np.ascontiguousarray(mesh.positions), mesh.face_offsets, mesh.face_indices,
+                                  triangles=mesh.triangles)
+    _renderer.set_model(mesh, arrays)
+    image = _renderer.render(azimuth, elevation)
+    Image.fromarray(image, "RGBA").save(target)
+    return {
+        "thumbnail": os.path.basename(target),
+        "source_mtime_ns": source_mtime,
+        "thumbnail_mtime_ns": os.stat(target).st_mtime_ns,
+        "vertices": mesh.vertex_count,
+        "faces": mesh.face_count,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def _parse_color(text):
+    text = text.lstrip("#")
+    return tuple(int(text[i:i + 2], 16) / 255 for i in (0, 2, 4)) + (1.0,)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетні мініатюри 3D-моделей (без GUI)")
+    parser.add_argument("inputs", nargs="+", help="Теки, glob-шаблони або файли моделей")
+    parser.add_argument("-o", "--output", default="thumbnails", help="Тека для PNG і маніфесту")
+    parser.add_argument("--size", type=int, default=256, help="Розмір мініатюри, пікселів")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Кількість процесів")
+    parser.add_argument("--azimuth", type=float, default=45.0)
+    parser.add_argument("--elevation", type=float, default=20.0)
+    parser.add_argument("--background", default="edffed", help="Колір фону (hex RRGGBB)")
+    parser.add_argument("--force", action="store_true", help="Рендерити навіть незмінені моделі")
+    parser.add_argument("--software", action="store_true", help="Програмний рендер (без OpenGL)")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    manifest = load_manifest(args.output)
+    models = manifest["models"]
+    paths = find_models(args.inputs)
+    todo = [p for p in paths if args.force or not is_up_to_date(models.get(p), p, args.output)]
+    print(f"Моделей: {len(paths)}, до рендера: {len(todo)}, пропущено: {len(paths) - len(todo)}")
+    if not todo:
+        return
+
+    failed = 0
+    start = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(todo))), mp_context=context,
+                             initializer=_init_worker,
+                             initargs=(args.size, _parse_color(args.background), args.software)) as pool:
+        futures = {pool.submit(render_thumbnail, path, os.path.join(args.output, thumbnail_name(path)),
+                               args.azimuth, args.elevation): path for path in todo}
+        for done, future in enumerate(as_completed(futures), start=1):
+            path = futures[future]
+            try:
+                models[path] = future.result()
+                status = f"{models[path]['seconds']:.2f} с"
+            except Exception as e:
+                failed += 1
+                models[path] = {"thumbnail": thumbnail_name(path), "error": str(e)}
+                status = f"помилка: {e}"
+            print(f"[{done}/{len(todo)}] {path}: {status}")
+    save_manifest(args.output, manifest)
+    print(f"Готово за {time.perf_counter() - start:.1f} с, помилок: {failed}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import numpy as np
+
+# Трикутників у листі BVH (лист — послідовний діапазон потоку індексів)
+BVH_LEAF_TRIANGLES = 16
+# Скільки трикутників обробляється за раз при побудові меж листів
+_BUILD_BLOCK = 1 << 20
+
+
+def _level_sizes(leaf_count):
+    """
+    Кількість вузлів на кожному рівні неявного бінарного дерева, від листів до кореня.
+    """
+    sizes = [leaf_count]
+    while sizes[-1] > 1:
+        sizes.append((sizes[-1] + 1) // 2)
+    return sizes
+
+
+def build_bvh_bounds(positions, indices, leaf_size=BVH_LEAF_TRIANGLES):
+    """
+    AABB вузлів BVH над потоком індексів трикутників (T * 3).
+    Листи — послідовні групи по leaf_size трикутників (потік уже впорядкований
+    уздовж кривої Мортона, тож листи просторово компактні), батьківські вузли — пари
+    сусідніх вузлів (як у LBVH). Повертає масив (N, 2, 3) float32 — рівні від кореня до листів.
+    """
+    triangles = np.asarray(indices).reshape(-1, 3)
+    leaf_count = max((len(triangles) + leaf_size - 1) // leaf_size, 1)
+    leaves = np.empty((leaf_count, 2, 3), dtype=np.float32)
+    block = _BUILD_BLOCK - _BUILD_BLOCK % leaf_size
+    for start in range(0, len(triangles), block):
+        points = positions[triangles[start:start + block]]          # (B, 3, 3)
+        lo, hi = points.min(axis=1), points.max(axis=1)
+        starts = np.arange(0, len(points), leaf_size)
+        first = start // leaf_size
+        leaves[first:first + len(starts), 0] = np.minimum.reduceat(lo, starts)
+        leaves[first:first + len(starts), 1] = np.maximum.reduceat(hi, starts)
+    if len(triangles) == 0:
+        leaves[:] = 0
+    levels = [leaves]
+    while len(levels[-1]) > 1:
+        child = levels[-1]
+        pairs = len(child) // 2
+        parent = np.empty(((len(child) + 1) // 2, 2, 3), dtype=np.float32)
+        parent[:pairs, 0] = np.minimum(child[0:2 * pairs:2, 0], child[1:2 * pairs:2, 0])
+        parent[:pairs, 1] = np.maximum(child[0:2 * pairs:2, 1], child[1:2 * pairs:2, 1])
+        if len(child) % 2:
+            parent[-1] = child[-1]
+        levels.append(parent)
+    return np.concatenate(levels[::-1])
+
+
+def _ray_boxes(origin, inv_direction, bounds):
+    """
+    Slab-тест променя з AABB (bounds (K, 2, 3)). Повертає маску перетинів з t_far >= 0.
+    """
+    with np.errstate(invalid="ignore"):
+        t1 = (bounds[:, 0] - origin) * inv_direction
+        t2 = (bounds[:, 1] - origin) * inv_direction
+    t_near = np.nanmax(np.minimum(t1, t2), axis=1)
+    t_far = np.nanmin(np.maximum(t1, t2), axis=1)
+    return (t_near <= t_far) & (t_far >= 0)
+
+
+def ray_triangles(origin, direction, v0, v1, v2, epsilon=1e-12, tolerance=1e-7):
+    """
+    Векторизований тест Моллера-Трумбора для масивів вершин трикутників (K, 3).
+    tolerance — допуск для барицентричних координат, щоб промінь точно через
+    спільне ребро чи вершину не "провалювався" між трикутниками.
+    Повертає (t, u, v); для трикутників без перетину t = inf.
+    """
+    e1 = v1 - v0
+    e2 = v2 - v0
+    p = np.cross(direction, e2)
+    det = np.einsum("ij,ij->i", e1, p)
+    valid = np.abs(det) > epsilon
+    inv_det = np.where(valid, 1.0 / np.where(valid, det, 1.0), 0.0)
+    s = origin - v0
+    u = np.einsum("ij,ij->i", s, p) * inv_det
+    q = np.cross(s, e1)
+    v = (q @ direction) * inv_det
+    t = np.einsum("ij,ij->i", e2, q) * inv_det
+    hit = valid & (u >= -tolerance) & (v >= -tolerance) & (u + v <= 1 + tolerance) & (t > 0)
+    return np.where(hit, t, np.inf), u, v
+
+
+class TriangleBVH:
+    """
+    BVH над потоком індексів трикутників для пошуку перетину з променем.
+    Дерево неявне (вузли рівня зберігаються підряд), тож його можна кешувати як
+    один масив меж. Обхід векторизований по рівнях: на кожному рівні разом
+    перевіряються всі вузли, яких досягає промінь.
+    """
+
+    def __init__(self, positions, indices, node_bounds=None, leaf_size=BVH_LEAF_TRIANGLES):
+        self.positions = positions
+        self.triangles = np.asarray(indices).reshape(-1, 3)
+        self.leaf_size = leaf_size
+        if node_bounds is None:
+            node_bounds = build_bvh_bounds(positions, indices, leaf_size)
+        self.node_bounds = node_bounds
+        sizes = _level_sizes(max((len(self.triangles) + leaf_size - 1) // leaf_size, 1))[::-1]
+        self._level_offsets = np.concatenate(([0], np.cumsum(sizes)))
+
+    def intersect(self, origin, direction):
+        """
+        Найближчий перетин променя (у координатах моделі) з моделлю.
+        Повертає (номер трикутника у потоці індексів, t, (w0, w1, w2) — барицентричні
+        координати відносно вершин трикутника) або None.
+        """
+        origin = np.asarray(origin, dtype=np.float64)
+        direction = np.asarray(direction, dtype=np.float64)
+        if len(self.triangles) == 0:
+            return None
+        with np.errstate(divide="ignore"):
+            inv_direction = 1.0 / direction
+        offsets = self._level_offsets
+        frontier = np.zeros(1, dtype=np.int64)
+        for level in range(len(offsets) - 1):
+            bounds = self.node_bounds[offsets[level] + frontier]
+            frontier = frontier[_ray_boxes(origin, inv_direction, bounds)]
+            if len(frontier) == 0:
+                return None
+            if level + 1 < len(offsets) - 1:
+                size = offsets[level + 2] - offsets[level + 1]
+                children = np.stack([2 * frontier, 2 * frontier + 1], axis=1).ravel()
+                frontier = children[children < size]
+        # Листи, яких досяг промінь -> їхні трикутники
+        tri = (frontier[:, None] * self.leaf_size + np.arange(self.leaf_size)).ravel()
+        tri = tri[tri < len(self.triangles)]
+        corners = self.triangles[tri]
+        t, u, v = ray_triangles(origin, direction, self.positions[corners[:, 0]].astype(np.float64),
+                                self.positions[corners[:, 1]].astype(np.float64),
+                                self.positions[corners[:, 2]].astype(np.float64))
+        best = int(np.argmin(t))
+        if not np.isfinite(t[best]):
+            return None
+        weights = np.clip([1.0 - u[best] - v[best], u[best], v[best]], 0.0, 1.0)
+        return int(tri[best]), float(t[best]), tuple(float(w) for w in weights)
@@ -0,0 +1,204 @@
+import bz2
+import gzip
+import lzma
+import os
+import queue
+import threading
+
+# zstandard — необов'язкова залежність (лише для .zst)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Суфікси стиснених моделей -> кодек (a.obj.gz, a.ply.xz, ...)
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd"}
+# Розмір розпакованого фрагмента, який потік-розпаковувач передає розбору
+DECOMPRESS_CHUNK = 8 * 1024 * 1024
+# Фрагментів у черзі між розпаковуванням і розбором (пам'ять <= DECOMPRESS_QUEUE * DECOMPRESS_CHUNK)
+DECOMPRESS_QUEUE = 4
+
+# Кінець потоку в черзі фрагментів
+_END = None
+
+
+def split_compression(path):
+    """
+    Відокремлює суфікс стиснення: "a.obj.gz" -> ("a.obj", "gzip"), "a.obj" -> ("a.obj", None).
+    """
+    base, suffix = os.path.splitext(path)
+    codec = COMPRESSION_SUFFIXES.get(suffix.lower())
+    return (base, codec) if codec is not None else (path, None)
+
+
+def model_extension(path):
+    """
+    Розширення моделі без суфікса стиснення, у нижньому регістрі: "a.OBJ.gz" -> ".obj".
+    """
+    return os.path.splitext(split_compression(path)[0])[1].lower()
+
+
+def is_compressed(path):
+    return split_compression(path)[1] is not None
+
+
+def _decompressor(codec, raw):
+    """
+    Файловий об'єкт, що розпаковує raw потоково (без читання всього файлу).
+    """
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if codec == "bz2":
+        return bz2.BZ2File(raw, mode="rb")
+    if codec == "xz":
+        return lzma.LZMAFile(raw, mode="rb")
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("Для .zst потрібен пакет zstandard (pip install zstandard)")
+        return zstandard.ZstdDecompressor().stream_reader(raw, read_size=DECOMPRESS_CHUNK)
+    raise ValueError(f"Непідтримуваний тип стиснення: {codec}")
+
+
+class DecompressingReader:
+    """
+    Бінарний потік розпакованих даних стисненого файлу (read/readline/peek/tell).
+    Розпаковування йде в окремому потоці фрагментами по chunk_size байтів
+    і перекривається з розбором; черга обмежена max_chunks фрагментами,
+    тож пам'ять не залежить від розміру розпакованого файлу.
+    """
+
+    def __init__(self, path, chunk_size=DECOMPRESS_CHUNK, max_chunks=DECOMPRESS_QUEUE):
+        codec = split_compression(path)[1]
+        if codec is None:
+            raise ValueError(f"Файл не стиснений: {path}")
+        self.path = path
+        self._chunk_size = chunk_size
+        self._raw = open(path, "rb")
+        self._size = max(os.fstat(self._raw.fileno()).st_size, 1)
+        try:
+            self._source = _decompressor(codec, self._raw)
+        except Exception:
+            self._raw.close()
+            raise
+        self._chunks = queue.Queue(max_chunks)
+        self._stop = threading.Event()
+        self._pending = b""     # Поточний фрагмент і позиція читання в ньому
+        self._offset = 0
+        self._position = 0      # Розпакованих байтів віддано читачу
+        self._raw_position = 0  # Стиснених байтів прочитано для відданих фрагментів
+        self._eof = False
+        self._thread = threading.Thread(target=self._produce, name="decompress", daemon=True)
+        self._thread.start()
+
+    def _produce(self):
+        """
+        Потік-розпаковувач: фрагменти (bytes, позиція у стисненому файлі) у чергу, потім _END.
+        Помилка розпакування передається читачу через чергу.
+        """
+        try:
+            while not self._stop.is_set():
+                chunk = self._source.read(self._chunk_size)
+                if not chunk:
+                    break
+                if not self._put((chunk, self._raw.tell())):
+                    return
+        except Exception as e:
+            self._put(e)
+            return
+        self._put(_END)
+
+    def _put(self, item):
+        # Періодично перевіряємо, чи читача не закрито, щоб потік не завис на повній черзі
+        while not self._stop.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _next_chunk(self):
+        """
+        Бере наступний фрагмент з черги. False — кінець даних.
+        """
+        if self._eof:
+            return False
+        item = self._chunks.get()
+        if item is _END:
+            self._eof = True
+            return False
+        if isinstance(item, Exception):
+            self._eof = True
+            raise ValueError(f"Помилка розпакування {os.path.basename(self.path)}: {item}") from item
+        self._pending, self._raw_position = item
+        self._offset = 0
+        return True
+
+    def read(self, size=-1):
+        """
+        Рівно size байтів (менше — лише в кінці даних); size < 0 — усе, що лишилось.
+        """
+        parts = []
+        need = size
+        while size < 0 or need > 0:
+            available = len(self._pending) - self._offset
+            if available == 0:
+                if not self._next_chunk():
+                    break
+                continue
+            take = available if size < 0 else min(need, available)
+            parts.append(self._pending[self._offset:self._offset + take])
+            self._offset += take
+            need -= take
+        data = b"".join(parts)
+        self._position += len(data)
+        return data
+
+    def readline(self):
+        parts = []
+        while True:
+            if self._offset == len(self._pending) and not self._next_chunk():
+                break
+            end = self._pending.find(b"\n", self._offset)
+            stop = len(self._pending) if end < 0 else end + 1
+            parts.append(self._pending[self._offset:stop])
+            self._offset = stop
+            if end >= 0:
+                break
+        line = b"".join(parts)
+        self._position += len(line)
+        return line
+
+    def peek(self, size):
+        """
+        До size наступних байтів без їх споживання.
+        """
+        while len(self._pending) - self._offset < size:
+            rest = self._pending[self._offset:]
+            if not self._next_chunk():
+                self._pending, self._offset = rest, 0
+                break
+            self._pending = rest + self._pending
+        return self._pending[self._offset:self._offset + size]
+
+    def tell(self):
+        return self._position
+
+    def fraction(self):
+        """
+        Частка стисненого файлу, розпакована для вже відданих даних (для прогресу).
+        """
+        return min(self._raw_position / self._size, 1.0)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self._source.close()
+        self._raw.close()
+        self._pending = b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
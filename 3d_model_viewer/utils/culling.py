@@ -0,0 +1,62 @@
+import numpy as np
+
+# Розмір фрагмента (chunk) потоку індексів у трикутниках: послідовні Morton-діапазони
+CHUNK_TRIANGLES = 8192
+
+
+def chunk_offsets(triangle_count, chunk_size=CHUNK_TRIANGLES):
+    """
+    Межі фрагментів у трикутниках: фрагмент i — трикутники offsets[i]:offsets[i + 1].
+    """
+    offsets = np.arange(0, triangle_count, chunk_size, dtype=np.int64)
+    return np.append(offsets, np.int64(triangle_count))
+
+
+def chunk_bounds(positions, indices, chunk_size=CHUNK_TRIANGLES):
+    """
+    AABB кожного фрагмента потоку індексів: масив (C, 2, 3) float32 — [min, max].
+    Рахується по фрагментах, щоб не збирати позиції всіх трикутників одразу.
+    """
+    triangles = np.asarray(indices).reshape(-1, 3)
+    offsets = chunk_offsets(len(triangles), chunk_size)
+    bounds = np.empty((len(offsets) - 1, 2, 3), dtype=np.float32)
+    for chunk in range(len(offsets) - 1):
+        points = positions[triangles[offsets[chunk]:offsets[chunk + 1]].ravel()]
+        bounds[chunk, 0] = points.min(axis=0)
+        bounds[chunk, 1] = points.max(axis=0)
+    return bounds
+
+
+def frustum_planes(matrix):
+    """
+    Шість площин піраміди видимості (Gribb/Hartmann) з матриці projection * view * model
+    (рядкова, 4x4). Площини (a, b, c, d) у координатах моделі, точка всередині, якщо
+    a*x + b*y + c*z + d >= 0 для всіх площин.
+    """
+    m = np.asarray(matrix, dtype=np.float64)
+    return np.stack([m[3] + m[0], m[3] - m[0], m[3] + m[1], m[3] - m[1], m[3] + m[2], m[3] - m[2]])
+
+
+def visible_chunks(planes, bounds):
+    """
+    Булева маска фрагментів, AABB яких хоча б частково у піраміді видимості.
+    Для кожної площини перевіряється "найдальша" вздовж нормалі вершина AABB.
+    """
+    normals = planes[:, :3]
+    lo, hi = bounds[:, 0].astype(np.float64), bounds[:, 1].astype(np.float64)
+    # (C, 6): вершина AABB, найдальша вздовж нормалі площини
+    farthest = np.where(normals[None, :, :] >= 0, hi[:, None, :], lo[:, None, :])
+    distances = np.einsum("cpk,pk->cp", farthest, normals) + planes[None, :, 3]
+    return np.all(distances >= 0, axis=1)
+
+
+def visible_ranges(mask, offsets):
+    """
+    Сусідні видимі фрагменти зливаються у діапазони для glMultiDrawElements.
+    Повертає (starts, counts) у трикутниках.
+    """
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    first, last = edges[0::2], edges[1::2]
+    starts = offsets[first]
+    return starts, offsets[last] - starts
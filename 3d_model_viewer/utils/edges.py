@@ -0,0 +1,69 @@
+import numpy as np
+from utils.index_optimizer import index_dtype
+from utils.normals import face_normals
+
+# Поріг двогранного кута (градуси) для режиму ребер-зламів за замовчуванням
+FEATURE_ANGLE = 30.0
+# Кут для граничних і немноговидних ребер: вони потрапляють у будь-який режим
+BOUNDARY_ANGLE = np.inf
+
+
+def polygon_edges(offsets, indices):
+    """
+    Усі сторони полігонів у CSR-поданні (без діагоналей тріангуляції).
+    Повертає (a, b, face_ids): сторона k — ребро a[k]-b[k] грані face_ids[k].
+    """
+    sizes = np.diff(offsets)
+    corner = np.arange(len(indices), dtype=np.int64)
+    starts = np.repeat(offsets[:-1], sizes)
+    ends = np.repeat(offsets[1:], sizes)
+    following = np.where(corner == ends - 1, starts, corner + 1)
+    face_ids = np.repeat(np.arange(len(sizes), dtype=np.int64), sizes)
+    return indices, indices[following], face_ids
+
+
+def unique_edges(positions, offsets, indices):
+    """
+    Унікальні ребра моделі та двогранний кут при кожному з них.
+    Пари вершин впорядковуються (min, max), сортуються за ключем і дедуплікуються,
+    тож спільне ребро двох граней потрапляє у буфер один раз.
+    Повертає (edges — потік індексів для GL_LINES (E * 2), angles (E,) float32 у градусах;
+    для граничних ребер і ребер з більш ніж двома гранями — BOUNDARY_ANGLE).
+    """
+    a, b, face_ids = polygon_edges(offsets, indices)
+    lo = np.minimum(a, b).astype(np.int64)
+    hi = np.maximum(a, b).astype(np.int64)
+    keep = lo != hi
+    lo, hi, face_ids = lo[keep], hi[keep], face_ids[keep]
+    dtype = index_dtype(len(positions))
+    if len(lo) == 0:
+        return np.empty(0, dtype=dtype), np.empty(0, dtype=np.float32)
+
+    order = np.argsort(lo * len(positions) + hi, kind="stable")
+    lo, hi, face_ids = lo[order], hi[order], face_ids[order]
+    first = np.ones(len(lo), dtype=bool)
+    first[1:] = (lo[1:] != lo[:-1]) | (hi[1:] != hi[:-1])
+    starts = np.flatnonzero(first)
+    counts = np.diff(np.append(starts, len(lo)))
+
+    angles = np.full(len(starts), BOUNDARY_ANGLE, dtype=np.float32)
+    manifold = counts == 2
+    normals = face_normals(positions, offsets, indices)
+    n1 = normals[face_ids[starts[manifold]]]
+    n2 = normals[face_ids[starts[manifold] + 1]]
+    cos = np.clip(np.einsum("ij,ij->i", n1, n2), -1.0, 1.0)
+    # Вироджені грані (нульова нормаль) злам не утворюють
+    cos[~(n1.any(axis=1) & n2.any(axis=1))] = 1.0
+    angles[manifold] = np.degrees(np.arccos(cos))
+
+    edges = np.empty((len(starts), 2), dtype=dtype)
+    edges[:, 0] = lo[starts]
+    edges[:, 1] = hi[starts]
+    return edges.ravel(), angles
+
+
+def feature_edges(edges, angles, threshold=FEATURE_ANGLE):
+    """
+    Лише граничні ребра та ребра-злами з двогранним кутом не менше threshold градусів.
+    """
+    return np.asarray(edges).reshape(-1, 2)[angles >= threshold].ravel()
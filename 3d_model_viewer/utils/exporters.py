@@ -0,0 +1,312 @@
+import os
+import numpy as np
+from utils.normals import fan_triangulate
+from utils.stl_reader import STL_HEADER_SIZE, STL_RECORD
+from utils.qmesh import QMESH_EXTENSION, write_qmesh
+
+# Вершин або граней в одному блоці запису (пам'ять не залежить від розміру моделі)
+EXPORT_CHUNK = 1 << 18
+# Формат чисел: 9 значущих цифр точно відновлюють float32
+FLOAT_FORMAT = "%.9g"
+
+
+class ExportCancelled(Exception):
+    """
+    Експорт скасовано (частковий файл видалено).
+    """
+
+
+def _chunks(total, chunk=EXPORT_CHUNK):
+    for start in range(0, total, chunk):
+        yield start, min(start + chunk, total)
+
+
+def _format_rows(row_format, array):
+    """
+    Блок рядків тексту одним форматуванням: row_format * n % (усі значення блоку).
+    """
+    return ((row_format * len(array)) % tuple(array.ravel().tolist())).encode("ascii")
+
+
+def _format_faces(offsets, indices, size_formats, repeat=1):
+    """
+    Рядки граней блоку: формат для кожного розміру грані кешується у size_formats(size).
+    repeat — скільки разів повторюється кожен індекс у рядку (OBJ v//vn — двічі).
+    """
+    sizes = np.diff(offsets)
+    values = indices[offsets[0]:offsets[-1]]
+    if repeat > 1:
+        values = np.repeat(values, repeat)
+    if len(sizes) and (sizes == sizes[0]).all():
+        template = size_formats(int(sizes[0])) * len(sizes)
+    else:
+        template = "".join([size_formats(size) for size in sizes.tolist()])
+    return (template % tuple(values.tolist())).encode("ascii")
+
+
+def _color_bytes(colors):
+    """
+    Кольори вершин у uchar 0..255 (float-кольори вважаються у діапазоні 0..1).
+    """
+    colors = np.asarray(colors)
+    if colors.dtype == np.uint8:
+        return colors
+    if np.issubdtype(colors.dtype, np.floating):
+        return np.clip(np.rint(colors * 255), 0, 255).astype(np.uint8)
+    return np.clip(colors, 0, 255).astype(np.uint8)
+
+
+class _Progress:
+    """
+    Частка виконаної роботи (вершини + грані) і перевірка скасування між блоками.
+    """
+
+    def __init__(self, total, progress=None, is_cancelled=None):
+        self.total = max(total, 1)
+        self.done = 0
+        self.progress = progress
+        self.is_cancelled = is_cancelled
+
+    def advance(self, count):
+        if self.is_cancelled is not None and self.is_cancelled():
+            raise ExportCancelled()
+        self.done += count
+        if self.progress is not None:
+            self.progress(min(self.done / self.total, 1.0))
+
+    def update(self, fraction):
+        self.advance(fraction * self.total - self.done)
+
+
+def _write_atomic(path, write):
+    """
+    Пише у path + ".part" і перейменовує лише після успіху: при помилці чи скасуванні
+    частковий файл видаляється, а попередній вміст path лишається.
+    """
+    partial = path + ".part"
+    try:
+        with open(partial, "wb") as f:
+            write(f)
+        os.replace(partial, path)
+    except BaseException:
+        try:
+            os.remove(partial)
+        except OSError:
+            pass
+        raise
+
+
+def export_obj(mesh, path, normals=None, progress=None, is_cancelled=None):
+    """
+    Експортує модель (Mesh) у OBJ блоками: v (і vn, якщо передано normals (N, 3)), f.
+    progress(fraction) і is_cancelled() викликаються між блоками.
+    """
+    offsets, indices = mesh.face_offsets, mesh.face_indices
+    positions = np.asarray(mesh.positions)
+    tracker = _Progress(mesh.vertex_count * (2 if normals is not None else 1) + mesh.face_count,
+                        progress, is_cancelled)
+    vertex_format = f"v {FLOAT_FORMAT} {FLOAT_FORMAT} {FLOAT_FORMAT}\n"
+    normal_format = f"vn {FLOAT_FORMAT} {FLOAT_FORMAT} {FLOAT_FORMAT}\n"
+    face_formats = {}
+
+    def face_format(size):
+        if size not in face_formats:
+            corner = " %d//%d" if normals is not None else " %d"
+            face_formats[size] = "f" + corner * size + "\n"
+        return face_formats[size]
+
+    def write(f):
+        for start, end in _chunks(len(positions)):
+            f.write(_format_rows(vertex_format, positions[start:end]))
+            tracker.advance(end - start)
+        if normals is not None:
+            for start, end in _chunks(len(normals)):
+                f.write(_format_rows(normal_format, np.asarray(normals[start:end])))
+                tracker.advance(end - start)
+        for start, end in _chunks(mesh.face_count):
+            # Індекси OBJ — з одиниці
+            block = offsets[start:end + 1]
+            one_based = indices[block[0]:block[-1]].astype(np.int64) + 1
+            f.write(_format_faces(block - block[0], one_based, face_format, 2 if normals is not None else 1))
+            tracker.advance(end - start)
+
+    _write_atomic(path, write)
+
+
+def _ply_vertex_dtype(normals, colors):
+    fields = [("x", "<f4"), ("y", "<f4"), ("z", "<f4")]
+    if normals is not None:
+        fields += [("nx", "<f4"), ("ny", "<f4"), ("nz", "<f4")]
+    if colors is not None:
+        fields += [(name, "u1") for name in ("red", "green", "blue", "alpha")[:colors.shape[1]]]
+    return np.dtype(fields)
+
+
+def _binary_faces(offsets, indices, count_type):
+    """
+    Блок граней binary PLY: для кожної грані лічильник (uchar або int) і int32-індекси,
+    зібрані векторно в один масив байтів.
+    """
+    sizes = np.diff(offsets)
+    count_bytes = np.dtype(count_type).itemsize
+    values = np.ascontiguousarray(indices[offsets[0]:offsets[-1]], dtype="<i4")
+    out = np.empty(len(sizes) * count_bytes + values.nbytes, dtype=np.uint8)
+    # Позиція лічильника грані i: 4 * (індексів до неї) + count_bytes * i
+    starts = 4 * (offsets[:-1] - offsets[0]) + count_bytes * np.arange(len(sizes))
+    count_positions = (starts[:, None] + np.arange(count_bytes)).ravel()
+    mask = np.ones(len(out), dtype=bool)
+    mask[count_positions] = False
+    out[count_positions] = sizes.astype(count_type).view(np.uint8)
+    out[mask] = values.view(np.uint8)
+    return out
+
+
+def export_ply(mesh, path, binary=True, normals=None, colors=None, progress=None, is_cancelled=None):
+    """
+    Експортує модель (Mesh) у PLY (binary_little_endian або ascii) блоками.
+    normals (N, 3) і colors (N, 3|4) — необов'язкові властивості вершин.
+    progress(fraction) і is_cancelled() викликаються між блоками.
+    """
+    offsets, indices = mesh.face_offsets, mesh.face_indices
+    positions = np.asarray(mesh.positions)
+    colors = None if colors is None else _color_bytes(colors)
+    sizes = np.diff(offsets)
+    # Лічильник вершин грані — uchar, якщо всі грані мають до 255 вершин
+    count_type = "u1" if not len(sizes) or sizes.max() <= 255 else "<i4"
+    vertex_dtype = _ply_vertex_dtype(normals, colors)
+    tracker = _Progress(mesh.vertex_count + mesh.face_count, progress, is_cancelled)
+
+    header = ["ply", f"format {'binary_little_endian' if binary else 'ascii'} 1.0",
+              f"element vertex {mesh.vertex_count}"]
+    for name in vertex_dtype.names:
+        header.append(f"property {'uchar' if vertex_dtype[name] == np.uint8 else 'float'} {name}")
+    header += [f"element face {mesh.face_count}",
+               f"property list {'uchar' if count_type == 'u1' else 'int'} int vertex_indices", "end_header"]
+
+    float_count = 3 + (3 if normals is not None else 0)
+    vertex_format = " ".join([FLOAT_FORMAT] * float_count + ["%d"] * (0 if colors is None else colors.shape[1])) + "\n"
+    face_formats = {}
+
+    def face_format(size):
+        if size not in face_formats:
+            face_formats[size] = "%d" + " %d" * size + "\n"
+        return face_formats[size]
+
+    def write(f):
+        f.write(("\n".join(header) + "\n").encode("ascii"))
+        for start, end in _chunks(len(positions)):
+            if binary:
+                block = np.empty(end - start, dtype=vertex_dtype)
+                block["x"], block["y"], block["z"] = positions[start:end].T
+                if normals is not None:
+                    block["nx"], block["ny"], block["nz"] = np.asarray(normals[start:end]).T
+                if colors is not None:
+                    for channel, name in enumerate(("red", "green", "blue", "alpha")[:colors.shape[1]]):
+                        block[name] = colors[start:end, channel]
+                f.write(block.tobytes())
+            else:
+                columns = [positions[start:end].astype(np.float64)]
+                if normals is not None:
+                    columns.append(np.asarray(normals[start:end], dtype=np.float64))
+                if colors is not None:
+                    columns.append(colors[start:end].astype(np.float64))
+                f.write(_format_rows(vertex_format, np.hstack(columns)))
+            tracker.advance(end - start)
+        for start, end in _chunks(mesh.face_count):
+            block = offsets[start:end + 1]
+            if binary:
+                f.write(_binary_faces(block, indices, count_type).tobytes())
+            else:
+                # Перед індексами грані — її розмір
+                face_sizes = np.diff(block)
+                rows = np.insert(indices[block[0]:block[-1]].astype(np.int64), block[:-1] - block[0], face_sizes)
+                f.write(_format_faces(block - block[0] + np.arange(len(block)), rows,
+                                      lambda size: face_format(size - 1)))
+            tracker.advance(end - start)
+
+    _write_atomic(path, write)
+
+
+def export_stl(mesh, path, binary=True, progress=None, is_cancelled=None):
+    """
+    Експортує модель (Mesh) у STL (binary або ASCII) блоками граней:
+    n-кутники тріангулюються віялом, нормаль трикутника обчислюється з його вершин.
+    progress(fraction) і is_cancelled() викликаються між блоками.
+    """
+    offsets, indices = mesh.face_offsets, mesh.face_indices
+    positions = np.asarray(mesh.positions)
+    triangle_count = int(np.maximum(np.diff(offsets) - 2, 0).sum())
+    tracker = _Progress(mesh.face_count, progress, is_cancelled)
+    facet_format = ("facet normal {0} {0} {0}\n outer loop\n"
+                    "  vertex {0} {0} {0}\n  vertex {0} {0} {0}\n  vertex {0} {0} {0}\n"
+                    " endloop\nendfacet\n").format(FLOAT_FORMAT)
+
+    def write(f):
+        if binary:
+            f.write(b"binary STL, 3D model viewer".ljust(STL_HEADER_SIZE, b" "))
+            f.write(np.array([triangle_count], dtype="<u4").tobytes())
+        else:
+            f.write(b"solid model\n")
+        for start, end in _chunks(mesh.face_count):
+            block = offsets[start:end + 1]
+            triangles, _ = fan_triangulate(block - block[0], indices[block[0]:block[-1]])
+            corners = positions[triangles]
+            normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+            lengths = np.linalg.norm(normals, axis=1)
+            normals /= np.where(lengths > 0, lengths, 1.0)[:, None]
+            if binary:
+                records = np.zeros(len(triangles), dtype=STL_RECORD)
+                records["normal"] = normals
+                records["vertices"] = corners
+                f.write(records.tobytes())
+            else:
+                f.write(_format_rows(facet_format, np.hstack([normals, corners.reshape(-1, 9)])))
+            tracker.advance(end - start)
+        if not binary:
+            f.write(b"endsolid model\n")
+
+    _write_atomic(path, write)
+
+
+def export_qmesh(mesh, path, normals=None, triangles=None, triangle_faces=None, progress=None, is_cancelled=None):
+    """
+    Експортує модель у компактний контейнер .qmesh (utils/qmesh.py).
+    triangles/triangle_faces — оптимізований потік трикутників рендера (arrays["indices"]
+    і arrays["triangle_faces"] з load_render_model): тоді файл позначається оптимізованим
+    і при читанні модель не переоптимізовується; грані тоді пишуться в порядку потоку
+    (нумерація граней змінюється), а якщо всі вони — трикутники, окремий потік не потрібен.
+    """
+    offsets, indices = mesh.face_offsets, mesh.face_indices
+    optimized = triangles is not None
+    if optimized and (np.diff(offsets) == 3).all():
+        indices, triangles, triangle_faces = np.asarray(triangles).reshape(-1), None, None
+    elif optimized and triangle_faces is not None:
+        # Грані — у порядку першої появи в потоці трикутників: різниці індексів
+        # і номерів граней стають малими й стискаються значно краще
+        first = np.full(mesh.face_count, len(triangle_faces), dtype=np.int64)
+        np.minimum.at(first, triangle_faces, np.arange(len(triangle_faces)))
+        order = np.argsort(first, kind="stable")
+        sizes = np.diff(offsets)[order]
+        new_offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        gather = np.repeat(offsets[:-1][order] - new_offsets[:-1], sizes) + np.arange(new_offsets[-1])
+        offsets, indices = new_offsets, indices[gather]
+        rank = np.empty(mesh.face_count, dtype=np.uint32)
+        rank[order] = np.arange(mesh.face_count, dtype=np.uint32)
+        triangle_faces = rank[triangle_faces]
+    tracker = _Progress(1, progress, is_cancelled)
+    _write_atomic(path, lambda f: write_qmesh(f, mesh.positions, offsets, indices, normals, triangles,
+                                              triangle_faces, optimized, progress=tracker.update))
+
+
+# Розширення -> функція експорту
+EXPORTERS = {".obj": export_obj, ".ply": export_ply, ".stl": export_stl, QMESH_EXTENSION: export_qmesh}
+
+
+def export_mesh(mesh, path, progress=None, is_cancelled=None, **options):
+    """
+    Експорт за розширенням файлу (EXPORTERS); options — параметри формату.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in EXPORTERS:
+        raise ValueError(f"Непідтримуваний формат експорту: {ext}")
+    EXPORTERS[ext](mesh, path, progress=progress, is_cancelled=is_cancelled, **options)
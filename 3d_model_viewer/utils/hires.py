@@ -0,0 +1,101 @@
+import os
+import tempfile
+import numpy as np
+from utils.memory import available_memory
+from utils.transforms import tile_projection
+
+# Найбільший бік фрагмента, що рендериться за раз (з урахуванням суперсемплінгу)
+TILE_SIZE = 2048
+MAX_SUPERSAMPLE = 4
+# Вихідне зображення більше за цю частку вільної пам'яті — у файлі на диску (memmap)
+MEMMAP_FRACTION = 0.5
+IMAGE_FORMATS = {".png": "PNG", ".tif": "TIFF", ".tiff": "TIFF"}
+
+
+def tile_grid(width, height, tile):
+    """
+    Фрагменти кадру (x, y, w, h) рядок за рядком, згори вниз; крайні — менші.
+    """
+    for y in range(0, height, tile):
+        for x in range(0, width, tile):
+            yield x, y, min(tile, width - x), min(tile, height - y)
+
+
+def downsample(image, factor):
+    """
+    Зменшення у factor разів усередненням блоків factor x factor (суперсемплінг).
+    """
+    if factor == 1:
+        return image
+    height, width, channels = image.shape
+    blocks = image.reshape(height // factor, factor, width // factor, factor, channels)
+    return (blocks.sum(axis=(1, 3), dtype=np.uint32) + factor * factor // 2) // (factor * factor)
+
+
+def allocate_image(width, height, channels=3):
+    """
+    Вихідний масив (height, width, channels) uint8: у пам'яті або, якщо він завеликий
+    для вільної RAM, у тимчасовому файлі (np.memmap; файл видаляється після закриття).
+    """
+    nbytes = width * height * channels
+    available = available_memory()
+    if available is None or nbytes <= available * MEMMAP_FRACTION:
+        return np.empty((height, width, channels), dtype=np.uint8)
+    print(f"[DEBUG] Знімок {width}x{height} ({nbytes / 2 ** 20:.0f} МБ) — у тимчасовому файлі")
+    with tempfile.NamedTemporaryFile(prefix="hires_", suffix=".raw", delete=False) as f:
+        path = f.name
+    try:
+        return np.memmap(path, dtype=np.uint8, mode="w+", shape=(height, width, channels))
+    finally:
+        # На POSIX файл живе до закриття відображення; на Windows лишається у теці temp
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def render_tiled(render_view, matrices, width, height, supersample=1, tile_size=TILE_SIZE, progress=None):
+    """
+    Кадр width x height фрагментами: кожен фрагмент — окремий рендер з проекцією
+    під-піраміди (render_view(model, view, projection, w, h) -> (h, w, 4) uint8),
+    за потреби суперсемплінг (рендер у supersample разів більший + усереднення).
+    Фрагменти пишуться одразу у вихідний RGB-масив — повнорозмірна копія одна.
+    progress(done, total) може повернути False — тоді рендер переривається (None).
+    """
+    model, view, projection = matrices
+    supersample = max(1, min(int(supersample), MAX_SUPERSAMPLE))
+    tile = max(1, tile_size // supersample)
+    tiles = list(tile_grid(width, height, tile))
+    image = allocate_image(width, height)
+    for done, (x, y, w, h) in enumerate(tiles, start=1):
+        pixels = render_view(model, view, tile_projection(projection, width, height, x, y, w, h),
+                             w * supersample, h * supersample)
+        image[y:y + h, x:x + w] = downsample(pixels[..., :3], supersample)
+        del pixels
+        if progress is not None and progress(done, len(tiles)) is False:
+            return None
+    return image
+
+
+def save_image(path, image):
+    """
+    Зберігає (height, width, 3) uint8 у PNG/TIFF через Pillow (без копіювання масиву),
+    інші формати — через imageio.
+    """
+    image_format = IMAGE_FORMATS.get(os.path.splitext(path)[1].lower())
+    if image_format is not None:
+        try:
+            from PIL import Image
+        except ImportError:
+            image_format = None
+    if image_format is None:
+        import imageio
+        imageio.imwrite(path, np.asarray(image))
+        return
+    height, width = image.shape[:2]
+    # frombuffer використовує пам'ять масиву напряму (C-суцільний RGB)
+    picture = Image.frombuffer("RGB", (width, height), np.ascontiguousarray(image), "raw", "RGB", 0, 1)
+    if image_format == "TIFF":
+        picture.save(path, format="TIFF", compression="tiff_deflate")
+    else:
+        picture.save(path, format="PNG", compress_level=6)
@@ -0,0 +1,180 @@
+import numpy as np
+
+# Розмір post-transform кешу вершин, під який оптимізується порядок (типовий FIFO GPU)
+VERTEX_CACHE_SIZE = 32
+# Понад цю кількість трикутників — лише просторове (Morton) впорядкування без Tipsify
+OPTIMIZE_TRIANGLE_LIMIT = 1_000_000
+# Скільки трикутників симулюється для оцінки ACMR на великих моделях
+ACMR_SAMPLE_TRIANGLES = 300_000
+
+
+def index_dtype(vertex_count):
+    """
+    Найменший тип індексів для кількості вершин: uint16, якщо вистачає, інакше uint32.
+    """
+    return np.uint16 if vertex_count <= 0xFFFF + 1 else np.uint32
+
+
+def _spread_bits(values):
+    """
+    Розсуває 10 молодших бітів: b9..b0 -> b9 0 0 b8 0 0 ... b0 (для кодів Мортона).
+    """
+    x = values.astype(np.uint32) & 0x3FF
+    x = (x | (x << 16)) & 0x030000FF
+    x = (x | (x << 8)) & 0x0300F00F
+    x = (x | (x << 4)) & 0x030C30C3
+    x = (x | (x << 2)) & 0x09249249
+    return x
+
+
+def morton_codes(points, bbox=None):
+    """
+    30-бітні коди Мортона (Z-крива) для точок (N, 3) у межах bbox.
+    """
+    points = np.asarray(points, dtype=np.float32)
+    if bbox is None:
+        lo, hi = points.min(axis=0), points.max(axis=0)
+    else:
+        lo, hi = (np.asarray(b, dtype=np.float32) for b in bbox)
+    extent = np.where(hi > lo, hi - lo, 1.0)
+    cells = ((points - lo) / extent * 1023).clip(0, 1023).astype(np.uint32)
+    return _spread_bits(cells[:, 0]) | (_spread_bits(cells[:, 1]) << 1) | (_spread_bits(cells[:, 2]) << 2)
+
+
+def morton_order(positions, triangles):
+    """
+    Порядок трикутників уздовж кривої Мортона за центроїдами (просторова локальність).
+    """
+    centroids = positions[triangles].mean(axis=1)
+    return np.argsort(morton_codes(centroids), kind="stable")
+
+
+def acmr(triangles, cache_size=VERTEX_CACHE_SIZE, max_triangles=ACMR_SAMPLE_TRIANGLES):
+    """
+    Average Cache Miss Ratio: промахи FIFO-кешу вершин на трикутник
+    (1.0..3.0 — погано, ~0.6 — близько до оптимуму для регулярних сіток).
+    Для великих моделей симулюються перші max_triangles трикутників.
+    """
+    triangles = np.asarray(triangles).reshape(-1, 3)[:max_triangles]
+    if len(triangles) == 0:
+        return 0.0
+    cache = [-1] * cache_size
+    in_cache = set()
+    head = 0
+    misses = 0
+    for vertex in triangles.ravel().tolist():
+        if vertex in in_cache:
+            continue
+        misses += 1
+        in_cache.discard(cache[head])
+        cache[head] = vertex
+        in_cache.add(vertex)
+        head = (head + 1) % cache_size
+    return misses / len(triangles)
+
+
+def tipsify(triangles, vertex_count, cache_size=VERTEX_CACHE_SIZE):
+    """
+    Переупорядкування трикутників під кеш вершин (Tipsify, Sander et al. 2007):
+    обхід "віялами" навколо вершин, що ще лежать у кеші, з поверненням
+    до недавно використаних вершин у тупиках. Лінійний час.
+    Повертає порядок трикутників (T,) int64.
+    """
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    tri_count = len(triangles)
+    corners = triangles.ravel()
+    # Суміжність вершина -> трикутники у CSR
+    live = np.bincount(corners, minlength=vertex_count)
+    adjacency_offsets = np.zeros(vertex_count + 1, dtype=np.int64)
+    np.cumsum(live, out=adjacency_offsets[1:])
+    adjacency = (np.argsort(corners, kind="stable") // 3).tolist()
+    adjacency_offsets = adjacency_offsets.tolist()
+    tris = triangles.tolist()
+    live = live.tolist()
+    timestamps = [0] * vertex_count
+    emitted = bytearray(tri_count)
+    dead_end = []
+    order = []
+    time_now = cache_size + 1
+    cursor = 0
+    fan = 0 if tri_count else -1
+    while fan >= 0:
+        candidates = []
+        for t in adjacency[adjacency_offsets[fan]:adjacency_offsets[fan + 1]]:
+            if emitted[t]:
+                continue
+            emitted[t] = 1
+            order.append(t)
+            for v in tris[t]:
+                dead_end.append(v)
+                candidates.append(v)
+                live[v] -= 1
+                if time_now - timestamps[v] > cache_size:
+                    timestamps[v] = time_now
+                    time_now += 1
+        # Наступна вершина: та, що залишиться у кеші після обходу її віяла
+        fan = -1
+        best = -1
+        for v in candidates:
+            if live[v] > 0:
+                priority = 0
+                age = time_now - timestamps[v]
+                if age + 2 * live[v] <= cache_size:
+                    priority = age
+                if priority > best:
+                    best = priority
+                    fan = v
+        if fan < 0:
+            while dead_end:
+                v = dead_end.pop()
+                if live[v] > 0:
+                    fan = v
+                    break
+            else:
+                while cursor < vertex_count and live[cursor] == 0:
+                    cursor += 1
+                fan = cursor if cursor < vertex_count else -1
+    return np.asarray(order, dtype=np.int64)
+
+
+def vertex_fetch_order(triangles, vertex_count):
+    """
+    Перенумерація вершин у порядку першого використання в потоці індексів.
+    Повертає (order — старі номери у новому порядку, remap — старий номер -> новий).
+    Невикористані вершини йдуть у кінець.
+    """
+    flat = np.asarray(triangles).ravel()
+    used, first = np.unique(flat, return_index=True)
+    order = used[np.argsort(first, kind="stable")]
+    if len(order) < vertex_count:
+        unused = np.setdiff1d(np.arange(vertex_count), used, assume_unique=True)
+        order = np.concatenate([order, unused])
+    remap = np.empty(vertex_count, dtype=np.int64)
+    remap[order] = np.arange(vertex_count, dtype=np.int64)
+    return order, remap
+
+
+def optimize_triangles(positions, triangles, cache_size=VERTEX_CACHE_SIZE, limit=OPTIMIZE_TRIANGLE_LIMIT,
+                       chunk_size=None):
+    """
+    Порядок трикутників для рендера: спершу Morton (локальність), далі Tipsify
+    (якщо трикутників не більше limit). Повертає перестановку трикутників.
+    chunk_size — Tipsify окремо в межах послідовних Morton-фрагментів такого розміру,
+    щоб кожен фрагмент лишався просторово компактним (для відсікання).
+    """
+    if len(triangles) == 0:
+        return np.empty(0, dtype=np.int64)
+    order = morton_order(positions, triangles)
+    if len(triangles) > limit:
+        return order
+    if chunk_size is None:
+        # Tipsify у тупиках шукає вершини за номером — нумеруємо їх уздовж Morton-порядку
+        _, remap = vertex_fetch_order(triangles[order], len(positions))
+        return order[tipsify(remap[triangles[order]], len(positions), cache_size)]
+    for start in range(0, len(order), chunk_size):
+        chunk = order[start:start + chunk_size]
+        local_vertices, local = np.unique(triangles[chunk], return_inverse=True)
+        local = local.reshape(-1, 3)
+        _, remap = vertex_fetch_order(local, len(local_vertices))
+        order[start:start + chunk_size] = chunk[tipsify(remap[local], len(local_vertices), cache_size)]
+    return order
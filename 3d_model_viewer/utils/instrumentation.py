@@ -0,0 +1,216 @@
+import json
+import os
+import platform
+import threading
+import time
+from collections import deque
+import numpy as np
+
+# Файл JSON lines для збору метрик (задання змінної вмикає інструментування)
+METRICS_PATH = os.environ.get("MODEL_VIEWER_METRICS")
+# Скільки останніх вимірів кожного таймера зберігається для перцентилів
+ROLLING_SAMPLES = 600
+# Як часто (с) у файл пишеться зведення по кадрах
+SUMMARY_INTERVAL = 10.0
+# Перцентилі у зведенні
+PERCENTILES = (50, 95, 99)
+
+
+class _NullTimer:
+    """
+    Таймер-заглушка для вимкненого інструментування: нічого не міряє.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    """
+    Контекстний менеджер, що записує тривалість блоку в Instrumentation.
+    """
+
+    __slots__ = ("owner", "name", "start")
+
+    def __init__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.owner.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class RollingStats:
+    """
+    Останні ROLLING_SAMPLES вимірів (у секундах) плюс загальні лічильники.
+    """
+
+    __slots__ = ("samples", "count", "total")
+
+    def __init__(self, size=ROLLING_SAMPLES):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def summary(self):
+        """
+        Зведення у мілісекундах: кількість, середнє, перцентилі та максимум вікна.
+        """
+        if not self.samples:
+            return {"count": self.count}
+        window = np.fromiter(self.samples, dtype=np.float64) * 1000
+        result = {"count": self.count, "mean_ms": round(float(window.mean()), 3)}
+        for p, value in zip(PERCENTILES, np.percentile(window, PERCENTILES)):
+            result[f"p{p}_ms"] = round(float(value), 3)
+        result["max_ms"] = round(float(window.max()), 3)
+        return result
+
+
+class Instrumentation:
+    """
+    Іменовані таймери, лічильники та статистика кадрів.
+    Вимкнене інструментування не рахує нічого: timer() повертає спільну заглушку,
+    record()/count()/frame() одразу виходять. Вимірювання з фонових потоків
+    (етапи завантаження) захищені блокуванням.
+    Метрики пишуться у файл JSON lines (export): події етапів одразу, кадри — зведенням.
+    """
+
+    def __init__(self, enabled=False, path=None):
+        self.enabled = enabled
+        self.path = path
+        self.timers = {}
+        self.counters = {}
+        self.frame_intervals = RollingStats()
+        self._last_frame = None
+        self._last_summary = time.monotonic()
+        self._lock = threading.Lock()
+
+    def timer(self, name):
+        """
+        with instruments.timer("load.parse"): ... — міряє тривалість блоку.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def record(self, name, seconds, log=False):
+        """
+        Додає вимір таймера; log=True — ще й окремий запис у файл метрик.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self.timers.get(name)
+            if stats is None:
+                stats = self.timers[name] = RollingStats()
+            stats.add(seconds)
+        if log:
+            self.log("timer", name=name, ms=round(seconds * 1000, 3))
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def frame(self):
+        """
+        Позначка початку кадру: інтервали між кадрами дають FPS.
+        Раз на SUMMARY_INTERVAL секунд у файл метрик пишеться зведення.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            self.frame_intervals.add(now - self._last_frame)
+        self._last_frame = now
+        if self.path is not None and time.monotonic() - self._last_summary >= SUMMARY_INTERVAL:
+            self.flush()
+
+    def fps(self):
+        """
+        Середній FPS за вікно останніх кадрів (None, якщо кадрів ще не було).
+        """
+        samples = self.frame_intervals.samples
+        if not samples:
+            return None
+        return len(samples) / max(sum(samples), 1e-9)
+
+    def summary(self):
+        """
+        Зведення всіх таймерів, лічильників і FPS (словник, придатний для JSON).
+        """
+        with self._lock:
+            timers = {name: stats.summary() for name, stats in self.timers.items()}
+            counters = dict(self.counters)
+        fps = self.fps()
+        return {
+            "fps": None if fps is None else round(fps, 2),
+            "frames": self.frame_intervals.summary(),
+            "timers": timers,
+            "counters": counters,
+        }
+
+    def log(self, event, **fields):
+        """
+        Дописує один запис JSON lines у файл метрик (якщо його задано).
+        """
+        if self.path is None:
+            return
+        record = {"time": round(time.time(), 3), "event": event, **fields}
+        line = json.dumps(record, ensure_ascii=False)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"[DEBUG] Метрики: не вдалося записати {self.path}: {e}")
+
+    def flush(self):
+        """
+        Пише зведення у файл метрик.
+        """
+        if not self.enabled:
+            return
+        self._last_summary = time.monotonic()
+        self.log("summary", **self.summary())
+
+    def export(self, path):
+        """
+        Вмикає інструментування і запис метрик у path (JSON lines).
+        Першим записом іде опис системи.
+        """
+        self.enabled = True
+        self.path = path
+        self.log("session", platform=platform.platform(), python=platform.python_version(),
+                 numpy=np.__version__)
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+        self.frame_intervals = RollingStats()
+        self._last_frame = None
+
+
+# Спільний екземпляр для всієї програми
+instruments = Instrumentation()
+if METRICS_PATH:
+    instruments.export(METRICS_PATH)
@@ -0,0 +1,26 @@
+import numpy as np
+
+# Матеріал і світло (спільні для fixed-function, шейдерного та програмного рендера)
+MATERIAL_DIFFUSE = (0.82, 0.82, 0.82)
+MATERIAL_AMBIENT = (0.32, 0.32, 0.32)
+LIGHT_AMBIENT = (0.23, 0.23, 0.23)
+GLOBAL_AMBIENT = (0.2, 0.2, 0.2)   # GL_LIGHT_MODEL_AMBIENT за замовчуванням
+
+
+def ambient_color():
+    """
+    Сумарна фонова складова: матеріал * (глобальне + фонове світла GL_LIGHT0).
+    """
+    return [m * (g + l) for m, g, l in zip(MATERIAL_AMBIENT, GLOBAL_AMBIENT, LIGHT_AMBIENT)]
+
+
+def lambert(normals, light_dir):
+    """
+    Колір за Ламбертом для масиву одиничних нормалей (N, 3), як у GL_LIGHT0 з білим
+    дифузним світлом без дзеркальної складової. Повертає (N, 3) float32 у [0, 1].
+    """
+    light = np.asarray(light_dir, dtype=np.float32)
+    light = light / (np.linalg.norm(light) or 1.0)
+    diffuse = np.maximum(np.asarray(normals, dtype=np.float32) @ light, 0.0)
+    colors = np.asarray(ambient_color(), dtype=np.float32) + diffuse[:, None] * np.asarray(MATERIAL_DIFFUSE, dtype=np.float32)
+    return np.minimum(colors, 1.0)
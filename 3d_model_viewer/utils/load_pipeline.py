@@ -0,0 +1,205 @@
+import os
+import time
+import numpy as np
+from utils.model_loader import load_obj_with_texture, load_ply, load_stl, load_qmesh
+from utils.qmesh import QMESH_EXTENSION
+from utils.compressed import COMPRESSION_SUFFIXES, is_compressed, model_extension
+from utils.normals import smooth_render_arrays, flat_render_arrays
+from utils.index_optimizer import acmr, optimize_triangles, vertex_fetch_order
+from utils.culling import CHUNK_TRIANGLES, chunk_bounds
+from utils.bvh import build_bvh_bounds
+from utils.edges import unique_edges
+from utils.instrumentation import instruments
+
+# Етапи завантаження моделі (для індикатора прогресу)
+LOAD_STAGES = ("read", "parse", "optimize", "normals", "upload")
+STAGE_TITLES = {
+    "read": "Читання",
+    "parse": "Розбір",
+    "optimize": "Оптимізація",
+    "normals": "Нормалі",
+    "upload": "Передача на GPU",
+}
+SUPPORTED_EXTENSIONS = (".obj", ".ply", ".stl", QMESH_EXTENSION)
+# Формати, які можна відкривати й стисненими (.obj.gz, .ply.xz, ...): розбір іде з потоку розпакування
+STREAMED_EXTENSIONS = (".obj", ".ply", ".stl")
+# Шаблони файлів моделей для діалогів відкриття
+MODEL_FILE_PATTERNS = " ".join(
+    [f"*{ext}" for ext in SUPPORTED_EXTENSIONS]
+    + [f"*{ext}{suffix}" for ext in STREAMED_EXTENSIONS for suffix in COMPRESSION_SUFFIXES])
+
+# Ключі масивів гладкого шейдингу, які зберігаються у дисковому кеші
+SMOOTH_ARRAY_KEYS = ("vertex_normals", "indices", "triangle_faces", "chunk_bounds", "bvh_bounds",
+                     "edges", "edge_angles")
+
+
+class LoadCancelled(Exception):
+    """
+    Завантаження скасовано (наприклад, користувач обрав інший файл).
+    """
+
+
+def is_model_file(path):
+    """
+    Чи підтримується файл за розширенням (з урахуванням стиснених .obj.gz тощо).
+    """
+    ext = model_extension(path)
+    if is_compressed(path):
+        return ext in STREAMED_EXTENSIONS
+    return ext in SUPPORTED_EXTENSIONS
+
+
+def load_mesh(path, progress=None, workers=None):
+    """
+    Розбирає файл моделі за розширенням (стиснені .obj.gz/.ply.xz/... — з потоку розпакування).
+    Повертає Mesh.
+    progress(fraction) — прогрес розбору (OBJ і STL); workers — процесів розбору OBJ.
+    """
+    if not is_model_file(path):
+        raise ValueError("Непідтримуваний формат файлу.")
+    ext = model_extension(path)
+    if ext == ".obj":
+        mesh, _ = load_obj_with_texture(path, progress=progress, workers=workers)
+    elif ext == ".ply":
+        mesh = load_ply(path)
+    elif ext == ".stl":
+        mesh = load_stl(path, progress=progress)
+    elif ext == QMESH_EXTENSION:
+        mesh, _ = load_qmesh(path)
+    else:
+        raise ValueError("Непідтримуваний формат файлу.")
+    return mesh
+
+
+def prepare_render_arrays(mesh, weighting="area", arrays=None, flat=False):
+    """
+    Доповнює словник масивів для рендера гладкими нормалями/індексами.
+    Потоки плоского шейдингу (дубльовані вершини) будуються лише при flat=True.
+    Наявні у arrays (напр. з кешу) не перераховуються.
+    """
+    arrays = dict(arrays or {})
+    positions = np.ascontiguousarray(mesh.positions)
+    if "vertex_normals" not in arrays:
+        if arrays.get("indices") is not None:
+            # Готовий потік трикутників без нормалей (напр. .qmesh) лишається у своєму порядку
+            triangles = arrays["indices"].reshape(-1, 3)
+        else:
+            triangles = mesh.triangles
+            # Номер грані для кожного трикутника потоку індексів (для вибору мишею)
+            arrays["triangle_faces"] = mesh.triangle_faces.astype(np.uint32)
+        arrays.update(smooth_render_arrays(positions, mesh.face_offsets, mesh.face_indices, weighting,
+                                           triangles=triangles))
+    if "chunk_bounds" not in arrays and arrays.get("indices") is not None:
+        # Межі фрагментів потоку індексів для відсікання пірамідою видимості
+        arrays["chunk_bounds"] = chunk_bounds(positions, arrays["indices"])
+    if "bvh_bounds" not in arrays and arrays.get("indices") is not None:
+        # BVH над тим самим потоком індексів — для вибору точки променем
+        arrays["bvh_bounds"] = build_bvh_bounds(positions, arrays["indices"])
+    if "edges" not in arrays:
+        # Унікальні ребра (GL_LINES) і двогранні кути — для каркасу та ребер-зламів
+        arrays["edges"], arrays["edge_angles"] = unique_edges(positions, mesh.face_offsets, mesh.face_indices)
+    for key in SMOOTH_ARRAY_KEYS:
+        # Порожні потоки (None) у кеш не пишуться
+        arrays.setdefault(key, None)
+    if flat and "flat_vertices" not in arrays:
+        arrays.update(build_flat_arrays(mesh))
+    return arrays
+
+
+def build_flat_arrays(mesh):
+    """
+    Потоки плоского шейдингу для моделі (виконується у фоновому потоці на вимогу).
+    """
+    return flat_render_arrays(np.ascontiguousarray(mesh.positions), mesh.face_offsets, mesh.face_indices,
+                              mesh.triangles, mesh.triangle_faces)
+
+
+def optimize_mesh(mesh, measure_acmr=None):
+    """
+    Готує модель до рендера з кешу вершин GPU: трикутники переупорядковуються
+    (Morton + Tipsify у межах фрагментів по CHUNK_TRIANGLES, щоб фрагменти лишались
+    просторово компактними), вершини перенумеровуються у порядку першого використання.
+    measure_acmr — рахувати ACMR до/після (симуляція кешу, повільна на великих моделях);
+    None — лише коли увімкнено інструментування.
+    Повертає (нова Mesh, (ACMR до, ACMR після) або None).
+    """
+    if measure_acmr is None:
+        measure_acmr = instruments.enabled
+    triangles = mesh.triangles
+    before = acmr(triangles) if measure_acmr else None
+    order = optimize_triangles(mesh.positions, triangles, chunk_size=CHUNK_TRIANGLES)
+    vertex_order, _ = vertex_fetch_order(triangles[order], mesh.vertex_count)
+    mesh = mesh.reordered(vertex_order, order)
+    if not measure_acmr:
+        return mesh, None
+    after = acmr(mesh.triangles)
+    print(f"[DEBUG] ACMR: {before:.3f} -> {after:.3f} ({len(triangles)} трикутників)")
+    return mesh, (before, after)
+
+
+def load_render_model(path, weighting="area", cache=None, progress=None, is_cancelled=None, workers=None):
+    """
+    Повний конвеєр завантаження поза GUI-потоком: кеш -> розбір -> нормалі.
+    progress(stage, fraction) отримує етап з LOAD_STAGES і частку від 0 до 1;
+    is_cancelled() перевіряється між етапами та блоками розбору.
+    workers — процесів розбору OBJ (див. load_mesh; GUI передає 1, якщо користувач не ввімкнув більше).
+    Тривалість кожного етапу записується таймером "load.<етап>" (якщо інструментування увімкнено).
+    Повертає (Mesh, arrays); етап "upload" виконує вже віджет у GUI-потоці.
+    Файли .qmesh читаються в обхід кешу (контейнер і так розпаковується швидше);
+    оптимізований .qmesh не переоптимізовується, і arrays містять його квантовані масиви.
+    """
+    stage_starts = {}
+
+    def report(stage, fraction):
+        if is_cancelled is not None and is_cancelled():
+            raise LoadCancelled(path)
+        if progress is not None:
+            progress(stage, fraction)
+        if instruments.enabled:
+            if fraction == 0.0:
+                stage_starts[stage] = time.perf_counter()
+            elif fraction == 1.0 and stage in stage_starts:
+                instruments.record(f"load.{stage}", time.perf_counter() - stage_starts.pop(stage), log=True)
+
+    if not is_model_file(path):
+        raise ValueError("Непідтримуваний формат файлу.")
+    ext = model_extension(path)
+    report("read", 0.0)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Файл не знайдено: {path}")
+    if ext == QMESH_EXTENSION:
+        cache = None
+    cached = cache.load(path, weighting) if cache is not None else None
+    report("read", 1.0)
+
+    if cached is not None:
+        # У кеші модель уже оптимізована
+        mesh, arrays = cached
+        report("parse", 1.0)
+    elif ext == QMESH_EXTENSION:
+        report("parse", 0.0)
+        mesh, arrays = load_qmesh(path)
+        report("parse", 1.0)
+        report("optimize", 0.0)
+        if arrays is None and not mesh.is_empty():
+            mesh, _ = optimize_mesh(mesh)
+    else:
+        report("parse", 0.0)
+        mesh = load_mesh(path, progress=lambda fraction: report("parse", fraction), workers=workers)
+        arrays = None
+        report("parse", 1.0)
+        report("optimize", 0.0)
+        if not mesh.is_empty():
+            mesh, _ = optimize_mesh(mesh)
+    report("optimize", 1.0)
+
+    report("normals", 0.0)
+    # Bounding box теж рахуємо тут, щоб не блокувати GUI-потік
+    mesh.bbox()
+    if not mesh.is_empty():
+        arrays = prepare_render_arrays(mesh, weighting, arrays)
+        if cached is None and cache is not None:
+            cache.store(path, mesh, {key: arrays[key] for key in SMOOTH_ARRAY_KEYS}, weighting)
+    report("normals", 1.0)
+    instruments.count("load.cache_hits" if cached is not None else "load.cache_misses")
+    return mesh, arrays or {}
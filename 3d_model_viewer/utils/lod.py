@@ -0,0 +1,128 @@
+import numpy as np
+from utils.index_optimizer import index_dtype, optimize_triangles, vertex_fetch_order
+
+# Моделі з меншою кількістю трикутників малюються лише у повній деталізації
+LOD_MIN_TRIANGLES = 100_000
+# Найгрубший рівень піраміди має щонайменше стільки трикутників
+LOD_COARSEST_TRIANGLES = 20_000
+# Кожен наступний рівень має не більше цієї частки трикутників попереднього
+LOD_LEVEL_RATIO = 0.5
+# Tipsify для рівнів — лише до цієї кількості трикутників (інакше лише Morton-порядок)
+LOD_OPTIMIZE_LIMIT = 200_000
+
+
+class LodLevel:
+    """
+    Рівень деталізації: власні вершини, нормалі та потік індексів трикутників.
+    """
+
+    __slots__ = ("positions", "normals", "indices", "resolution")
+
+    def __init__(self, positions, normals, indices, resolution):
+        self.positions = positions
+        self.normals = normals
+        self.indices = indices
+        self.resolution = resolution
+
+    @property
+    def triangle_count(self):
+        return len(self.indices) // 3
+
+    def __repr__(self):
+        return f"LodLevel(triangles={self.triangle_count}, resolution={self.resolution})"
+
+
+def _unique_triangles(triangles):
+    """
+    Прибирає вироджені трикутники та дублікати (з будь-яким порядком вершин).
+    Зберігає перше входження з його орієнтацією.
+    """
+    keep = (triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) \
+        & (triangles[:, 0] != triangles[:, 2])
+    triangles = triangles[keep]
+    if len(triangles) == 0:
+        return triangles
+    key = np.sort(triangles, axis=1)
+    order = np.lexsort((key[:, 2], key[:, 1], key[:, 0]))
+    key = key[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = np.any(key[1:] != key[:-1], axis=1)
+    return triangles[np.sort(order[first])]
+
+
+def cluster_decimate(positions, normals, triangles, resolution, bbox):
+    """
+    Спрощення кластеризацією вершин: простір ділиться на куби сітки
+    resolution по найдовшій осі bbox, вершини кожного куба зливаються у середню точку
+    (нормалі усереднюються), трикутники перенумеровуються, вироджені та дублікати відкидаються.
+    Повертає (positions, normals, triangles) спрощеної моделі.
+    """
+    lo, hi = (np.asarray(b, dtype=np.float64) for b in bbox)
+    cell = float((hi - lo).max()) / resolution or 1.0
+    cells = np.floor((positions - lo) / cell).astype(np.int64).clip(0, resolution)
+    side = resolution + 1
+    keys = (cells[:, 0] * side + cells[:, 1]) * side + cells[:, 2]
+    _, cluster = np.unique(keys, return_inverse=True)
+    cluster = cluster.ravel()
+    count = int(cluster.max()) + 1
+    weights = np.bincount(cluster, minlength=count).astype(np.float64)
+    merged = np.stack([np.bincount(cluster, weights=positions[:, k], minlength=count) for k in range(3)], axis=1)
+    merged /= weights[:, None]
+    merged_normals = None
+    if normals is not None:
+        merged_normals = np.stack([np.bincount(cluster, weights=normals[:, k], minlength=count) for k in range(3)], axis=1)
+        lengths = np.linalg.norm(merged_normals, axis=1)
+        lengths[lengths == 0] = 1.0
+        merged_normals = (merged_normals / lengths[:, None]).astype(np.float32)
+    return merged.astype(np.float32), merged_normals, _unique_triangles(cluster[triangles])
+
+
+def build_lod_pyramid(positions, normals, triangles, bbox=None, is_cancelled=None,
+                      min_triangles=LOD_MIN_TRIANGLES, coarsest=LOD_COARSEST_TRIANGLES, ratio=LOD_LEVEL_RATIO):
+    """
+    Піраміда спрощених рівнів (від детального до грубого) для моделі з triangles (T, 3).
+    Кожен рівень будується з повної моделі з удвічі грубшою сіткою кластеризації;
+    рівні, що зменшують кількість трикутників менш ніж у 1/ratio раз, пропускаються.
+    Індекси рівнів оптимізовані під кеш вершин. Для малих моделей — порожній список.
+    is_cancelled() перевіряється між рівнями.
+    """
+    positions = np.asarray(positions, dtype=np.float32)
+    triangles = np.asarray(triangles).reshape(-1, 3)
+    if len(triangles) < min_triangles:
+        return []
+    if bbox is None:
+        bbox = (positions.min(axis=0), positions.max(axis=0))
+    levels = []
+    previous = len(triangles)
+    # Для поверхні вершин ~ resolution^2: починаємо з сітки, грубшої за вихідну модель
+    resolution = 1 << max(3, int(np.log2(max(np.sqrt(len(positions)), 8))))
+    while resolution >= 8 and previous > coarsest:
+        if is_cancelled is not None and is_cancelled():
+            return []
+        level_positions, level_normals, level_triangles = cluster_decimate(
+            positions, normals, triangles, resolution, bbox)
+        resolution //= 2
+        if len(level_triangles) == 0 or len(level_triangles) > previous * ratio:
+            continue
+        order = optimize_triangles(level_positions, level_triangles, limit=LOD_OPTIMIZE_LIMIT)
+        vertex_order, remap = vertex_fetch_order(level_triangles[order], len(level_positions))
+        level_triangles = remap[level_triangles[order]]
+        levels.append(LodLevel(
+            level_positions[vertex_order],
+            None if level_normals is None else level_normals[vertex_order],
+            level_triangles.ravel().astype(index_dtype(len(level_positions))),
+            resolution * 2,
+        ))
+        previous = len(level_triangles)
+    return levels
+
+
+def select_lod(triangle_counts, budget):
+    """
+    Номер найдетальнішого рівня, що вкладається у бюджет трикутників
+    (triangle_counts — від детального до грубого); якщо жоден — найгрубший.
+    """
+    for level, count in enumerate(triangle_counts):
+        if count <= budget:
+            return level
+    return len(triangle_counts) - 1
@@ -0,0 +1,129 @@
+import numpy as np
+from utils.normals import fan_triangulate
+
+
+class Mesh:
+    """
+    Компактна модель на масивах NumPy:
+    positions — float32 (N, 3), необов'язкові normals (N, 3), texcoords (N, 2), colors (N, 3|4);
+    грані — у CSR-поданні: face_offsets (F + 1) та face_indices (сума розмірів граней).
+    Тріангульоване подання (fan) та bounding box обчислюються ліниво і кешуються
+    (bbox можна передати готовим, напр. з дискового кешу).
+    """
+
+    __slots__ = ("positions", "normals", "texcoords", "colors",
+                 "face_offsets", "face_indices", "_triangles", "_triangle_faces", "_bbox")
+
+    def __init__(self, positions, face_offsets=None, face_indices=None,
+                 normals=None, texcoords=None, colors=None, bbox=None):
+        self.positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        if face_offsets is None:
+            face_offsets = np.zeros(1, dtype=np.int64)
+            face_indices = np.empty(0, dtype=np.uint32)
+        self.face_offsets = np.asarray(face_offsets, dtype=np.int64)
+        self.face_indices = np.asarray(face_indices, dtype=np.uint32)
+        self.normals = None if normals is None else np.asarray(normals, dtype=np.float32)
+        self.texcoords = None if texcoords is None else np.asarray(texcoords, dtype=np.float32)
+        self.colors = None if colors is None else np.asarray(colors)
+        self._triangles = None
+        self._triangle_faces = None
+        self._bbox = bbox
+
+    @classmethod
+    def empty(cls):
+        """
+        Порожня модель (нічого не завантажено).
+        """
+        return cls(np.empty((0, 3), dtype=np.float32))
+
+    @classmethod
+    def from_triangles(cls, positions, triangles, **attributes):
+        """
+        Створює модель з масиву трикутників (T, 3).
+        """
+        triangles = np.asarray(triangles, dtype=np.uint32).reshape(-1, 3)
+        offsets = np.arange(len(triangles) + 1, dtype=np.int64) * 3
+        return cls(positions, offsets, triangles.reshape(-1), **attributes)
+
+    @property
+    def vertex_count(self):
+        return len(self.positions)
+
+    @property
+    def face_count(self):
+        return len(self.face_offsets) - 1
+
+    @property
+    def face_sizes(self):
+        return np.diff(self.face_offsets)
+
+    def is_empty(self):
+        """
+        Чи є у моделі вершини та грані.
+        """
+        return self.vertex_count == 0 or len(self.face_indices) == 0
+
+    def face(self, i):
+        """
+        Індекси вершин грані i.
+        """
+        return self.face_indices[self.face_offsets[i]:self.face_offsets[i + 1]]
+
+    def _triangulate(self):
+        if self._triangles is None:
+            self._triangles, self._triangle_faces = fan_triangulate(self.face_offsets, self.face_indices)
+
+    @property
+    def triangles(self):
+        """
+        Тріангульоване подання (T, 3) uint32 — fan-тріангуляція всіх граней
+        (порядок трикутників може бути оптимізований, див. reordered).
+        """
+        self._triangulate()
+        return self._triangles
+
+    @property
+    def triangle_faces(self):
+        """
+        Номер вихідної грані для кожного трикутника з `triangles`.
+        """
+        self._triangulate()
+        return self._triangle_faces
+
+    def reordered(self, vertex_order, triangle_order=None):
+        """
+        Нова модель з вершинами у порядку vertex_order (старі номери у новому порядку):
+        атрибути переставляються, індекси граней перенумеровуються. Порядок граней не змінюється.
+        triangle_order — необов'язкова перестановка тріангульованого подання.
+        """
+        remap = np.empty(self.vertex_count, dtype=np.uint32)
+        remap[vertex_order] = np.arange(self.vertex_count, dtype=np.uint32)
+        attributes = {name: None if getattr(self, name) is None else getattr(self, name)[vertex_order]
+                      for name in ("normals", "texcoords", "colors")}
+        mesh = Mesh(self.positions[vertex_order], self.face_offsets, remap[self.face_indices],
+                    bbox=self._bbox, **attributes)
+        if triangle_order is not None:
+            mesh._triangles = remap[self.triangles[triangle_order]]
+            mesh._triangle_faces = self.triangle_faces[triangle_order]
+        return mesh
+
+    def bbox(self):
+        """
+        Bounding box моделі: (min, max) як float64 масиви (3,), або None для порожньої.
+        """
+        if self._bbox is None and self.vertex_count:
+            self._bbox = (self.positions.min(axis=0).astype(np.float64),
+                          self.positions.max(axis=0).astype(np.float64))
+        return self._bbox
+
+    @property
+    def nbytes(self):
+        """
+        Обсяг пам'яті, зайнятої масивами моделі (без кешованих трикутників).
+        """
+        arrays = (self.positions, self.normals, self.texcoords, self.colors,
+                  self.face_offsets, self.face_indices)
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    def __repr__(self):
+        return f"Mesh(vertices={self.vertex_count}, faces={self.face_count})"
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import numpy as np
+from utils.mesh import Mesh
+
+# Версія формату кешу: зміна робить старі записи недійсними
+CACHE_VERSION = 5
+# Тека кешу за замовчуванням (можна перевизначити змінною середовища)
+DEFAULT_CACHE_DIR = os.environ.get(
+    "MODEL_VIEWER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "3d_model_viewer", "meshes"))
+# Бюджет розміру кешу на диску
+DEFAULT_CACHE_BYTES = 4 * 1024 ** 3
+# Тимчасові теки незавершених записів, старші за цей вік (с), вважаються покинутими
+STALE_TMP_SECONDS = 3600
+
+_MESH_ARRAYS = ("positions", "face_offsets", "face_indices", "normals", "texcoords", "colors")
+_META_FILE = "meta.json"
+_HASH_CHUNK = 8 * 1024 * 1024
+
+
+def file_content_hash(path):
+    """
+    BLAKE2b-хеш вмісту файлу (читання блоками).
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MeshCache:
+    """
+    Дисковий кеш уже оброблених моделей.
+    Кожен запис — тека з .npy-файлами (відкриваються через memmap без розбору)
+    та meta.json. Ключ — шлях + розмір + mtime (і, за бажанням, хеш вмісту).
+    Під бюджет розміру найдавніше використані записи видаляються (LRU).
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_BYTES, content_hash=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.content_hash = content_hash
+
+    def key(self, path, variant=""):
+        """
+        Ключ запису для файлу; variant розрізняє налаштування обробки (напр. зважування нормалей).
+        """
+        stat = os.stat(path)
+        parts = [str(CACHE_VERSION), os.path.abspath(path), str(stat.st_size), str(stat.st_mtime_ns), variant]
+        if self.content_hash:
+            parts.append(file_content_hash(path))
+        return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.directory, key)
+
+    def load(self, path, variant=""):
+        """
+        Повертає (Mesh, arrays) з кешу або None, якщо запису немає.
+        arrays — словник додаткових масивів для рендера (відображені у пам'ять).
+        """
+        try:
+            entry = self._entry_dir(self.key(path, variant))
+            with open(os.path.join(entry, _META_FILE), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            loaded = {name: np.load(os.path.join(entry, name + ".npy"), mmap_mode="r")
+                      for name in meta["arrays"]}
+        except (OSError, ValueError, KeyError):
+            return None
+        # Позначка для LRU — час останнього використання
+        os.utime(entry)
+        mesh_arrays = {name: loaded.pop(name, None) for name in _MESH_ARRAYS}
+        bbox = meta.get("bbox")
+        mesh = Mesh(mesh_arrays["positions"], mesh_arrays["face_offsets"], mesh_arrays["face_indices"],
+                    normals=mesh_arrays["normals"], texcoords=mesh_arrays["texcoords"],
+                    colors=mesh_arrays["colors"],
+                    bbox=None if bbox is None else (np.array(bbox[0]), np.array(bbox[1])))
+        print(f"[DEBUG] Кеш: знайдено {path}")
+        return mesh, loaded
+
+    def store(self, path, mesh, arrays, variant=""):
+        """
+        Зберігає модель і масиви для рендера. Запис спершу пишеться у тимчасову теку,
+        а потім атомарно перейменовується; при помилці тимчасова тека видаляється.
+        """
+        entry = tmp = None
+        try:
+            key = self.key(path, variant)
+            entry = self._entry_dir(key)
+            if os.path.isdir(entry):
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = entry + f".tmp{os.getpid()}"
+            os.makedirs(tmp, exist_ok=True)
+            to_save = {name: getattr(mesh, name) for name in _MESH_ARRAYS}
+            to_save.update(arrays)
+            names = []
+            for name, array in to_save.items():
+                if array is None:
+                    continue
+                np.save(os.path.join(tmp, name + ".npy"), np.ascontiguousarray(array))
+                names.append(name)
+            bbox = mesh.bbox()
+            meta = {
+                "source": os.path.abspath(path),
+                "variant": variant,
+                "created": time.time(),
+                "arrays": names,
+                "bbox": None if bbox is None else [bbox[0].tolist(), bbox[1].tolist()],
+            }
+            with open(os.path.join(tmp, _META_FILE), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp, entry)
+        except OSError as e:
+            if tmp is not None:
+                shutil.rmtree(tmp, ignore_errors=True)
+            # Інший процес міг уже записати цей самий запис (os.replace -> ENOTEMPTY)
+            if entry is None or not os.path.isdir(entry):
+                print(f"[DEBUG] Кеш: не вдалося зберегти {path}: {e}")
+                return
+        self.evict()
+
+    def entries(self):
+        """
+        Список записів кешу: (тека, розмір у байтах, час останнього використання).
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        result = []
+        for name in os.listdir(self.directory):
+            entry = os.path.join(self.directory, name)
+            if not os.path.isdir(entry) or ".tmp" in name:
+                continue
+            size = sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+            result.append((entry, size, os.path.getmtime(entry)))
+        return result
+
+    def remove_stale_tmp(self, max_age=STALE_TMP_SECONDS):
+        """
+        Видаляє тимчасові теки записів, покинуті перерваними процесами (старші за max_age с).
+        """
+        if not os.path.isdir(self.directory):
+            return
+        now = time.time()
+        for name in os.listdir(self.directory):
+            tmp = os.path.join(self.directory, name)
+            try:
+                stale = ".tmp" in name and os.path.isdir(tmp) and now - os.path.getmtime(tmp) > max_age
+            except OSError:
+                continue
+            if stale:
+                shutil.rmtree(tmp, ignore_errors=True)
+
+    def evict(self):
+        """
+        Видаляє найдавніше використані записи, поки кеш не вкладеться у бюджет
+        (і покинуті тимчасові теки).
+        """
+        self.remove_stale_tmp()
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for entry, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            # На Windows відображені у пам'ять файли видалити не вдасться — пропускаємо
+            shutil.rmtree(entry, ignore_errors=True)
+            if not os.path.exists(entry):
+                total -= size
+
+    def clear(self):
+        """
+        Повністю очищає кеш (тимчасові теки — лише покинуті, щоб не зламати запис іншого процесу).
+        """
+        self.remove_stale_tmp()
+        for entry, _, _ in self.entries():
+            shutil.rmtree(entry, ignore_errors=True)
@@ -1,59 +1,130 @@
 import os
+import numpy as np
+from utils.obj_parser import parse_obj
+from utils.ply_reader import read_ply
+from utils.stl_reader import read_stl
+from utils.qmesh import read_qmesh
+from utils.index_optimizer import index_dtype
+from utils.mesh import Mesh
 
-def load_obj_with_texture(path):
+def corner_attribute(face_indices, corner_indices, values, vertex_count):
+    """
+    Переносить атрибут, заданий по кутах граней (vt/vn в OBJ), на вершини.
+    Якщо вершина має кілька різних значень (шов), лишається останнє.
+    """
+    if corner_indices is None or len(values) == 0:
+        return None
+    valid = corner_indices >= 0
+    if not valid.any():
+        return None
+    out = np.zeros((vertex_count, values.shape[1]), dtype=np.float32)
+    out[face_indices[valid]] = values[corner_indices[valid]]
+    return out
+
+def find_obj_texture(path, mtllibs):
+    """
+    Шукає текстуру (map_Kd) у .mtl-файлах, на які посилається OBJ.
+    Повертає шлях до текстури або None.
+    """
+    for mtl_file in mtllibs:
+        mtl_path = os.path.join(os.path.dirname(path), mtl_file)
+        print(f"[DEBUG] OBJ: знайдено mtllib: {mtl_path}")
+        try:
+            with open(mtl_path, 'r') as mtl:
+                for mtl_line in mtl:
+                    if mtl_line.startswith('map_Kd'):
+                        texture_file = mtl_line.strip().split()[1]
+                        texture_path = os.path.join(os.path.dirname(path), texture_file)
+                        print(f"[DEBUG] OBJ: знайдено map_Kd: {texture_path}")
+                        return texture_path
+        except Exception as e:
+            print(f"[DEBUG] OBJ: Помилка при читанні MTL: {e}")
+    return None
+
+def load_obj_with_texture(path, progress=None, workers=None):
     """
     Завантажує OBJ-модель: вершини, грані та текстуру з .mtl (якщо вона є).
-    Повертає кортеж ((vertices, faces), texture_path або None).
+    Файл розбирається великими блоками (utils/obj_parser.py); стиснений .obj.gz/.obj.bz2/
+    .obj.xz/.obj.zst — так само блоками з потоку розпакування (utils/compressed.py);
+    progress(fraction) — необов'язковий колбек прогресу розбору.
+    workers — процесів розбору (None — автоматично для великих файлів, 1 — без пулу).
+    Повертає кортеж (Mesh, texture_path або None).
     """
     print(f"[DEBUG] OBJ loader. Спроба відкрити: {path}")
-    vertices = []
-    faces = []
-    texture_file = None
-
-    # Відкриваємо .obj-файл
-    with open(path, 'r') as file:
-        for line in file:
-            if line.startswith('v '):
-                # Зчитуємо координати вершини
-                parts = line.strip().split()
-                vertices.append(tuple(map(float, parts[1:4])))
-            elif line.startswith('f '):
-                # Зчитуємо індекси вершин грані (faces)
-                parts = line.strip().split()
-                face = [int(p.split('/')[0]) - 1 for p in parts[1:]]
-                faces.append(face)
-            elif line.startswith('mtllib'):
-                # Якщо вказаний матеріал, шукаємо текстуру
-                mtl_file = line.strip().split()[1]
-                mtl_path = os.path.join(os.path.dirname(path), mtl_file)
-                print(f"[DEBUG] OBJ: знайдено mtllib: {mtl_path}")
-                try:
-                    with open(mtl_path, 'r') as mtl:
-                        for mtl_line in mtl:
-                            if mtl_line.startswith('map_Kd'):
-                                texture_file = mtl_line.strip().split()[1]
-                                texture_path = os.path.join(os.path.dirname(path), texture_file)
-                                print(f"[DEBUG] OBJ: знайдено map_Kd: {texture_path}")
-                                return (vertices, faces), texture_path
-                except Exception as e:
-                    print(f"[DEBUG] OBJ: Помилка при читанні MTL: {e}")
-                    continue
-    print(f"[DEBUG] OBJ: Вершин {len(vertices)}, Граней {len(faces)}, текстури немає.")
-    return (vertices, faces), None
+    data = parse_obj(path, progress=progress, workers=workers)
+    positions = data["positions"]
+    mesh = Mesh(
+        positions, data["face_offsets"], data["face_indices"],
+        normals=corner_attribute(data["face_indices"], data["face_normals"], data["normals"], len(positions)),
+        texcoords=corner_attribute(data["face_indices"], data["face_texcoords"], data["texcoords"], len(positions)),
+    )
+    # Текстуру шукаємо вже після розбору всього файлу
+    texture_path = find_obj_texture(path, data["mtllibs"])
+    print(f"[DEBUG] OBJ: Вершин {mesh.vertex_count}, Граней {mesh.face_count}, "
+          f"текстура: {texture_path or 'немає'}.")
+    return mesh, texture_path
 
 def load_ply(path):
     """
-    Завантажує PLY-файл (вершини, грані) через бібліотеку trimesh.
-    Повертає список вершин та список граней.
+    Завантажує PLY-файл власним читачем utils/ply_reader.py
+    (бінарні дані — через memmap, без копіювання у Python-об'єкти;
+    стиснений .ply.gz тощо — фрагментами з потоку розпакування).
+    Повертає Mesh (разом із нормалями, кольорами та UV, якщо вони є у файлі);
+    помилки читання не приховуються — їх показує фоновий завантажувач.
     """
     print(f"[DEBUG] PLY loader. Спроба відкрити: {path}")
     try:
-        import trimesh
-        mesh = trimesh.load(path, file_type='ply')
-        vertices = mesh.vertices.tolist()
-        faces = mesh.faces.tolist()
-        print(f"[DEBUG] PLY: Вершин {len(vertices)}, Граней {len(faces)}")
-        return vertices, faces
+        data = read_ply(path)
     except Exception as e:
+        # Помилку показує фоновий завантажувач (ModelLoadWorker.failed)
         print(f"[PLY ERROR] {e}")
-        return [], []
+        raise
+    mesh = Mesh(data["positions"], data["face_offsets"], data["face_indices"],
+                normals=data["normals"], texcoords=data["texcoords"], colors=data["colors"])
+    print(f"[DEBUG] PLY: Вершин {mesh.vertex_count}, Граней {mesh.face_count}")
+    return mesh
+
+def load_stl(path, progress=None):
+    """
+    Завантажує STL (binary — одним memmap-поданням, або ASCII; також стиснений .stl.gz тощо)
+    через utils/stl_reader.py;
+    однакові вершини трикутників зварюються, тож гладкі нормалі працюють.
+    Повертає Mesh.
+    """
+    print(f"[DEBUG] STL loader. Спроба відкрити: {path}")
+    data = read_stl(path, progress=progress)
+    mesh = Mesh(data["positions"], data["face_offsets"], data["face_indices"])
+    print(f"[DEBUG] STL: Вершин {mesh.vertex_count}, Граней {mesh.face_count}")
+    return mesh
+
+def load_qmesh(path, workers=None):
+    """
+    Завантажує компактний контейнер .qmesh (utils/qmesh.py; фрагменти розпаковуються паралельно).
+    Повертає (Mesh, arrays): для оптимізованого файлу arrays — готові масиви рендера
+    (vertex_normals, indices, triangle_faces) і квантовані дані для GPU без розпакування
+    (quantized_positions, quantized_normals, position_quantization = (offset, scale));
+    інакше arrays = None, а нормалі файлу — у mesh.normals.
+    """
+    print(f"[DEBUG] QMESH loader. Спроба відкрити: {path}")
+    data = read_qmesh(path, workers=workers)
+    optimized = data["optimized"]
+    mesh = Mesh(data["positions"], data["face_offsets"], data["face_indices"],
+                normals=None if optimized else data["normals"])
+    print(f"[DEBUG] QMESH: Вершин {mesh.vertex_count}, Граней {mesh.face_count}")
+    if not optimized:
+        return mesh, None
+    triangles, triangle_faces = data["triangles"], data["triangle_faces"]
+    if triangles is None:
+        # Грані-трикутники записані в оптимізованому порядку потоку
+        triangles = mesh.face_indices
+        triangle_faces = np.arange(mesh.face_count, dtype=np.uint32)
+    arrays = {
+        "indices": triangles.astype(index_dtype(mesh.vertex_count)),
+        "triangle_faces": triangle_faces.astype(np.uint32),
+        "quantized_positions": data["quantized_positions"],
+        "position_quantization": (data["position_offset"], data["position_scale"]),
+    }
+    if data["normals"] is not None:
+        arrays["vertex_normals"] = data["normals"]
+        arrays["quantized_normals"] = data["quantized_normals"]
+    return mesh, arrays
@@ -0,0 +1,179 @@
+import itertools
+import numpy as np
+from utils.index_optimizer import index_dtype
+
+# Способи зважування нормалей граней при накопиченні у вершинах
+WEIGHTING_MODES = ("uniform", "area", "angle")
+
+
+def faces_to_csr(faces):
+    """
+    Перетворює список граней (списків індексів) у CSR-подання.
+    Повертає (offsets, indices): грань i — це indices[offsets[i]:offsets[i + 1]].
+    """
+    sizes = np.fromiter((len(f) for f in faces), dtype=np.int64, count=len(faces))
+    offsets = np.zeros(len(faces) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    indices = np.fromiter(itertools.chain.from_iterable(faces), dtype=np.uint32, count=int(offsets[-1]))
+    return offsets, indices
+
+
+def fan_triangulate(offsets, indices, face_mask=None):
+    """
+    Віялова (fan) тріангуляція граней у CSR-поданні: [f0, fi, fi+1].
+    Грані з менш ніж трьома вершинами пропускаються.
+    face_mask — необов'язкова булева маска граней, які треба тріангулювати.
+    Повертає (triangles (T, 3) uint32, face_ids (T,) — номер грані для кожного трикутника).
+    """
+    sizes = np.diff(offsets)
+    tri_counts = np.maximum(sizes - 2, 0)
+    if face_mask is not None:
+        tri_counts = np.where(face_mask, tri_counts, 0)
+    total = int(tri_counts.sum())
+    if total == 0:
+        return np.empty((0, 3), dtype=np.uint32), np.empty(0, dtype=np.int64)
+
+    face_ids = np.repeat(np.arange(len(sizes), dtype=np.int64), tri_counts)
+    first_tri = np.cumsum(tri_counts) - tri_counts
+    # Локальний номер трикутника у грані: 1 .. n-2
+    local = np.arange(total, dtype=np.int64) - np.repeat(first_tri, tri_counts) + 1
+    starts = offsets[:-1][face_ids]
+    triangles = np.empty((total, 3), dtype=np.uint32)
+    triangles[:, 0] = indices[starts]
+    triangles[:, 1] = indices[starts + local]
+    triangles[:, 2] = indices[starts + local + 1]
+    return triangles, face_ids
+
+
+def _normalize_rows(vectors):
+    """
+    Нормалізує вектори по рядках; нульові вектори залишаються нульовими.
+    """
+    lengths = np.linalg.norm(vectors, axis=1)
+    lengths[lengths == 0] = 1.0
+    return vectors / lengths[:, None]
+
+
+def triangle_cross(positions, triangles):
+    """
+    Векторні добутки (v1 - v0) x (v2 - v0) для масиву трикутників.
+    Довжина результату дорівнює подвоєній площі трикутника.
+    """
+    v0 = positions[triangles[:, 0]]
+    return np.cross(positions[triangles[:, 1]] - v0, positions[triangles[:, 2]] - v0)
+
+
+def polygon_area_vectors(positions, offsets, indices):
+    """
+    Вектор площі кожної грані — сума векторних добутків її fan-трикутників.
+    Для плоского багатокутника напрямок збігається з нормаллю, довжина — 2 * площа.
+    """
+    triangles, face_ids = fan_triangulate(offsets, indices)
+    crosses = triangle_cross(positions, triangles)
+    face_count = len(offsets) - 1
+    return np.stack(
+        [np.bincount(face_ids, weights=crosses[:, k], minlength=face_count) for k in range(3)],
+        axis=1,
+    )
+
+
+def face_normals(positions, offsets, indices):
+    """
+    Одиничні нормалі граней (для вироджених граней — нульовий вектор).
+    """
+    return _normalize_rows(polygon_area_vectors(positions, offsets, indices)).astype(np.float32)
+
+
+def _corner_angles(positions, offsets, indices, corner_mask):
+    """
+    Внутрішній кут багатокутника у кожному куті (corner) грані.
+    """
+    sizes = np.diff(offsets)
+    corner_pos = np.arange(len(indices), dtype=np.int64)
+    starts = np.repeat(offsets[:-1], sizes)
+    ends = np.repeat(offsets[1:], sizes)
+    prev_pos = np.where(corner_pos == starts, ends - 1, corner_pos - 1)[corner_mask]
+    next_pos = np.where(corner_pos == ends - 1, starts, corner_pos + 1)[corner_mask]
+    current = positions[indices[corner_mask]]
+    e1 = positions[indices[next_pos]] - current
+    e2 = positions[indices[prev_pos]] - current
+    sin = np.linalg.norm(np.cross(e1, e2), axis=1)
+    cos = np.einsum("ij,ij->i", e1, e2)
+    return np.arctan2(sin, cos)
+
+
+def vertex_normals(positions, offsets, indices, weighting="area"):
+    """
+    Гладкі нормалі вершин: нормалі граней накопичуються у вершинах (scatter-add)
+    і нормалізуються.
+    weighting:
+      "uniform" — кожна грань додає одиничну нормаль (як старий цикл);
+      "area"    — внесок пропорційний площі грані;
+      "angle"   — внесок пропорційний куту грані при вершині.
+    """
+    if weighting not in WEIGHTING_MODES:
+        raise ValueError(f"Невідомий спосіб зважування нормалей: {weighting}")
+    positions = np.asarray(positions, dtype=np.float32)
+    vertex_count = len(positions)
+    if vertex_count == 0 or len(indices) == 0:
+        return np.zeros((vertex_count, 3), dtype=np.float32)
+
+    area_vectors = polygon_area_vectors(positions, offsets, indices)
+    sizes = np.diff(offsets)
+    corner_faces = np.repeat(np.arange(len(sizes), dtype=np.int64), sizes)
+    corner_mask = sizes[corner_faces] >= 3
+    corner_faces = corner_faces[corner_mask]
+    corner_vertices = indices[corner_mask]
+
+    if weighting == "area":
+        weights = area_vectors[corner_faces]
+    else:
+        weights = _normalize_rows(area_vectors)[corner_faces]
+        if weighting == "angle":
+            weights *= _corner_angles(positions, offsets, indices, corner_mask)[:, None]
+
+    accumulated = np.stack(
+        [np.bincount(corner_vertices, weights=weights[:, k], minlength=vertex_count) for k in range(3)],
+        axis=1,
+    )
+    return _normalize_rows(accumulated).astype(np.float32)
+
+
+def flat_arrays_nbytes(offsets):
+    """
+    Оцінка розміру потоків flat_render_arrays у байтах (без їх побудови).
+    """
+    triangles = int(np.maximum(np.diff(offsets) - 2, 0).sum())
+    # Позиція + нормаль float32 на кожну дубльовану вершину
+    return triangles * 3 * 2 * 3 * 4
+
+
+def smooth_render_arrays(positions, offsets, indices, weighting="area", triangles=None):
+    """
+    Масиви для рендера з гладким шейдингом: нормалі вершин та єдиний потік індексів
+    трикутників (n-кутники тріангульовані; uint16, якщо дозволяє кількість вершин).
+    triangles — готова (напр. оптимізована під кеш) тріангуляція; інакше fan.
+    """
+    if triangles is None:
+        triangles, _ = fan_triangulate(offsets, indices)
+    return {
+        "vertex_normals": vertex_normals(positions, offsets, indices, weighting),
+        "indices": triangles.ravel().astype(index_dtype(len(positions))) if len(triangles) else None,
+    }
+
+
+def flat_render_arrays(positions, offsets, indices, triangles=None, triangle_faces=None):
+    """
+    Дубльовані потоки вершин/нормалей для плоского шейдингу (fixed-function шлях):
+    кожен трикутник отримує нормаль своєї грані. Порожнє — None.
+    """
+    positions = np.asarray(positions, dtype=np.float32)
+    if triangles is None:
+        triangles, triangle_faces = fan_triangulate(offsets, indices)
+    if len(triangles) == 0:
+        return {"flat_vertices": None, "flat_normals": None}
+    normals = face_normals(positions, offsets, indices)[triangle_faces]
+    return {
+        "flat_vertices": positions[triangles.ravel()],
+        "flat_normals": np.repeat(normals, 3, axis=0),
+    }
@@ -0,0 +1,522 @@
+import os
+import warnings
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+from utils.compressed import DecompressingReader, is_compressed
+
+# Розмір блоку читання OBJ (блок завжди обрізається по кінцю рядка)
+OBJ_BLOCK_SIZE = 4 * 1024 * 1024
+# З якого розміру файл розбирається кількома процесами (workers=None)
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+# Діапазонів на процес: менші діапазони — рівніше навантаження і частіший прогрес
+RANGES_PER_WORKER = 4
+
+_TAB, _LF, _CR, _SPACE, _SLASH = 9, 10, 13, 32, 47
+_F, _M, _N, _T, _V = ord("f"), ord("m"), ord("n"), ord("t"), ord("v")
+
+
+def iter_line_blocks(stream, block_size=OBJ_BLOCK_SIZE):
+    """
+    Читає бінарний потік великими блоками, кожен з яких закінчується на '\\n'.
+    Неповний останній рядок блоку переноситься у наступний.
+    """
+    tail = b""
+    while True:
+        chunk = stream.read(block_size)
+        if not chunk:
+            break
+        data = tail + chunk if tail else chunk
+        cut = data.rfind(b"\n")
+        if cut < 0:
+            tail = data
+            continue
+        tail = data[cut + 1:]
+        yield data[:cut + 1]
+    if tail:
+        yield tail + b"\n"
+
+
+def _is_space(values):
+    return (values == _SPACE) | (values == _TAB) | (values == _LF)
+
+
+def _parse_numbers(buffer, dtype):
+    """
+    Розбирає числа, розділені пробілами/переносами, з байтового масиву.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return np.fromstring(buffer.tobytes(), dtype=dtype, sep=" ")
+
+
+def _token_starts(buffer):
+    """
+    Булева маска байтів, з яких починається токен.
+    """
+    space = _is_space(buffer)
+    starts = ~space
+    starts[1:] &= space[:-1]
+    return starts
+
+
+def _count_per_line(flags, line_offsets):
+    """
+    Кількість встановлених прапорців у кожному рядку вибірки.
+    """
+    if len(line_offsets) == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.add.reduceat(flags.view(np.uint8), line_offsets, dtype=np.int64)
+
+
+def _select_lines(data, starts, ends, mask):
+    """
+    Вибирає байти рядків за маскою (разом із завершальним '\\n').
+    Повертає (байти, зміщення початків рядків у вибірці).
+    """
+    lengths = (ends - starts + 1)[mask]
+    selected = data[np.repeat(mask, ends - starts + 1)]
+    offsets = np.cumsum(lengths) - lengths
+    return selected, offsets
+
+
+def _parse_float_records(data, starts, ends, mask, width):
+    """
+    Розбирає рядки `v`/`vt`/`vn`: перші `width` чисел кожного рядка.
+    Ключове слово рядка вже має бути замінене пробілами.
+    """
+    count = int(mask.sum())
+    if count == 0:
+        return np.empty((0, width), dtype=np.float32)
+    selected, offsets = _select_lines(data, starts, ends, mask)
+    values = _parse_numbers(selected, np.float64)
+    if len(values) == count * width:
+        return values.reshape(count, width).astype(np.float32)
+    # Рядки з додатковими (w, колір) або неповними компонентами
+    per_line = _count_per_line(_token_starts(selected), offsets)
+    if len(values) != per_line.sum():
+        raise ValueError("OBJ: некоректні числові дані у записах вершин")
+    first = np.cumsum(per_line) - per_line
+    out = np.zeros((count, width), dtype=np.float32)
+    for k in range(width):
+        present = per_line > k
+        out[present, k] = values[first[present] + k]
+    if width == 3 and not (per_line >= 3).all():
+        raise ValueError("OBJ: вершина має менше трьох координат")
+    return out
+
+
+def _parse_face_records(data, starts, ends, mask, bases, counts_before, relative=None):
+    """
+    Розбирає рядки `f` у формах v, v/vt, v//vn, v/vt/vn.
+    Повертає (sizes, [vertex, texcoord, normal]) — індекси вже від нуля;
+    відсутні texcoord/normal позначаються -1 (або весь масив None).
+    relative — необов'язковий словник: k -> номери кутів з від'ємними (відносними) індексами.
+    """
+    count = int(mask.sum())
+    if count == 0:
+        return np.empty(0, dtype=np.int64), [np.empty(0, dtype=np.int64), None, None]
+    selected, offsets = _select_lines(data, starts, ends, mask)
+    slash = selected == _SLASH
+    token_start = _token_starts(selected)
+    sizes = _count_per_line(token_start, offsets)
+    token_total = int(sizes.sum())
+
+    def resolve(k, raw):
+        # Від'ємні індекси — відносно кількості вже оголошених елементів
+        if (raw == 0).any():
+            raise ValueError("OBJ: нульовий індекс у записі грані")
+        negative = raw < 0
+        if not negative.any():
+            return raw - 1
+        if relative is not None:
+            relative[k] = np.flatnonzero(negative)
+        before = np.repeat(bases[k] + counts_before[k], sizes)
+        return np.where(raw < 0, before + raw, raw - 1)
+
+    # Швидкий шлях: усі кути граней мають однакову форму (v, v/vt, v/vt/vn або v//vn)
+    per_token = _count_per_line(slash, np.flatnonzero(token_start))
+    slash_count = int(per_token[0]) if token_total else 0
+    double_total = int(np.count_nonzero(slash[1:] & slash[:-1]))
+    layout = None
+    if (per_token == slash_count).all():
+        layout = {
+            (0, 0): (0, None, None),
+            (1, 0): (0, 1, None),
+            (2, 0): (0, 1, 2),
+            (2, token_total): (0, None, 1),
+        }.get((slash_count, double_total))
+    if layout is not None:
+        width = sum(column is not None for column in layout)
+        selected[slash] = _SPACE
+        raw = _parse_numbers(selected, np.int64)
+        if len(raw) != token_total * width:
+            raise ValueError("OBJ: некоректні індекси у записах граней")
+        raw = raw.reshape(token_total, width)
+        return sizes, [resolve(k, raw[:, column]) if column is not None else None
+                       for k, column in enumerate(layout)]
+
+    # Загальний шлях: змішані форми кутів у межах блоку
+    space = _is_space(selected)
+
+    # Номер токена та номер поля (кількість '/' від початку токена) для кожного байта
+    token_id = np.cumsum(token_start, dtype=np.int32) - 1
+    slash_count = np.cumsum(slash, dtype=np.int32)
+    field = slash_count - slash_count[token_start][np.maximum(token_id, 0)]
+    content = ~space & ~slash
+
+    fields = []
+    for k in range(3):
+        keep = content & (field == k)
+        present = np.bincount(token_id[keep], minlength=token_total) > 0
+        if k > 0 and not present.any():
+            fields.append(None)
+            continue
+        raw = _parse_numbers(np.where(keep, selected, _SPACE).astype(np.uint8), np.int64)
+        if len(raw) != present.sum() or (k == 0 and not present.all()):
+            raise ValueError("OBJ: некоректні індекси у записах граней")
+        out = np.zeros(token_total, dtype=np.int64)
+        out[present] = raw
+        out = resolve(k, out) if k == 0 else np.where(present, resolve(k, np.where(present, out, 1)), -1)
+        fields.append(out)
+    return sizes, fields
+
+
+def parse_obj_block(block, bases=(0, 0, 0), track_relative=False):
+    """
+    Розбирає один блок OBJ (цілі рядки) векторизовано.
+    bases — кількість v/vt/vn, оголошених у попередніх блоках (для від'ємних індексів).
+    track_relative — bases відомі лише в межах діапазону файлу (паралельний розбір):
+    від'ємні індекси можуть вказувати до початку діапазону, а номери таких кутів
+    повертаються у "relative" для поправки на глобальний зсув.
+    Повертає словник із масивами блоку.
+    """
+    data = np.frombuffer(block, dtype=np.uint8).copy()
+    data[data == _CR] = _SPACE
+    if len(data) == 0 or data[-1] != _LF:
+        data = np.append(data, np.uint8(_LF))
+
+    ends = np.flatnonzero(data == _LF)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    c0 = data[starts]
+    c1 = data[np.minimum(starts + 1, ends)]
+    c2 = data[np.minimum(starts + 2, ends)]
+    space1 = (c1 == _SPACE) | (c1 == _TAB)
+    space2 = (c2 == _SPACE) | (c2 == _TAB)
+    is_v = (c0 == _V) & space1
+    is_vt = (c0 == _V) & (c1 == _T) & space2
+    is_vn = (c0 == _V) & (c1 == _N) & space2
+    is_f = (c0 == _F) & space1
+
+    # Прибираємо ключові слова, щоб лишилися тільки числа
+    data[starts[is_v | is_vt | is_vn | is_f]] = _SPACE
+    data[starts[is_vt | is_vn] + 1] = _SPACE
+
+    mtllibs = []
+    for s, e in zip(starts[c0 == _M].tolist(), ends[c0 == _M].tolist()):
+        line = bytes(data[s:e]).decode("utf-8", errors="replace").strip()
+        if line.startswith("mtllib"):
+            mtllibs.extend(line.split()[1:])
+
+    # Скільки v/vt/vn оголошено у блоці до кожного рядка `f`
+    counts_before = [np.cumsum(kind)[is_f] for kind in (is_v, is_vt, is_vn)]
+    relative = {} if track_relative else None
+    sizes, (face_vertex, face_texcoord, face_normal) = _parse_face_records(
+        data, starts, ends, is_f, bases, counts_before, relative)
+
+    if not track_relative and len(face_vertex) and face_vertex.min() < 0:
+        raise ValueError("OBJ: індекс вершини грані поза межами")
+
+    # Компактні типи одразу в блоці, щоб не тримати int64 до злиття
+    # (індекси до початку діапазону в uint32 переповнюються і відновлюються поправкою)
+    parsed = {
+        "positions": _parse_float_records(data, starts, ends, is_v, 3),
+        "texcoords": _parse_float_records(data, starts, ends, is_vt, 2),
+        "normals": _parse_float_records(data, starts, ends, is_vn, 3),
+        "face_sizes": sizes.astype(np.int32),
+        "face_vertex": face_vertex.astype(np.uint32),
+        "face_texcoord": None if face_texcoord is None else face_texcoord.astype(np.int32),
+        "face_normal": None if face_normal is None else face_normal.astype(np.int32),
+        "mtllibs": mtllibs,
+    }
+    if track_relative:
+        parsed["relative"] = [relative.get(k) for k in range(3)]
+    return parsed
+
+
+def merge_obj_blocks(blocks):
+    """
+    Об'єднує результати блоків у суцільні масиви:
+    positions/texcoords/normals (float32) та CSR граней (face_offsets, face_indices).
+    Індекси texcoord/normal по кутах граней — face_texcoords/face_normals (або None).
+    """
+    blocks = list(blocks)
+
+    def concat(key, shape_tail, dtype):
+        parts = [b[key] for b in blocks]
+        if not parts:
+            return np.empty((0,) + shape_tail, dtype=dtype)
+        return np.ascontiguousarray(np.concatenate(parts), dtype=dtype)
+
+    positions = concat("positions", (3,), np.float32)
+    texcoords = concat("texcoords", (2,), np.float32)
+    normals = concat("normals", (3,), np.float32)
+    sizes = concat("face_sizes", (), np.int32)
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+
+    face_indices = concat("face_vertex", (), np.uint32)
+    if len(face_indices) and face_indices.max() >= len(positions):
+        raise ValueError("OBJ: індекс вершини грані поза межами")
+
+    def corner_indices(key, limit):
+        if all(b[key] is None for b in blocks):
+            return None
+        parts = [b[key] if b[key] is not None else np.full(len(b["face_vertex"]), -1, dtype=np.int32)
+                 for b in blocks]
+        values = np.concatenate(parts)
+        values[values >= limit] = -1
+        return values
+
+    return {
+        "positions": positions,
+        "texcoords": texcoords,
+        "normals": normals,
+        "face_offsets": offsets,
+        "face_indices": face_indices,
+        "face_texcoords": corner_indices("face_texcoord", len(texcoords)),
+        "face_normals": corner_indices("face_normal", len(normals)),
+        "mtllibs": [name for b in blocks for name in b["mtllibs"]],
+    }
+
+
+def parse_obj_stream(stream, block_size=OBJ_BLOCK_SIZE, progress=None):
+    """
+    Розбирає OBJ з бінарного потоку блоками. Повертає результат merge_obj_blocks.
+    progress(bytes_done) викликається після кожного блоку (може перервати розбір винятком).
+    """
+    blocks = []
+    bases = [0, 0, 0]
+    done = 0
+    for block in iter_line_blocks(stream, block_size):
+        parsed = parse_obj_block(block, tuple(bases))
+        bases[0] += len(parsed["positions"])
+        bases[1] += len(parsed["texcoords"])
+        bases[2] += len(parsed["normals"])
+        blocks.append(parsed)
+        done += len(block)
+        if progress is not None:
+            progress(done)
+    return merge_obj_blocks(blocks)
+
+
+def parse_obj(path, block_size=OBJ_BLOCK_SIZE, progress=None, workers=None):
+    """
+    Розбирає OBJ-файл з диска (див. parse_obj_stream).
+    progress(fraction) отримує частку прочитаного файлу від 0 до 1.
+    workers — кількість процесів розбору: None — усі ядра для файлів від PARALLEL_MIN_BYTES
+    (менші — в одному процесі), 1 — завжди в одному процесі.
+    Стиснені файли (.obj.gz, .obj.xz, ...) розбираються з потоку розпакування в одному процесі.
+    """
+    if is_compressed(path):
+        with DecompressingReader(path) as stream:
+            report = None if progress is None else (lambda done: progress(stream.fraction()))
+            return parse_obj_stream(stream, block_size, report)
+    total = max(os.path.getsize(path), 1)
+    report = None if progress is None else (lambda done: progress(min(done / total, 1.0)))
+    if workers is None:
+        workers = (os.cpu_count() or 1) if total >= PARALLEL_MIN_BYTES else 1
+    if workers > 1:
+        return parse_obj_parallel(path, workers, block_size, report)
+    with open(path, "rb") as stream:
+        return parse_obj_stream(stream, block_size, report)
+
+
+# --- Паралельний розбір за діапазонами байтів ---
+class _RangeReader:
+    """
+    Обмежене читання count байтів потоку (для iter_line_blocks у межах діапазону).
+    """
+
+    def __init__(self, stream, count):
+        self.stream = stream
+        self.remaining = count
+
+    def read(self, size):
+        data = self.stream.read(min(size, self.remaining))
+        self.remaining -= len(data)
+        return data
+
+
+def line_ranges(path, count):
+    """
+    Ділить файл на (до) count діапазонів байтів [start, end), межі — на початках рядків.
+    """
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, count):
+            target = size * i // count
+            if target <= bounds[-1]:
+                continue
+            # Межа — одразу після першого '\n', що починається з байта target - 1
+            f.seek(target - 1)
+            position = target - 1
+            while True:
+                chunk = f.read(64 * 1024)
+                if not chunk:
+                    position = size
+                    break
+                cut = chunk.find(b"\n")
+                if cut >= 0:
+                    position += cut + 1
+                    break
+                position += len(chunk)
+            if bounds[-1] < position < size:
+                bounds.append(position)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _concat_range(blocks):
+    """
+    Зливає блоки одного діапазону (без перевірок меж — індекси ще локальні).
+    Номери відносних кутів зсуваються на кількість кутів попередніх блоків.
+    """
+    corners = np.cumsum([0] + [len(b["face_vertex"]) for b in blocks])
+    result = {"mtllibs": [name for b in blocks for name in b["mtllibs"]], "relative": []}
+    for key in ("positions", "texcoords", "normals", "face_sizes", "face_vertex"):
+        result[key] = np.concatenate([b[key] for b in blocks])
+    for key in ("face_texcoord", "face_normal"):
+        if all(b[key] is None for b in blocks):
+            result[key] = None
+        else:
+            result[key] = np.concatenate([b[key] if b[key] is not None
+                                          else np.full(len(b["face_vertex"]), -1, dtype=np.int32) for b in blocks])
+    for k in range(3):
+        parts = [b["relative"][k] + corners[i] for i, b in enumerate(blocks) if b["relative"][k] is not None]
+        result["relative"].append(np.concatenate(parts) if parts else None)
+    return result
+
+
+def _parse_range(path, start, end, block_size):
+    """
+    Розбирає діапазон [start, end) файлу в процесі пулу. Масиви результату пишуться
+    в один сегмент спільної пам'яті; назад (через pickle) повертається лише його опис.
+    """
+    blocks = []
+    counts = [0, 0, 0]
+    with open(path, "rb") as f:
+        f.seek(start)
+        for block in iter_line_blocks(_RangeReader(f, end - start), block_size):
+            parsed = parse_obj_block(block, tuple(counts), track_relative=True)
+            counts[0] += len(parsed["positions"])
+            counts[1] += len(parsed["texcoords"])
+            counts[2] += len(parsed["normals"])
+            blocks.append(parsed)
+    if not blocks:
+        blocks.append(parse_obj_block(b"\n", track_relative=True))
+    result = _concat_range(blocks)
+    del blocks
+
+    arrays = {key: value for key, value in result.items() if isinstance(value, np.ndarray)}
+    arrays.update({f"relative{k}": value for k, value in enumerate(result["relative"]) if value is not None})
+    layout, offset = {}, 0
+    for key, value in arrays.items():
+        layout[key] = (offset, value.dtype.str, value.shape)
+        offset += (value.nbytes + 7) // 8 * 8
+    segment = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for key, value in arrays.items():
+        np.ndarray(value.shape, dtype=value.dtype, buffer=segment.buf, offset=layout[key][0])[...] = value
+    segment.close()
+    return {"name": segment.name, "layout": layout, "mtllibs": result["mtllibs"]}
+
+
+def _shared_block(segment, shared):
+    """
+    Масиви діапазону — подання на сегмент спільної пам'яті (без копіювання).
+    """
+    block = {"mtllibs": shared["mtllibs"], "face_texcoord": None, "face_normal": None, "relative": [None] * 3}
+    for key, (offset, dtype, shape) in shared["layout"].items():
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf, offset=offset)
+        if key.startswith("relative"):
+            block["relative"][int(key[-1])] = array
+        else:
+            block[key] = array
+    return block
+
+
+def _release_shared(name):
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    segment.close()
+    segment.unlink()
+
+
+def _merge_segments(segments, results):
+    """
+    Поправки індексів і злиття діапазонів: кути з від'ємними індексами отримують
+    глобальний зсув (кількість v/vt/vn у попередніх діапазонах); додатні вже глобальні.
+    """
+    blocks = [_shared_block(segment, shared) for segment, shared in zip(segments, results)]
+    bases = [0, 0, 0]
+    for block in blocks:
+        for k, key in enumerate(("face_vertex", "face_texcoord", "face_normal")):
+            corners = block["relative"][k]
+            if corners is not None and block[key] is not None and bases[k]:
+                # uint32 переповнюється за модулем 2^32, тож сума дає правильний індекс
+                block[key][corners] += block[key].dtype.type(bases[k])
+        bases[0] += len(block["positions"])
+        bases[1] += len(block["texcoords"])
+        bases[2] += len(block["normals"])
+    return merge_obj_blocks(blocks)
+
+
+def _merge_shared(results):
+    segments = [shared_memory.SharedMemory(name=shared["name"]) for shared in results]
+    try:
+        # Подання на сегменти живуть лише всередині _merge_segments (результат — копії)
+        return _merge_segments(segments, results)
+    finally:
+        for segment in segments:
+            try:
+                segment.close()
+            except BufferError:
+                pass
+
+
+def parse_obj_parallel(path, workers, block_size=OBJ_BLOCK_SIZE, progress=None):
+    """
+    Розбирає OBJ пулом процесів: файл ділиться на діапазони по межах рядків
+    (RANGES_PER_WORKER на процес), кожен розбирається незалежно, масиви повертаються
+    через спільну пам'ять, а індекси зводяться до глобальних при злитті.
+    progress(bytes_done) — після кожного готового діапазону (може перервати розбір винятком;
+    тоді решта діапазонів скасовується, а сегменти спільної пам'яті звільняються).
+    """
+    ranges = line_ranges(path, workers * RANGES_PER_WORKER)
+    results = [None] * len(ranges)
+    # spawn — безпечно з потоками Qt (fork копіював би стан інших потоків)
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(ranges)),
+                               mp_context=multiprocessing.get_context("spawn"))
+    futures = {}
+    try:
+        futures = {pool.submit(_parse_range, path, start, end, block_size): i
+                   for i, (start, end) in enumerate(ranges)}
+        done = 0
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = future.result()
+            done += ranges[i][1] - ranges[i][0]
+            if progress is not None:
+                progress(done)
+        return _merge_shared(results)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        for future in futures:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                _release_shared(future.result()["name"])
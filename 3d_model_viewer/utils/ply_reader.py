@@ -0,0 +1,518 @@
+import warnings
+import numpy as np
+from utils.obj_parser import iter_line_blocks
+from utils.compressed import DecompressingReader, is_compressed
+
+# Типи властивостей PLY -> типи NumPy (без порядку байтів)
+PLY_TYPES = {
+    "char": "i1", "int8": "i1",
+    "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2",
+    "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4",
+    "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4",
+    "double": "f8", "float64": "f8",
+}
+
+PLY_FORMATS = {"ascii": None, "binary_little_endian": "<", "binary_big_endian": ">"}
+
+# Фрагмент потокового читання стисненого PLY (байтів розпакованих даних)
+PLY_STREAM_CHUNK = 4 * 1024 * 1024
+
+# Стартовий розмір серії однакових записів при скануванні списків змінної довжини
+_LIST_RUN = 4096
+
+# Назви властивостей вершин, що виносяться в окремі атрибути
+_NORMAL_NAMES = ("nx", "ny", "nz")
+_COLOR_NAMES = (("red", "green", "blue", "alpha"), ("r", "g", "b", "a"),
+                ("diffuse_red", "diffuse_green", "diffuse_blue", "diffuse_alpha"))
+_UV_NAMES = (("u", "v"), ("s", "t"), ("texture_u", "texture_v"), ("texture_s", "texture_t"))
+_FACE_LIST_NAMES = ("vertex_indices", "vertex_index")
+
+
+def read_ply_header(stream):
+    """
+    Розбирає заголовок PLY.
+    Повертає (format, elements, header_size), де elements — список
+    (name, count, properties); властивість — (name, dtype) для скаляра
+    або (name, count_dtype, item_dtype) для списку.
+    """
+    if stream.readline().strip() != b"ply":
+        raise ValueError("PLY: файл не починається з 'ply'")
+    fmt = None
+    elements = []
+    while True:
+        line = stream.readline()
+        if not line:
+            raise ValueError("PLY: не знайдено end_header")
+        parts = line.decode("ascii", errors="replace").split()
+        if not parts or parts[0] in ("comment", "obj_info"):
+            continue
+        if parts[0] == "end_header":
+            break
+        if parts[0] == "format":
+            if parts[1] not in PLY_FORMATS:
+                raise ValueError(f"PLY: непідтримуваний формат {parts[1]}")
+            fmt = parts[1]
+        elif parts[0] == "element":
+            elements.append((parts[1], int(parts[2]), []))
+        elif parts[0] == "property":
+            if not elements:
+                raise ValueError("PLY: властивість поза елементом")
+            if parts[1] == "list":
+                elements[-1][2].append((parts[4], PLY_TYPES[parts[2]], PLY_TYPES[parts[3]]))
+            else:
+                elements[-1][2].append((parts[2], PLY_TYPES[parts[1]]))
+    if fmt is None:
+        raise ValueError("PLY: у заголовку відсутній format")
+    return fmt, elements, stream.tell()
+
+
+def _gather(buffer, positions, dtype):
+    """
+    Читає значення типу dtype з довільних байтових позицій буфера.
+    """
+    dtype = np.dtype(dtype)
+    if len(positions) == 0:
+        return np.empty(0, dtype=dtype)
+    index = positions[:, None] + np.arange(dtype.itemsize)
+    return np.ascontiguousarray(buffer[index]).view(dtype).reshape(len(positions))
+
+
+def _record_signature(buffer, position, properties, order):
+    """
+    Кількості елементів у списках одного запису та розмір запису в байтах.
+    None — запис не вміщується у буфер повністю.
+    """
+    counts = []
+    offset = position
+    for prop in properties:
+        if len(prop) == 2:
+            offset += np.dtype(prop[1]).itemsize
+        else:
+            count_type = np.dtype(order + prop[1])
+            if offset + count_type.itemsize > len(buffer):
+                return None
+            count = int(buffer[offset:offset + count_type.itemsize].view(count_type)[0])
+            offset += count_type.itemsize + count * np.dtype(prop[2]).itemsize
+            counts.append(count)
+    if offset > len(buffer):
+        return None
+    return tuple(counts), offset - position
+
+
+def _list_count_positions(properties, signature):
+    """
+    Зміщення полів кількості всередині запису для заданої сигнатури списків.
+    """
+    positions = []
+    offset = 0
+    counts = iter(signature)
+    for prop in properties:
+        if len(prop) == 2:
+            offset += np.dtype(prop[1]).itemsize
+        else:
+            positions.append(offset)
+            offset += np.dtype(prop[1]).itemsize + next(counts) * np.dtype(prop[2]).itemsize
+    return positions
+
+
+def _scan_list_records(buffer, offset, count, properties, order, partial=False):
+    """
+    Знаходить початки записів елемента зі списками змінної довжини.
+    Записи обробляються серіями: беремо сигнатуру поточного запису і векторизовано
+    перевіряємо, скільки наступних записів мають таку саму; серія росте вдвічі,
+    поки збігається. Повертає (record_offsets, list_counts (count, lists), end_offset).
+    partial — буфер може містити лише частину записів (потокове читання):
+    сканування зупиняється на першому неповному записі, масиви коротші за count.
+    """
+    list_types = [np.dtype(order + prop[1]) for prop in properties if len(prop) == 3]
+    record_offsets = np.empty(count, dtype=np.int64)
+    list_counts = np.empty((count, len(list_types)), dtype=np.int64)
+    done = 0
+    position = offset
+    run = _LIST_RUN
+    while done < count:
+        record = _record_signature(buffer, position, properties, order)
+        if record is None:
+            if partial:
+                break
+            raise ValueError("PLY: файл обірвався")
+        signature, record_size = record
+        size = min(run, count - done)
+        # Серія не може виходити за межі файлу
+        size = max(1, min(size, (len(buffer) - position) // max(record_size, 1)))
+        candidates = position + np.arange(size, dtype=np.int64) * record_size
+        matches = np.ones(size, dtype=bool)
+        for count_pos, count_type, expected in zip(_list_count_positions(properties, signature),
+                                                   list_types, signature):
+            matches &= _gather(buffer, candidates + count_pos, count_type) == expected
+        accepted = size if matches.all() else int(np.argmin(matches))
+        accepted = max(accepted, 1)
+        record_offsets[done:done + accepted] = candidates[:accepted]
+        list_counts[done:done + accepted] = signature
+        done += accepted
+        position += accepted * record_size
+        run = run * 2 if accepted == size else _LIST_RUN
+    return record_offsets[:done], list_counts[:done], position
+
+
+def _gather_records(buffer, record_offsets, list_counts, properties, order):
+    """
+    Збирає властивості записів із відомими початками (див. _scan_list_records):
+    скаляри — масиви, списки — CSR-кортежі (offsets, values).
+    """
+    count = len(record_offsets)
+    result = {}
+    cursor = record_offsets.copy()
+    list_index = 0
+    for prop in properties:
+        if len(prop) == 2:
+            item_type = np.dtype(order + prop[1])
+            result[prop[0]] = _gather(buffer, cursor, item_type)
+            cursor += item_type.itemsize
+            continue
+        cursor += np.dtype(prop[1]).itemsize
+        item_type = np.dtype(order + prop[2])
+        sizes = list_counts[:, list_index]
+        list_offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(sizes, out=list_offsets[1:])
+        item_positions = (np.repeat(cursor, sizes)
+                          + (np.arange(list_offsets[-1]) - np.repeat(list_offsets[:-1], sizes)) * item_type.itemsize)
+        result[prop[0]] = (list_offsets, _gather(buffer, item_positions, item_type))
+        cursor += sizes * item_type.itemsize
+        list_index += 1
+    return result
+
+
+def _read_binary_element(buffer, offset, count, properties, order):
+    """
+    Читає елемент бінарного PLY. Повертає (словник властивостей, кінцеве зміщення).
+    Скалярні властивості та списки фіксованої довжини — це view на memmap без копіювання;
+    списки змінної довжини повертаються як CSR-кортеж (offsets, values).
+    """
+    has_lists = any(len(prop) == 3 for prop in properties)
+    if not has_lists:
+        dtype = np.dtype([(prop[0], order + prop[1]) for prop in properties])
+        if offset + count * dtype.itemsize > len(buffer):
+            raise ValueError("PLY: файл обірвався")
+        records = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        return {prop[0]: records[prop[0]] for prop in properties}, offset + count * dtype.itemsize
+
+    if count == 0:
+        return {prop[0]: np.empty(0, dtype=prop[1]) if len(prop) == 2 else
+                (np.zeros(1, dtype=np.int64), np.empty(0, dtype=prop[2])) for prop in properties}, offset
+
+    # Швидкий шлях: усі списки мають ту саму довжину, що й у першому записі
+    record = _record_signature(buffer, offset, properties, order)
+    if record is None:
+        raise ValueError("PLY: файл обірвався")
+    signature, record_size = record
+    if offset + count * record_size <= len(buffer):
+        counts = iter(signature)
+        fields = []
+        for prop in properties:
+            if len(prop) == 2:
+                fields.append((prop[0], order + prop[1]))
+            else:
+                fields.append(("__count_" + prop[0], order + prop[1]))
+                fields.append((prop[0], order + prop[2], (next(counts),)))
+        dtype = np.dtype(fields)
+        records = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        lists = [prop for prop in properties if len(prop) == 3]
+        if all((records["__count_" + prop[0]] == expected).all() for prop, expected in zip(lists, signature)):
+            return {prop[0]: records[prop[0]] for prop in properties}, offset + count * record_size
+
+    # Загальний шлях: списки змінної довжини
+    record_offsets, list_counts, end = _scan_list_records(buffer, offset, count, properties, order)
+    return _gather_records(buffer, record_offsets, list_counts, properties, order), end
+
+
+def _content_lines(data):
+    """
+    Початки й кінці непорожніх рядків ASCII-тіла (кінець — позиція '\n' або кінця даних).
+    """
+    ends = np.flatnonzero(data == 10)
+    if len(data) and data[-1] != 10:
+        ends = np.append(ends, len(data))
+    starts = np.concatenate([[0], ends[:-1] + 1]).astype(np.int64) if len(ends) else ends
+    # Порожні рядки пропускаємо
+    if len(starts):
+        space = (data == 32) | (data == 9) | (data == 10) | (data == 13)
+        content = np.add.reduceat((~space).view(np.uint8), np.minimum(starts, len(data) - 1), dtype=np.int64)
+        content[ends == starts] = 0
+        starts, ends = starts[content > 0], ends[content > 0]
+    return starts, ends
+
+
+def _read_ascii_elements(body, elements):
+    """
+    Векторизоване читання ASCII-тіла PLY (одна властивість-список на елемент).
+    """
+    data = np.frombuffer(body, dtype=np.uint8)
+    text = body.replace(b"\r", b" ")
+    starts, ends = _content_lines(data)
+
+    result = {}
+    line = 0
+    for name, count, properties in elements:
+        lines = slice(line, line + count)
+        line += count
+        if count == 0:
+            result[name] = _read_binary_element(np.empty(0, np.uint8), 0, 0, properties, "<")[0]
+            continue
+        s, e = int(starts[lines][0]), int(ends[lines][-1])
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            values = np.fromstring(text[s:e], dtype=np.float64, sep=" ")
+        lists = [i for i, prop in enumerate(properties) if len(prop) == 3]
+        if not lists:
+            if len(values) != count * len(properties):
+                raise ValueError(f"PLY: некоректні дані елемента {name}")
+            table = values.reshape(count, len(properties))
+            result[name] = {prop[0]: table[:, i].astype(prop[1]) for i, prop in enumerate(properties)}
+            continue
+        if len(lists) > 1:
+            raise ValueError(f"PLY: ASCII-елемент {name} з кількома списками не підтримується")
+
+        # Кількість токенів у кожному рядку
+        chunk = data[s:e]
+        space = (chunk == 32) | (chunk == 9) | (chunk == 10) | (chunk == 13)
+        token_start = ~space
+        token_start[1:] &= space[:-1]
+        per_line = np.add.reduceat(token_start.view(np.uint8), starts[lines] - s, dtype=np.int64)
+        if per_line.sum() != len(values):
+            raise ValueError(f"PLY: некоректні дані елемента {name}")
+        first = np.cumsum(per_line) - per_line
+        before = lists[0]
+        after = len(properties) - before - 1
+        sizes = values[first + before].astype(np.int64)
+        if not (sizes == per_line - before - after - 1).all():
+            raise ValueError(f"PLY: довжини списків елемента {name} не збігаються")
+        element = {}
+        for i, prop in enumerate(properties):
+            if i < before:
+                element[prop[0]] = values[first + i].astype(prop[1])
+            elif i > before:
+                element[prop[0]] = values[first + per_line - (len(properties) - i)].astype(prop[1])
+        list_offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(sizes, out=list_offsets[1:])
+        item_positions = (np.repeat(first + before + 1, sizes)
+                          + np.arange(list_offsets[-1]) - np.repeat(list_offsets[:-1], sizes))
+        element[properties[before][0]] = (list_offsets, values[item_positions].astype(properties[before][2]))
+        result[name] = element
+    return result
+
+
+def _empty_element(properties):
+    return _read_binary_element(np.empty(0, np.uint8), 0, 0, properties, "<")[0]
+
+
+def _concat_batches(batches, properties):
+    """
+    Склеює властивості елемента, прочитаного частинами (скаляри та CSR-списки).
+    """
+    if not batches:
+        return _empty_element(properties)
+    if len(batches) == 1:
+        return batches[0]
+    result = {}
+    for prop in properties:
+        parts = [batch[prop[0]] for batch in batches]
+        if len(prop) == 2:
+            result[prop[0]] = np.concatenate(parts)
+            continue
+        parts = [list_property_to_csr(part) for part in parts]
+        bases = np.cumsum([0] + [offsets[-1] for offsets, _ in parts[:-1]])
+        offsets = np.concatenate([parts[0][0][:1]] + [offsets[1:] + base for (offsets, _), base in zip(parts, bases)])
+        result[prop[0]] = (offsets, np.concatenate([values for _, values in parts]))
+    return result
+
+
+def _read_stream_scalars(stream, pending, count, dtype):
+    """
+    Елемент лише зі скалярами з потоку: байти записів читаються одразу
+    у структурований масив результату. Повертає (records, залишок pending).
+    """
+    records = np.empty(count, dtype=dtype)
+    out = records.view(np.uint8)
+    head = min(len(pending), len(out))
+    out[:head] = np.frombuffer(pending, dtype=np.uint8, count=head)
+    filled = head
+    while filled < len(out):
+        data = stream.read(min(PLY_STREAM_CHUNK, len(out) - filled))
+        if not data:
+            raise ValueError("PLY: файл обірвався")
+        out[filled:filled + len(data)] = np.frombuffer(data, dtype=np.uint8)
+        filled += len(data)
+    return records, pending[head:]
+
+
+def _read_stream_lists(stream, pending, count, properties, order):
+    """
+    Елемент зі списками з потоку: фрагменти по PLY_STREAM_CHUNK байтів, у кожному
+    розбираються повні записи, неповний останній переноситься у наступний фрагмент.
+    Повертає (властивості, залишок pending — уже початок наступного елемента).
+    """
+    # Найменший можливий запис: скаляри та поля кількості порожніх списків
+    min_size = max(sum(np.dtype(prop[1]).itemsize for prop in properties), 1)
+    batches = []
+    done = 0
+    while done < count:
+        chunk = stream.read(PLY_STREAM_CHUNK)
+        data = pending + chunk if pending else chunk
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        limit = min(count - done, len(buffer) // min_size)
+        record_offsets, list_counts, end = _scan_list_records(buffer, 0, limit, properties, order, partial=True)
+        if len(record_offsets) == 0:
+            if not chunk:
+                raise ValueError("PLY: файл обірвався")
+            pending = data
+            continue
+        batches.append(_gather_records(buffer, record_offsets, list_counts, properties, order))
+        done += len(record_offsets)
+        pending = data[end:]
+    return _concat_batches(batches, properties), pending
+
+
+def _read_binary_stream(stream, elements, order):
+    """
+    Бінарне тіло PLY з потоку (після заголовка); пам'ять — результат плюс один фрагмент.
+    """
+    parsed = {}
+    pending = b""
+    for name, count, properties in elements:
+        if any(len(prop) == 3 for prop in properties):
+            parsed[name], pending = _read_stream_lists(stream, pending, count, properties, order)
+        else:
+            dtype = np.dtype([(prop[0], order + prop[1]) for prop in properties])
+            records, pending = _read_stream_scalars(stream, pending, count, dtype)
+            parsed[name] = {prop[0]: records[prop[0]] for prop in properties}
+    return parsed
+
+
+def _read_ascii_stream(stream, elements):
+    """
+    ASCII-тіло PLY з потоку: блоки цілих рядків, кожен елемент — частинами через _read_ascii_elements.
+    """
+    blocks = iter_line_blocks(stream, PLY_STREAM_CHUNK)
+    rest = b""
+    parsed = {}
+    for name, count, properties in elements:
+        batches = []
+        left = count
+        while left > 0:
+            if not rest:
+                rest = next(blocks, b"")
+                if not rest:
+                    raise ValueError(f"PLY: файл обірвався в елементі {name}")
+            ends = _content_lines(np.frombuffer(rest, dtype=np.uint8))[1]
+            take = min(left, len(ends))
+            cut = int(ends[take - 1]) + 1 if take < len(ends) else len(rest)
+            if take:
+                batches.append(_read_ascii_elements(rest[:cut], [(name, take, properties)])[name])
+            rest = rest[cut:]
+            left -= take
+        parsed[name] = _concat_batches(batches, properties)
+    return parsed
+
+
+def list_property_to_csr(value):
+    """
+    Приводить властивість-список до CSR: (offsets, values).
+    """
+    if isinstance(value, tuple):
+        return value
+    count, width = value.shape
+    return np.arange(count + 1, dtype=np.int64) * width, value.reshape(-1)
+
+
+def _stack_properties(element, names, dtype):
+    """
+    Збирає кілька скалярних властивостей у масив (N, len(names)) або None.
+    Якщо властивості лежать поруч у записі memmap і вже мають потрібний тип,
+    повертається view без копіювання.
+    """
+    if element is None or not all(name in element for name in names):
+        return None
+    columns = [element[name] for name in names]
+    first = columns[0]
+    dtype = np.dtype(dtype)
+    addresses = [column.__array_interface__["data"][0] for column in columns]
+    if (first.ndim == 1 and len(first) > 0 and all(column.dtype == dtype for column in columns)
+            and dtype.isnative and all(column.strides == first.strides for column in columns)
+            and all(b - a == dtype.itemsize for a, b in zip(addresses, addresses[1:]))):
+        return np.lib.stride_tricks.as_strided(
+            first, shape=(len(first), len(columns)), strides=(first.strides[0], dtype.itemsize), writeable=False)
+    return np.stack(columns, axis=1).astype(dtype, copy=False)
+
+
+def read_ply(path):
+    """
+    Читає PLY (ascii, binary_little_endian, binary_big_endian) без trimesh.
+    Бінарні дані відображаються у пам'ять (memmap) і читаються як структуровані
+    NumPy-view, без Python-об'єктів на кожну вершину. Стиснені файли (.ply.gz, ...)
+    розбираються з потоку розпакування фрагментами по PLY_STREAM_CHUNK байтів.
+    Повертає словник: positions (N, 3) float32, normals / colors / texcoords (або None),
+    face_offsets / face_indices (CSR граней) та elements — усі властивості всіх елементів.
+    """
+    if is_compressed(path):
+        with DecompressingReader(path) as stream:
+            fmt, elements, _ = read_ply_header(stream)
+            if fmt == "ascii":
+                parsed = _read_ascii_stream(stream, elements)
+            else:
+                parsed = _read_binary_stream(stream, elements, PLY_FORMATS[fmt])
+    else:
+        with open(path, "rb") as stream:
+            fmt, elements, header_size = read_ply_header(stream)
+            if fmt == "ascii":
+                parsed = _read_ascii_elements(stream.read(), elements)
+
+        if fmt != "ascii":
+            order = PLY_FORMATS[fmt]
+            buffer = np.memmap(path, dtype=np.uint8, mode="r")
+            parsed = {}
+            offset = header_size
+            for name, count, properties in elements:
+                parsed[name], offset = _read_binary_element(buffer, offset, count, properties, order)
+
+    vertex = parsed.get("vertex")
+    if vertex is None or not all(name in vertex for name in ("x", "y", "z")):
+        raise ValueError("PLY: відсутні координати вершин")
+    positions = _stack_properties(vertex, ("x", "y", "z"), np.float32)
+
+    colors = None
+    for names in _COLOR_NAMES:
+        present = tuple(name for name in names if name in vertex)
+        if len(present) >= 3:
+            colors = _stack_properties(vertex, present, vertex[present[0]].dtype.newbyteorder("="))
+            break
+    texcoords = None
+    for names in _UV_NAMES:
+        texcoords = _stack_properties(vertex, names, np.float32)
+        if texcoords is not None:
+            break
+
+    face_offsets = np.zeros(1, dtype=np.int64)
+    face_indices = np.empty(0, dtype=np.uint32)
+    face = parsed.get("face")
+    if face is not None:
+        for name in _FACE_LIST_NAMES:
+            if name in face:
+                face_offsets, values = list_property_to_csr(face[name])
+                face_indices = np.ascontiguousarray(values, dtype=np.uint32)
+                break
+    if len(face_indices) and int(face_indices.max()) >= len(positions):
+        raise ValueError("PLY: індекс вершини грані поза межами")
+
+    return {
+        "positions": positions,
+        "normals": _stack_properties(vertex, _NORMAL_NAMES, np.float32),
+        "colors": colors,
+        "texcoords": texcoords,
+        "face_offsets": face_offsets,
+        "face_indices": face_indices,
+        "elements": parsed,
+    }
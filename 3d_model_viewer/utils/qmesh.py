@@ -0,0 +1,348 @@
+import json
+import mmap
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from utils.normals import fan_triangulate
+
+QMESH_EXTENSION = ".qmesh"
+QMESH_MAGIC = b"QMSH"
+QMESH_VERSION = 1
+# Розмір фрагментів (кожен стискається і розпаковується незалежно)
+CHUNK_VERTICES = 1 << 16
+CHUNK_INDICES = 1 << 18
+COMPRESSION_LEVEL = 6
+# Розрядність квантування позицій (у межах bbox) і октаедричних нормалей
+POSITION_MAX = 65535
+NORMAL_MAX = 32767
+
+_PREAMBLE = np.dtype([("magic", "S4"), ("version", "<u4")])
+_TRAILER = np.dtype([("footer_offset", "<u8"), ("magic", "S4")])
+
+
+class QMeshError(ValueError):
+    """
+    Пошкоджений або несумісний файл .qmesh.
+    """
+
+
+# --- Квантування ---
+def quantize_positions(positions, bbox=None):
+    """
+    Позиції -> uint16 у межах bbox. Повертає (quantized (N, 3), offset (3,), scale (3,)),
+    де позиція = offset + scale * quantized / 65535.
+    """
+    positions = np.asarray(positions, dtype=np.float32)
+    if bbox is None:
+        bbox = (positions.min(axis=0), positions.max(axis=0))
+    offset = np.asarray(bbox[0], dtype=np.float32)
+    scale = (np.asarray(bbox[1], dtype=np.float64) - offset).astype(np.float32)
+    safe = np.where(scale > 0, scale, np.float32(1.0))
+    quantized = np.rint((positions - offset) * (POSITION_MAX / safe))
+    return np.clip(quantized, 0, POSITION_MAX).astype(np.uint16), offset, scale
+
+
+def dequantize_positions(quantized, offset, scale):
+    return (np.asarray(offset, dtype=np.float32)
+            + quantized.astype(np.float32) * (np.asarray(scale, dtype=np.float32) / POSITION_MAX))
+
+
+def octahedral_encode(normals):
+    """
+    Одиничні нормалі (N, 3) -> октаедричне подання (N, 2) int16 (snorm16).
+    Нульові нормалі кодуються як (0, 0, 1).
+    """
+    normals = np.asarray(normals, dtype=np.float32)
+    norm1 = np.abs(normals).sum(axis=1)
+    zero = norm1 == 0
+    norm1[zero] = 1.0
+    x = normals[:, 0] / norm1
+    y = normals[:, 1] / norm1
+    x[zero] = y[zero] = 0.0
+    lower = (normals[:, 2] < 0) & ~zero
+    sign_x = np.where(x >= 0, 1.0, -1.0).astype(np.float32)
+    sign_y = np.where(y >= 0, 1.0, -1.0).astype(np.float32)
+    folded_x = (1.0 - np.abs(y)) * sign_x
+    folded_y = (1.0 - np.abs(x)) * sign_y
+    x = np.where(lower, folded_x, x)
+    y = np.where(lower, folded_y, y)
+    encoded = np.rint(np.clip(np.stack([x, y], axis=1), -1.0, 1.0) * NORMAL_MAX)
+    return encoded.astype(np.int16)
+
+
+def octahedral_decode(encoded):
+    """
+    Октаедричне подання (N, 2) int16 -> одиничні нормалі (N, 3) float32 (як у вершинному шейдері).
+    """
+    xy = np.maximum(np.asarray(encoded, dtype=np.float32) / NORMAL_MAX, -1.0)
+    x, y = xy[:, 0], xy[:, 1]
+    z = 1.0 - np.abs(x) - np.abs(y)
+    t = np.clip(-z, 0.0, 1.0)
+    x = x + np.where(x >= 0, -t, t)
+    y = y + np.where(y >= 0, -t, t)
+    normals = np.stack([x, y, z], axis=1)
+    lengths = np.linalg.norm(normals, axis=1)
+    lengths[lengths == 0] = 1.0
+    return (normals / lengths[:, None]).astype(np.float32)
+
+
+# --- Кодування потоків ---
+def varint_encode(values):
+    """
+    Беззнакові цілі (< 2^35) -> LEB128 varint (7 біт на байт, старший біт — продовження).
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    for bits in (7, 14, 21, 28):
+        lengths += values >= (1 << bits)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    out = np.empty(int(ends[-1]) if len(ends) else 0, dtype=np.uint8)
+    for k in range(5):
+        mask = lengths > k
+        if not mask.any():
+            break
+        byte = (values[mask] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (lengths[mask] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[mask] + k] = (byte | more).astype(np.uint8)
+    return out
+
+
+def varint_decode(data, count):
+    """
+    LEB128 varint -> count беззнакових цілих (uint64).
+    """
+    data = np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(data < 0x80)
+    if len(ends) != count:
+        raise QMeshError(f"varint: очікувалось {count} значень, знайдено {len(ends)}")
+    if count == 0:
+        return np.empty(0, dtype=np.uint64)
+    starts = np.empty(count, dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    position = np.arange(len(data), dtype=np.int64) - np.repeat(starts, ends - starts + 1)
+    payload = (data & 0x7F).astype(np.uint64) << (7 * position).astype(np.uint64)
+    return np.add.reduceat(payload, starts)
+
+
+def encode_deltas(values):
+    """
+    Індекси -> різниці з попереднім (від 0) -> zigzag -> varint.
+    """
+    deltas = np.diff(np.asarray(values, dtype=np.int64), prepend=0)
+    return varint_encode((deltas << 1) ^ (deltas >> 63))
+
+
+def decode_deltas(data, count):
+    zigzag = varint_decode(data, count).astype(np.int64)
+    return np.cumsum((zigzag >> 1) ^ -(zigzag & 1))
+
+
+def _encode_planes(values):
+    """
+    16-бітні атрибути вершин (N, C): різниці між сусідніми вершинами (з переповненням)
+    і розкладка по байтових площинах — так zlib стискає значно краще.
+    """
+    values = np.ascontiguousarray(values).view(np.uint16)
+    deltas = np.diff(values, axis=0, prepend=np.zeros((1, values.shape[1]), dtype=np.uint16))
+    return np.ascontiguousarray(deltas.view(np.uint8).reshape(len(values), -1).T)
+
+
+def _decode_planes(data, count, components, dtype):
+    planes = np.frombuffer(data, dtype=np.uint8).reshape(components * 2, count)
+    deltas = np.ascontiguousarray(planes.T).view(np.uint16).reshape(count, components)
+    return np.cumsum(deltas, axis=0, dtype=np.uint16).view(dtype)
+
+
+def triangle_fans(face_offsets, face_indices, triangles, triangle_faces):
+    """
+    Для кожного трикутника потоку — його номер k у віялі своєї грані (вершини 0, k+1, k+2).
+    Оптимізація лише переставляє fan-трикутники, тож замість трьох індексів досить k.
+    Повертає k (uint32) або None, якщо потік не є переставленою fan-тріангуляцією граней.
+    """
+    triangles = np.asarray(triangles).reshape(-1, 3)
+    faces = np.asarray(triangle_faces, dtype=np.int64)
+    fan, fan_faces = fan_triangulate(face_offsets, face_indices)
+    if len(fan) != len(triangles) or len(faces) != len(triangles) or len(fan) == 0:
+        return None
+    counts = np.bincount(fan_faces, minlength=len(face_offsets) - 1)
+    fan_k = np.arange(len(fan), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    # Відповідність трикутників потоку і віяла: за (грань, друга вершина)
+    fans = np.empty(len(triangles), dtype=np.int64)
+    fans[np.lexsort((triangles[:, 1], faces))] = fan_k[np.lexsort((fan[:, 1], fan_faces))]
+    if not np.array_equal(fan_triangles(face_offsets, face_indices, faces, fans), triangles):
+        return None
+    return fans.astype(np.uint32)
+
+
+def fan_triangles(face_offsets, face_indices, triangle_faces, fans):
+    """
+    Трикутники (T, 3) з номерів граней і номерів у віялі (обернене до triangle_fans).
+    """
+    base = np.asarray(face_offsets)[np.asarray(triangle_faces, dtype=np.int64)]
+    fans = np.asarray(fans, dtype=np.int64)
+    return face_indices[np.stack([base, base + fans + 1, base + fans + 2], axis=1)]
+
+
+# --- Файл ---
+def _chunked(total, size):
+    return [(start, min(start + size, total)) for start in range(0, total, size)]
+
+
+def write_qmesh(f, positions, face_offsets, face_indices, normals=None, triangles=None,
+                triangle_faces=None, optimized=False, bbox=None, level=COMPRESSION_LEVEL, progress=None):
+    """
+    Пише модель у контейнер .qmesh (f — двійковий файл, відкритий з початку):
+    позиції (uint16 у bbox), октаедричні нормалі, індекси (delta + zigzag + varint),
+    кожен потік — незалежні zlib-фрагменти. triangles/triangle_faces — необов'язковий
+    готовий потік трикутників (зберігаються номери граней і номери у віялі, якщо можливо);
+    optimized — порядок вершин і трикутників уже оптимізований.
+    Індекс фрагментів пишеться в кінці, тож запис іде одним проходом.
+    progress(fraction) викликається після кожного фрагмента.
+    """
+    positions = np.asarray(positions, dtype=np.float32)
+    face_offsets = np.asarray(face_offsets, dtype=np.int64)
+    quantized, offset, scale = quantize_positions(positions, bbox)
+    sizes = np.diff(face_offsets)
+    jobs = [("positions", quantized, CHUNK_VERTICES, "planes16")]
+    if normals is not None:
+        jobs.append(("normals", octahedral_encode(normals), CHUNK_VERTICES, "planes16"))
+    if len(sizes) and not (sizes == 3).all():
+        jobs.append(("face_sizes", sizes, CHUNK_INDICES, "varint"))
+    jobs.append(("face_indices", face_indices, CHUNK_INDICES, "delta_varint"))
+    if triangles is not None:
+        fans = None
+        if triangle_faces is not None:
+            jobs.append(("triangle_faces", triangle_faces, CHUNK_INDICES, "delta_varint"))
+            fans = triangle_fans(face_offsets, face_indices, triangles, triangle_faces)
+        if fans is not None:
+            jobs.append(("triangle_fans", fans, CHUNK_INDICES, "varint"))
+        else:
+            jobs.append(("triangles", np.asarray(triangles).reshape(-1), CHUNK_INDICES, "delta_varint"))
+    total = sum(len(array) for _, array, _, _ in jobs) or 1
+
+    header = {
+        "vertex_count": len(positions), "face_count": len(sizes), "optimized": bool(optimized),
+        "quantization": {"offset": offset.tolist(), "scale": scale.tolist(), "max": POSITION_MAX},
+        "streams": {},
+    }
+    done = 0
+    f.write(np.array([(QMESH_MAGIC, QMESH_VERSION)], dtype=_PREAMBLE).tobytes())
+    for name, array, chunk_size, encoding in jobs:
+        stream = {"encoding": encoding, "count": len(array), "chunks": []}
+        if encoding == "planes16":
+            stream["components"] = array.shape[1]
+            stream["dtype"] = array.dtype.str
+        for start, end in _chunked(len(array), chunk_size):
+            block = array[start:end]
+            if encoding == "planes16":
+                raw = _encode_planes(block)
+            elif encoding == "varint":
+                raw = varint_encode(block)
+            else:
+                raw = encode_deltas(block)
+            data = zlib.compress(raw.tobytes(), level)
+            stream["chunks"].append([f.tell(), len(data), end - start])
+            f.write(data)
+            done += end - start
+            if progress is not None:
+                progress(done / total)
+        header["streams"][name] = stream
+    footer_offset = f.tell()
+    f.write(json.dumps(header, separators=(",", ":")).encode("utf-8"))
+    f.write(np.array([(footer_offset, QMESH_MAGIC)], dtype=_TRAILER).tobytes())
+
+
+def read_qmesh_header(buffer):
+    """
+    Заголовок (індекс фрагментів) з кінця файлу.
+    """
+    if len(buffer) < _PREAMBLE.itemsize + _TRAILER.itemsize:
+        raise QMeshError("qmesh: файл закороткий")
+    preamble = np.frombuffer(buffer, dtype=_PREAMBLE, count=1)[0]
+    trailer = np.frombuffer(buffer, dtype=_TRAILER, count=1, offset=len(buffer) - _TRAILER.itemsize)[0]
+    if preamble["magic"] != QMESH_MAGIC or trailer["magic"] != QMESH_MAGIC:
+        raise QMeshError("qmesh: невірна сигнатура")
+    if preamble["version"] != QMESH_VERSION:
+        raise QMeshError(f"qmesh: непідтримувана версія {preamble['version']}")
+    return json.loads(bytes(buffer[int(trailer["footer_offset"]):len(buffer) - _TRAILER.itemsize]))
+
+
+def _decode_chunk(buffer, stream, chunk, out, start):
+    offset, nbytes, count = chunk
+    raw = zlib.decompress(buffer[offset:offset + nbytes])
+    encoding = stream["encoding"]
+    if encoding == "planes16":
+        out[start:start + count] = _decode_planes(raw, count, stream["components"], np.dtype(stream["dtype"]))
+    elif encoding == "varint":
+        out[start:start + count] = varint_decode(raw, count)
+    else:
+        out[start:start + count] = decode_deltas(raw, count)
+
+
+def read_qmesh(path, workers=None):
+    """
+    Читає .qmesh: фрагменти всіх потоків розпаковуються паралельно (zlib і NumPy
+    відпускають GIL) прямо у вихідні масиви.
+    Повертає словник: quantized_positions (N, 3) uint16, position_offset/position_scale,
+    positions (N, 3) float32, quantized_normals (N, 2) int16 і normals (або None),
+    face_offsets, face_indices, triangles/triangle_faces (або None), optimized.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            raise QMeshError("qmesh: порожній файл")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            buffer = memoryview(mapped)
+            try:
+                header = read_qmesh_header(buffer)
+                outputs = {}
+                tasks = []
+                for name, stream in header["streams"].items():
+                    if stream["encoding"] == "planes16":
+                        out = np.empty((stream["count"], stream["components"]), dtype=np.dtype(stream["dtype"]))
+                    else:
+                        out = np.empty(stream["count"], dtype=np.int64 if name == "face_sizes" else np.uint32)
+                    outputs[name] = out
+                    start = 0
+                    for chunk in stream["chunks"]:
+                        tasks.append((stream, chunk, out, start))
+                        start += chunk[2]
+                with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+                    for future in [pool.submit(_decode_chunk, buffer, *task) for task in tasks]:
+                        future.result()
+            except (zlib.error, KeyError, ValueError) as e:
+                raise QMeshError(f"qmesh: пошкоджений файл ({e})") from e
+            finally:
+                buffer.release()
+
+    quantization = header["quantization"]
+    offset = np.asarray(quantization["offset"], dtype=np.float32)
+    scale = np.asarray(quantization["scale"], dtype=np.float32)
+    quantized = outputs["positions"]
+    face_count = header["face_count"]
+    sizes = outputs.get("face_sizes")
+    if sizes is None:
+        face_offsets = np.arange(face_count + 1, dtype=np.int64) * 3
+    else:
+        face_offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+    quantized_normals = outputs.get("normals")
+    triangles = outputs.get("triangles")
+    if "triangle_fans" in outputs:
+        triangles = fan_triangles(face_offsets, outputs["face_indices"], outputs["triangle_faces"],
+                                  outputs["triangle_fans"]).reshape(-1)
+    return {
+        "quantized_positions": quantized,
+        "position_offset": offset,
+        "position_scale": scale,
+        "positions": dequantize_positions(quantized, offset, scale),
+        "quantized_normals": quantized_normals,
+        "normals": None if quantized_normals is None else octahedral_decode(quantized_normals),
+        "face_offsets": face_offsets,
+        "face_indices": outputs["face_indices"],
+        "triangles": triangles,
+        "triangle_faces": outputs.get("triangle_faces"),
+        "optimized": header.get("optimized", False),
+    }
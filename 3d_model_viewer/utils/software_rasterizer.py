@@ -0,0 +1,171 @@
+import numpy as np
+from utils.lighting import lambert
+from utils.transforms import orbit_matrices, light_vector, frame_bbox
+
+# Скільки пікселів-кандидатів обробляється за один пакет (обмежує пам'ять)
+RASTER_BATCH_PIXELS = 1 << 22
+# Вершини ближче за цю w (позаду камери) — трикутник відкидається (без відсікання площиною)
+MIN_CLIP_W = 1e-6
+
+DEFAULT_BACKGROUND = (0.93, 1, 0.93, 1.0)
+DEFAULT_AZIMUTH = 45.0
+DEFAULT_ELEVATION = 20.0
+DEFAULT_LIGHT = (45.0, 45.0)
+
+
+def _transform_normals(normals, model):
+    normals = np.asarray(normals, dtype=np.float32) @ np.asarray(model, dtype=np.float32)[:3, :3].T
+    lengths = np.linalg.norm(normals, axis=1)
+    lengths[lengths == 0] = 1.0
+    return normals / lengths[:, None]
+
+
+def rasterize(positions, normals, triangles, model, view, projection, width, height, light_dir,
+              background=DEFAULT_BACKGROUND, smooth=True, batch_pixels=RASTER_BATCH_PIXELS):
+    """
+    Програмний z-буфер (для машин без OpenGL): рендер трикутників (T, 3) у масив
+    (height, width, 4) uint8, перший рядок — верх. Трикутники обробляються пакетами:
+    для пакета векторно генеруються всі пікселі їхніх обмежувальних прямокутників.
+    Освітлення — як у fixed-function шляху (Ламберт, utils.lighting).
+    Матриці — рядкові 4x4, як у шейдерному шляху. smooth: кольори вершин
+    інтерполюються (як GL_SMOOTH); інакше — одна нормаль на трикутник, повернута до камери
+    (як плоский шейдинг через похідні у фрагментному шейдері).
+    """
+    image = np.empty((height * width, 4), dtype=np.uint8)
+    image[:] = np.round(np.asarray(background, dtype=np.float64) * 255).astype(np.uint8)
+    triangles = np.asarray(triangles).reshape(-1, 3)
+    if len(triangles) == 0:
+        return image.reshape(height, width, 4)
+    positions = np.asarray(positions, dtype=np.float32)
+    mvp = (np.asarray(projection, dtype=np.float64) @ view @ model).astype(np.float32)
+    clip = positions @ mvp[:, :3].T + mvp[:, 3]
+    w = clip[:, 3]
+    safe_w = np.where(w > MIN_CLIP_W, w, 1.0)
+    sx = (clip[:, 0] / safe_w + 1) * 0.5 * width
+    sy = (1 - clip[:, 1] / safe_w) * 0.5 * height
+    sz = clip[:, 2] / safe_w
+
+    # Відбір трикутників: перед камерою, з ненульовою площею, що перетинають кадр
+    keep = np.all(w[triangles] > MIN_CLIP_W, axis=1)
+    tx, ty, tz = sx[triangles], sy[triangles], sz[triangles]
+    x_min = np.ceil(tx.min(axis=1) - 0.5).clip(0, width)
+    x_max = np.floor(tx.max(axis=1) - 0.5).clip(-1, width - 1)
+    y_min = np.ceil(ty.min(axis=1) - 0.5).clip(0, height)
+    y_max = np.floor(ty.max(axis=1) - 0.5).clip(-1, height - 1)
+    area = (tx[:, 1] - tx[:, 0]) * (ty[:, 2] - ty[:, 0]) - (tx[:, 2] - tx[:, 0]) * (ty[:, 1] - ty[:, 0])
+    keep &= (x_max >= x_min) & (y_max >= y_min) & (area != 0)
+    keep &= (tz.max(axis=1) >= -1) & (tz.min(axis=1) <= 1)
+    selected = np.flatnonzero(keep)
+    if len(selected) == 0:
+        return image.reshape(height, width, 4)
+
+    if smooth and normals is not None:
+        vertex_colors = lambert(_transform_normals(normals, model), light_dir)
+        face_colors = None
+    else:
+        world = positions @ np.asarray(model, dtype=np.float32)[:3, :3].T
+        corners = world[triangles[selected]]
+        face_normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        # Нормаль грані — до камери (позиція ока зі зворотної видової матриці)
+        eye = np.linalg.inv(np.asarray(view, dtype=np.float64))[:3, 3].astype(np.float32)
+        facing = np.einsum("ij,ij->i", face_normals, eye - corners[:, 0])
+        face_normals[facing < 0] *= -1
+        face_colors = np.zeros((len(triangles), 3), dtype=np.float32)
+        face_colors[selected] = lambert(_transform_normals(face_normals, np.identity(4)), light_dir)
+
+    x_min, y_min = x_min.astype(np.int64), y_min.astype(np.int64)
+    spans = x_max.astype(np.int64) - x_min + 1
+    counts = spans * (y_max.astype(np.int64) - y_min + 1)
+    depth = np.full(height * width, np.inf, dtype=np.float32)
+    cumulative = np.cumsum(counts[selected])
+    start = 0
+    while start < len(selected):
+        # Пакет трикутників, що разом дають не більше batch_pixels кандидатів (але хоча б один)
+        base = cumulative[start - 1] if start else 0
+        end = max(int(np.searchsorted(cumulative, base + batch_pixels, side="right")), start + 1)
+        batch = selected[start:end]
+        start = end
+
+        batch_counts = counts[batch]
+        owner = np.repeat(np.arange(len(batch)), batch_counts)
+        local = np.arange(int(batch_counts.sum()), dtype=np.int64) - np.repeat(np.cumsum(batch_counts) - batch_counts, batch_counts)
+        tri = batch[owner]
+        px = x_min[tri] + local % spans[tri]
+        py = y_min[tri] + local // spans[tri]
+        cx = px.astype(np.float32) + 0.5
+        cy = py.astype(np.float32) + 0.5
+        x0, x1, x2 = tx[tri, 0], tx[tri, 1], tx[tri, 2]
+        y0, y1, y2 = ty[tri, 0], ty[tri, 1], ty[tri, 2]
+        inverse_area = 1.0 / area[tri]
+        b0 = ((x1 - cx) * (y2 - cy) - (x2 - cx) * (y1 - cy)) * inverse_area
+        b1 = ((x2 - cx) * (y0 - cy) - (x0 - cx) * (y2 - cy)) * inverse_area
+        b2 = 1.0 - b0 - b1
+        z = b0 * tz[tri, 0] + b1 * tz[tri, 1] + b2 * tz[tri, 2]
+        inside = (b0 >= 0) & (b1 >= 0) & (b2 >= 0) & (z >= -1) & (z <= 1)
+        if not inside.any():
+            continue
+        tri, b0, b1, b2, z = tri[inside], b0[inside], b1[inside], b2[inside], z[inside]
+        pixel = py[inside] * width + px[inside]
+        # z-тест: спершу мінімальна глибина на піксель, потім пишуть лише "переможці"
+        np.minimum.at(depth, pixel, z)
+        visible = z <= depth[pixel]
+        tri, pixel = tri[visible], pixel[visible]
+        if face_colors is None:
+            corners = triangles[tri]
+            colors = (b0[visible, None] * vertex_colors[corners[:, 0]] + b1[visible, None] * vertex_colors[corners[:, 1]]
+                      + b2[visible, None] * vertex_colors[corners[:, 2]])
+        else:
+            colors = face_colors[tri]
+        image[pixel, :3] = np.clip(colors * 255 + 0.5, 0, 255).astype(np.uint8)
+    return image.reshape(height, width, 4)
+
+
+class SoftwareRenderer:
+    """
+    Програмний аналог widgets.offscreen.OffscreenRenderer (той самий інтерфейс):
+    рендер моделі у масив пікселів без жодного GL-контексту.
+    """
+
+    renderer_name = "NumPy (програмний рендер)"
+
+    def __init__(self, width=512, height=512, background=DEFAULT_BACKGROUND):
+        self.width = width
+        self.height = height
+        self.background = background
+        self.target = [0.0, 0.0, 0.0]
+        self.distance = 5.0
+        self.light = DEFAULT_LIGHT
+        self.positions = self.normals = self.indices = None
+
+    def resize(self, width, height):
+        self.width, self.height = width, height
+
+    def set_model(self, mesh, arrays):
+        """
+        Запам'ятовує модель (arrays — з prepare_render_arrays або smooth_render_arrays) і кадрує камеру.
+        """
+        self.positions = np.ascontiguousarray(mesh.positions)
+        self.normals = arrays.get("vertex_normals")
+        self.indices = arrays.get("indices")
+        bbox = mesh.bbox()
+        if bbox is not None:
+            self.target, self.distance = frame_bbox(bbox)
+
+    def camera_matrices(self, azimuth=DEFAULT_AZIMUTH, elevation=DEFAULT_ELEVATION, rotation=0.0):
+        return orbit_matrices(self.target, self.distance, azimuth, elevation, rotation, self.width / self.height)
+
+    def render_view(self, model, view, projection, smooth=True):
+        """
+        Кадр із заданими матрицями: масив (height, width, 4) uint8.
+        """
+        if self.indices is None:
+            return rasterize(np.empty((0, 3)), None, np.empty((0, 3), dtype=np.uint32), model, view, projection,
+                             self.width, self.height, light_vector(*self.light), self.background)
+        return rasterize(self.positions, self.normals, self.indices, model, view, projection,
+                         self.width, self.height, light_vector(*self.light), self.background, smooth)
+
+    def render(self, azimuth=DEFAULT_AZIMUTH, elevation=DEFAULT_ELEVATION, rotation=0.0, smooth=True):
+        return self.render_view(*self.camera_matrices(azimuth, elevation, rotation), smooth=smooth)
+
+    def release(self):
+        self.positions = self.normals = self.indices = None
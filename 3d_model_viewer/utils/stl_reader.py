@@ -0,0 +1,180 @@
+import os
+import re
+import warnings
+import numpy as np
+from utils.obj_parser import iter_line_blocks
+from utils.compressed import DecompressingReader, is_compressed
+
+STL_HEADER_SIZE = 80
+# Запис трикутника binary STL: нормаль, три вершини, 2 байти атрибутів (50 байтів)
+STL_RECORD = np.dtype([("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attributes", "<u2")])
+# Трикутників в одному блоці копіювання з memmap (для прогресу)
+STL_CHUNK = 1 << 20
+
+# Байтів початку файлу, в яких шукається 'facet' для розпізнавання ASCII STL
+STL_SNIFF_SIZE = 4096
+
+_VERTEX_LINE = re.compile(rb"vertex\s+(\S+\s+\S+\s+\S+)")
+# Множники хешу координат (великі непарні 64-бітні константи)
+_HASH_MULTIPLIERS = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F), np.uint64(0x165667B19E3779F9))
+
+
+def _looks_ascii(head):
+    """
+    Початок ASCII STL: 'solid' і вже перший 'facet' (заголовок binary теж буває 'solid ...').
+    """
+    return head.lstrip().startswith(b"solid") and b"facet" in head
+
+
+def _binary_triangle_count(header):
+    return int(np.frombuffer(header, dtype="<u4", count=1, offset=STL_HEADER_SIZE)[0])
+
+
+def is_binary_stl(path):
+    """
+    Binary STL, якщо розмір файлу точно 84 + 50 * (кількість трикутників із заголовка);
+    інакше — binary, якщо початок не схожий на ASCII (_looks_ascii): експортери
+    нерідко дописують у кінець binary-файлу перенос рядка чи вирівнювання.
+    """
+    size = os.path.getsize(path)
+    if size < STL_HEADER_SIZE + 4:
+        return False
+    with open(path, "rb") as f:
+        head = f.read(STL_SNIFF_SIZE)
+    if size == STL_HEADER_SIZE + 4 + _binary_triangle_count(head) * STL_RECORD.itemsize:
+        return True
+    return not _looks_ascii(head)
+
+
+def _read_binary_corners(path, progress=None):
+    """
+    Вершини кутів трикутників (3T, 3) float32 одним структурованим memmap-поданням файлу.
+    Кількість трикутників — із заголовка; зайві байти в кінці файлу ігноруються.
+    """
+    with open(path, "rb") as f:
+        count = _binary_triangle_count(f.read(STL_HEADER_SIZE + 4))
+    if os.path.getsize(path) < STL_HEADER_SIZE + 4 + count * STL_RECORD.itemsize:
+        raise ValueError("STL: файл обірвався")
+    corners = np.empty((count * 3, 3), dtype=np.float32)
+    if count == 0:
+        return corners
+    records = np.memmap(path, dtype=STL_RECORD, mode="r", offset=STL_HEADER_SIZE + 4, shape=(count,))
+    for start in range(0, count, STL_CHUNK):
+        end = min(start + STL_CHUNK, count)
+        corners[start * 3:end * 3] = records["vertices"][start:end].reshape(-1, 3)
+        if progress is not None:
+            progress(end / count)
+    del records
+    return corners
+
+
+def _parse_ascii_stream(stream, fraction, progress=None):
+    """
+    Вершини кутів з ASCII STL: рядки 'vertex x y z' блоками, числа — одним np.fromstring.
+    fraction() — частка прочитаного для progress.
+    """
+    parts = []
+    for block in iter_line_blocks(stream):
+        matches = _VERTEX_LINE.findall(block)
+        if matches:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", DeprecationWarning)
+                parts.append(np.fromstring(b" ".join(matches), dtype=np.float32, sep=" "))
+        if progress is not None:
+            progress(fraction())
+    if not parts:
+        raise ValueError("STL: не знайдено жодної вершини")
+    corners = np.concatenate(parts)
+    if len(corners) % 9:
+        raise ValueError("STL: кількість вершин не кратна трьом")
+    return corners.reshape(-1, 3)
+
+
+def _read_ascii_corners(path, progress=None):
+    size = max(os.path.getsize(path), 1)
+    with open(path, "rb") as f:
+        return _parse_ascii_stream(f, lambda: min(f.tell() / size, 1.0), progress)
+
+
+def _read_stream_corners(stream, progress=None):
+    """
+    Вершини кутів зі стисненого STL (DecompressingReader) без розміру розпакованого файлу:
+    ASCII — якщо початок схожий на ASCII (_looks_ascii);
+    binary — записи читаються блоками по STL_CHUNK трикутників за кількістю із заголовка.
+    """
+    head = stream.peek(STL_SNIFF_SIZE)
+    if _looks_ascii(head):
+        return _parse_ascii_stream(stream, stream.fraction, progress)
+    header = stream.read(STL_HEADER_SIZE + 4)
+    if len(header) < STL_HEADER_SIZE + 4:
+        raise ValueError("STL: файл коротший за заголовок")
+    count = _binary_triangle_count(header)
+    corners = np.empty((count * 3, 3), dtype=np.float32)
+    for start in range(0, count, STL_CHUNK):
+        end = min(start + STL_CHUNK, count)
+        data = stream.read((end - start) * STL_RECORD.itemsize)
+        if len(data) < (end - start) * STL_RECORD.itemsize:
+            raise ValueError("STL: файл обірвався")
+        records = np.frombuffer(data, dtype=STL_RECORD)
+        corners[start * 3:end * 3] = records["vertices"].reshape(-1, 3)
+        if progress is not None:
+            progress(end / count)
+    return corners
+
+
+def weld_vertices(corners):
+    """
+    Зварює однакові вершини (побітово, -0.0 == 0.0): 64-бітний хеш координат + сортування.
+    Повертає (positions (U, 3) у порядку першої появи, inverse (N,) uint32).
+    """
+    count = len(corners)
+    if count == 0:
+        return corners.reshape(0, 3), np.empty(0, dtype=np.uint32)
+    # + 0.0 перетворює -0.0 на 0.0, щоб вони зварювались
+    bits = np.ascontiguousarray(corners + np.float32(0.0)).view(np.uint32).astype(np.uint64)
+    keys = bits[:, 0] * _HASH_MULTIPLIERS[0]
+    keys ^= bits[:, 1] * _HASH_MULTIPLIERS[1]
+    keys ^= bits[:, 2] * _HASH_MULTIPLIERS[2]
+    del bits
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+    del keys
+    new_group = np.empty(count, dtype=bool)
+    new_group[0] = True
+    np.not_equal(sorted_keys[1:], sorted_keys[:-1], out=new_group[1:])
+    del sorted_keys
+    starts = np.flatnonzero(new_group)
+    group = np.cumsum(new_group) - 1
+    del new_group
+    # Перше входження кожної вершини — найменший номер кута в групі
+    firsts = np.minimum.reduceat(order, starts)
+    inverse = np.empty(count, dtype=np.int64)
+    inverse[order] = group
+    del order, group
+    # Колізія хешу — різні координати в одній групі: точне (повільніше) сортування
+    if not np.array_equal(corners + np.float32(0.0), corners[firsts][inverse] + np.float32(0.0)):
+        unique, inverse = np.unique(corners + np.float32(0.0), axis=0, return_inverse=True)
+        return unique, inverse.reshape(-1).astype(np.uint32)
+    # Номери вершин — у порядку першої появи
+    first_order = np.argsort(firsts)
+    rank = np.empty(len(firsts), dtype=np.uint32)
+    rank[first_order] = np.arange(len(firsts), dtype=np.uint32)
+    return corners[firsts[first_order]], rank[inverse]
+
+
+def read_stl(path, progress=None):
+    """
+    Читає STL (binary або ASCII; також стиснений .stl.gz/.stl.xz/...) і зварює спільні вершини трикутників.
+    Повертає словник: positions (N, 3) float32, face_offsets, face_indices (CSR трикутників).
+    """
+    if is_compressed(path):
+        with DecompressingReader(path) as stream:
+            corners = _read_stream_corners(stream, progress)
+    else:
+        corners = (_read_binary_corners if is_binary_stl(path) else _read_ascii_corners)(path, progress)
+    positions, face_indices = weld_vertices(corners)
+    return {
+        "positions": positions,
+        "face_offsets": np.arange(len(face_indices) // 3 + 1, dtype=np.int64) * 3,
+        "face_indices": face_indices,
+    }
@@ -0,0 +1,99 @@
+import math
+import numpy as np
+
+
+def perspective(fovy, aspect, near, far):
+    """
+    Матриця перспективної проекції (як gluPerspective), рядкова (row-major) float32.
+    """
+    f = 1.0 / math.tan(math.radians(fovy) / 2)
+    matrix = np.zeros((4, 4), dtype=np.float32)
+    matrix[0, 0] = f / aspect
+    matrix[1, 1] = f
+    matrix[2, 2] = (far + near) / (near - far)
+    matrix[2, 3] = 2 * far * near / (near - far)
+    matrix[3, 2] = -1.0
+    return matrix
+
+
+def look_at(eye, target, up=(0.0, 1.0, 0.0)):
+    """
+    Видова матриця камери (як gluLookAt).
+    """
+    eye = np.asarray(eye, dtype=np.float64)
+    forward = np.asarray(target, dtype=np.float64) - eye
+    forward /= np.linalg.norm(forward) or 1.0
+    side = np.cross(forward, up)
+    side /= np.linalg.norm(side) or 1.0
+    true_up = np.cross(side, forward)
+    matrix = np.identity(4)
+    matrix[0, :3] = side
+    matrix[1, :3] = true_up
+    matrix[2, :3] = -forward
+    matrix[:3, 3] = -matrix[:3, :3] @ eye
+    return matrix.astype(np.float32)
+
+
+def rotation_y(angle):
+    """
+    Матриця повороту навколо осі Y (кут у градусах, як glRotatef(angle, 0, 1, 0)).
+    """
+    a = math.radians(angle)
+    c, s = math.cos(a), math.sin(a)
+    matrix = np.identity(4, dtype=np.float32)
+    matrix[0, 0], matrix[0, 2] = c, s
+    matrix[2, 0], matrix[2, 2] = -s, c
+    return matrix
+
+
+def orbit_position(target, distance, azimuth, elevation):
+    """
+    Позиція камери на орбіті навколо target (азимут і висота у градусах).
+    """
+    phi = math.radians(azimuth)
+    theta = math.radians(elevation)
+    x = distance * math.cos(theta) * math.sin(phi)
+    y = distance * math.sin(theta)
+    z = distance * math.cos(theta) * math.cos(phi)
+    return [target[0] + x, target[1] + y, target[2] + z]
+
+
+def light_vector(azimuth, elevation):
+    """
+    Напрямок на джерело світла (азимут і висота у градусах).
+    """
+    az = math.radians(azimuth)
+    el = math.radians(elevation)
+    return [math.cos(el) * math.cos(az), math.sin(el), math.cos(el) * math.sin(az)]
+
+
+def frame_bbox(bbox, default_distance=5.0):
+    """
+    Кадрування камери по bounding box: (центр орбіти, відстань).
+    """
+    bbox_min, bbox_max = bbox
+    target = ((bbox_min + bbox_max) / 2).tolist()
+    size = float((bbox_max - bbox_min).max())
+    return target, size * 1.5 if size > 0 else default_distance
+
+
+def orbit_matrices(target, distance, azimuth, elevation, rotation, aspect, fovy=45.0):
+    """
+    Матриці (model, view, projection) орбітальної камери — як у SimpleGLWidget.
+    """
+    eye = orbit_position(target, distance, azimuth, elevation)
+    return rotation_y(rotation), look_at(eye, target), perspective(fovy, aspect, 0.1, 1000.0)
+
+
+def tile_projection(projection, width, height, x, y, tile_width, tile_height):
+    """
+    Проекція під-піраміди для фрагмента кадру width x height: прямокутник
+    (x, y, tile_width, tile_height) у пікселях (y — згори) розтягується на весь viewport.
+    """
+    left, right = 2.0 * x / width - 1.0, 2.0 * (x + tile_width) / width - 1.0
+    top, bottom = 1.0 - 2.0 * y / height, 1.0 - 2.0 * (y + tile_height) / height
+    scale_x, scale_y = 2.0 / (right - left), 2.0 / (top - bottom)
+    crop = np.identity(4, dtype=np.float64)
+    crop[0, 0], crop[0, 3] = scale_x, -scale_x * (left + right) / 2
+    crop[1, 1], crop[1, 3] = scale_y, -scale_y * (top + bottom) / 2
+    return (crop @ projection).astype(np.float32)
@@ -0,0 +1,163 @@
+import os
+import queue
+import threading
+import numpy as np
+
+# Кадрів у черзі до кодувальника: пам'ять обмежена незалежно від кількості кадрів
+ENCODER_QUEUE_FRAMES = 8
+DEFAULT_FRAMES = 72
+DEFAULT_FPS = 24
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".avi", ".mov")
+
+_STOP = object()
+
+
+class EncoderCancelled(Exception):
+    """
+    Експорт перервано (кодувальник закрито без завершення).
+    """
+
+
+def sequence_path(path, index):
+    """
+    Шлях кадру послідовності PNG: turntable.png -> turntable_0000.png.
+    """
+    stem, ext = os.path.splitext(path)
+    return f"{stem}_{index:04d}{ext}"
+
+
+class GifStreamWriter:
+    """
+    GIF, що пишеться кадр за кадром (Pillow: getheader/getdata); imageio через Pillow
+    тримає всі кадри в пам'яті до закриття файлу. Кожен кадр — з власною палітрою.
+    """
+
+    def __init__(self, path, fps=DEFAULT_FPS):
+        self.duration = int(round(1000 / fps))
+        self._file = open(path, "wb")
+        self._started = False
+
+    def append_data(self, frame):
+        from PIL import Image, GifImagePlugin
+        image = Image.fromarray(np.ascontiguousarray(frame[..., :3])).quantize(256, method=Image.Quantize.FASTOCTREE)
+        if not self._started:
+            header, _ = GifImagePlugin.getheader(image, None, {"loop": 0, "duration": self.duration})
+            self._file.writelines(header)
+            self._started = True
+        self._file.writelines(GifImagePlugin.getdata(image, (0, 0), duration=self.duration,
+                                                     include_color_table=True, disposal=1))
+
+    def close(self):
+        if not self._file.closed:
+            self._file.write(b";")
+            self._file.close()
+
+
+class FrameEncoder:
+    """
+    Кодування кадрів в окремому потоці: GIF, відео (MP4 тощо, потрібен imageio-ffmpeg)
+    або послідовність PNG — за розширенням шляху. Кадри передаються через обмежену
+    чергу, тож рендер наступних кадрів іде паралельно з кодуванням попередніх,
+    а put блокується, коли кодувальник відстає.
+    """
+
+    def __init__(self, path, fps=DEFAULT_FPS, max_queue=ENCODER_QUEUE_FRAMES):
+        self.path = path
+        self.frames_written = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".gif":
+            self._writer = GifStreamWriter(path, fps)
+        elif ext in VIDEO_EXTENSIONS:
+            import imageio
+            # Помилка (немає imageio-ffmpeg) — одразу, до рендера кадрів
+            self._writer = imageio.get_writer(path, fps=fps, quality=8, macro_block_size=2)
+        elif ext == ".png":
+            self._writer = None
+        else:
+            raise ValueError(f"Непідтримуваний формат анімації: {ext}")
+        self._thread = threading.Thread(target=self._run, name="FrameEncoder", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        import imageio
+        while True:
+            frame = self._queue.get()
+            if frame is _STOP:
+                break
+            if self.error is not None:
+                continue    # Після помилки черга лише спорожнюється
+            try:
+                if self._writer is None:
+                    imageio.imwrite(sequence_path(self.path, self.frames_written), frame)
+                else:
+                    self._writer.append_data(frame)
+                self.frames_written += 1
+            except Exception as e:
+                self.error = e
+
+    def put(self, frame):
+        """
+        Додає кадр (height, width, 3|4) uint8; чекає, якщо черга повна.
+        """
+        if self.error is not None:
+            raise self.error
+        self._queue.put(np.ascontiguousarray(frame))
+
+    def close(self):
+        """
+        Дописує кадри з черги і закриває файл. Повертає кількість записаних кадрів.
+        """
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self._writer is not None:
+            self._writer.close()
+        if self.error is not None:
+            raise self.error
+        return self.frames_written
+
+    def cancel(self):
+        """
+        Зупиняє кодування: кадри в черзі відкидаються, незавершений файл GIF/відео видаляється.
+        """
+        self.error = self.error or EncoderCancelled()
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+def turntable_angles(frames, start=0.0):
+    """
+    Кути повороту моделі (градуси) для frames кадрів одного повного оберту.
+    """
+    return [(start + 360.0 * i / frames) % 360.0 for i in range(frames)]
+
+
+def render_turntable(render_frame, encoder, frames=DEFAULT_FRAMES, start=0.0, progress=None):
+    """
+    Рендер оберту: render_frame(angle) -> (height, width, 4) uint8 для кожного кута
+    і передача кадрів кодувальнику (RGB). progress(done, total) може повернути False —
+    тоді експорт скасовується (кодувальник зупиняється, повертається False).
+    """
+    try:
+        for done, angle in enumerate(turntable_angles(frames, start), start=1):
+            encoder.put(render_frame(angle)[..., :3])
+            if progress is not None and progress(done, frames) is False:
+                encoder.cancel()
+                return False
+    except BaseException:
+        encoder.cancel()
+        raise
+    encoder.close()
+    return True
@@ -1,8 +1,18 @@
 #version 120
 varying vec3 vNormal;
+varying vec3 vPos;
 uniform vec3 lightDir;
+uniform vec3 diffuseColor;
+uniform vec3 ambientColor;
+uniform int flatShading;
 void main() {
-    float diffuse = max(dot(normalize(vNormal), normalize(lightDir)), 0.0);
-    if (diffuse < 0.13) diffuse = 0.13; // жорстка тінь, змінюй як треба
-    gl_FragColor = vec4(vec3(0.65, 0.65, 0.65) * diffuse, 1.0);
+    vec3 n;
+    if (flatShading != 0) {
+        // Плоский шейдинг: нормаль грані з похідних позиції, без дубльованих вершин
+        n = normalize(cross(dFdx(vPos), dFdy(vPos)));
+    } else {
+        n = normalize(vNormal);
+    }
+    float diffuse = max(dot(n, normalize(lightDir)), 0.0);
+    gl_FragColor = vec4(ambientColor + diffuseColor * diffuse, 1.0);
 }
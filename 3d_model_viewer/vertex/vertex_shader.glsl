@@ -1,12 +1,28 @@
 #version 120
 attribute vec3 position;
 attribute vec3 normal;
-uniform mat4 modelViewMatrix;
+uniform mat4 modelMatrix;
+uniform mat4 viewMatrix;
 uniform mat4 projectionMatrix;
+// Квантовані позиції (uint16 у межах bbox, нормалізовані в [0, 1]): offset + scale * position
+uniform vec3 positionOffset;
+uniform vec3 positionScale;
+// Нормалі в октаедричному поданні (int16 x 2, нормалізовані в [-1, 1])
+uniform int octNormals;
 varying vec3 vNormal;
 varying vec3 vPos;
+vec3 octDecode(vec2 e) {
+    vec3 n = vec3(e, 1.0 - abs(e.x) - abs(e.y));
+    float t = max(-n.z, 0.0);
+    n.x += n.x >= 0.0 ? -t : t;
+    n.y += n.y >= 0.0 ? -t : t;
+    return normalize(n);
+}
 void main() {
-    vNormal = normal;
-    vPos = vec3(modelViewMatrix * vec4(position, 1.0));
-    gl_Position = projectionMatrix * modelViewMatrix * vec4(position, 1.0);
+    vec4 world = modelMatrix * vec4(positionOffset + positionScale * position, 1.0);
+    vec3 n = octNormals != 0 ? octDecode(normal.xy) : normal;
+    // Модель лише обертається, тож для нормалей досить mat3(modelMatrix)
+    vNormal = mat3(modelMatrix) * n;
+    vPos = world.xyz;
+    gl_Position = projectionMatrix * viewMatrix * world;
 }
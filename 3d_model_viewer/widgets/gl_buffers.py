@@ -0,0 +1,215 @@
+import numpy as np
+from OpenGL.GL import *
+
+# Типи індексів NumPy -> OpenGL
+_INDEX_TYPES = {
+    np.dtype(np.uint8): GL_UNSIGNED_BYTE,
+    np.dtype(np.uint16): GL_UNSIGNED_SHORT,
+    np.dtype(np.uint32): GL_UNSIGNED_INT,
+}
+# Типи атрибутів вершин: float32 або квантовані 16-бітні (нормалізуються на GPU)
+_ATTRIBUTE_TYPES = {
+    np.dtype(np.float32): GL_FLOAT,
+    np.dtype(np.uint16): GL_UNSIGNED_SHORT,
+    np.dtype(np.int16): GL_SHORT,
+}
+
+
+class GLBuffer:
+    """
+    Один буфер OpenGL (VBO або IBO) з даними масиву.
+    """
+
+    __slots__ = ("buffer_id", "target", "count", "components", "gl_type", "normalized", "nbytes")
+
+    def __init__(self, array, target=GL_ARRAY_BUFFER):
+        array = np.ascontiguousarray(array)
+        self.target = target
+        self.count = len(array)
+        self.components = array.shape[1] if array.ndim > 1 else 1
+        if target == GL_ELEMENT_ARRAY_BUFFER:
+            self.gl_type = _INDEX_TYPES[array.dtype]
+        else:
+            self.gl_type = _ATTRIBUTE_TYPES[array.dtype]
+        # Цілі атрибути шейдер бачить нормалізованими: uint16 -> [0, 1], int16 -> [-1, 1]
+        self.normalized = self.gl_type != GL_FLOAT
+        self.nbytes = array.nbytes
+        self.buffer_id = glGenBuffers(1)
+        glBindBuffer(target, self.buffer_id)
+        glBufferData(target, array.nbytes, array, GL_STATIC_DRAW)
+        glBindBuffer(target, 0)
+
+    def bind(self):
+        glBindBuffer(self.target, self.buffer_id)
+
+    def release(self):
+        if self.buffer_id:
+            glDeleteBuffers(1, [self.buffer_id])
+            self.buffer_id = 0
+
+
+class MeshBuffers:
+    """
+    Набір GPU-буферів моделі. Дані передаються на GPU один раз (upload),
+    кадри малюються вже з буферів, без повторної передачі масивів.
+    Усі методи викликаються лише з активним GL-контекстом.
+    """
+
+    def __init__(self):
+        self.buffers = {}
+
+    def upload(self, name, array, target=GL_ARRAY_BUFFER):
+        """
+        Передає масив на GPU під іменем name (старий буфер з тим самим іменем звільняється).
+        None — просто звільняє буфер. Атрибути uint16/int16 (квантовані) передаються як є,
+        решта — як float32; квантовані буфери малюються лише шейдерами.
+        """
+        self.release(name)
+        if array is None or len(array) == 0:
+            return None
+        if target == GL_ARRAY_BUFFER and np.asarray(array).dtype not in _ATTRIBUTE_TYPES:
+            array = np.asarray(array, dtype=np.float32)
+        self.buffers[name] = GLBuffer(array, target)
+        return self.buffers[name]
+
+    def upload_indices(self, name, array):
+        return self.upload(name, array, GL_ELEMENT_ARRAY_BUFFER)
+
+    def has(self, name):
+        return name in self.buffers
+
+    def release(self, name=None):
+        """
+        Звільняє один буфер або (name=None) усі.
+        """
+        names = list(self.buffers) if name is None else [name]
+        for key in names:
+            buffer = self.buffers.pop(key, None)
+            if buffer is not None:
+                buffer.release()
+
+    @property
+    def nbytes(self):
+        return sum(buffer.nbytes for buffer in self.buffers.values())
+
+    def _bind_attributes(self, vertex_name, normal_name, attributes=None):
+        """
+        attributes=None — fixed-function вказівники (glVertexPointer/glNormalPointer);
+        інакше пара номерів атрибутів шейдера (позиція, нормаль).
+        """
+        vertices = self.buffers[vertex_name]
+        vertices.bind()
+        if attributes is None:
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glVertexPointer(3, GL_FLOAT, 0, None)
+        else:
+            glEnableVertexAttribArray(attributes[0])
+            glVertexAttribPointer(attributes[0], vertices.components, vertices.gl_type, vertices.normalized, 0, None)
+        if normal_name in self.buffers:
+            normals = self.buffers[normal_name]
+            normals.bind()
+            if attributes is None:
+                glEnableClientState(GL_NORMAL_ARRAY)
+                glNormalPointer(GL_FLOAT, 0, None)
+            else:
+                glEnableVertexAttribArray(attributes[1])
+                glVertexAttribPointer(attributes[1], normals.components, normals.gl_type, normals.normalized, 0, None)
+        elif attributes is not None:
+            glVertexAttrib3f(attributes[1], 0.0, 0.0, 1.0)
+
+    def _unbind_attributes(self, attributes=None):
+        if attributes is None:
+            glDisableClientState(GL_NORMAL_ARRAY)
+            glDisableClientState(GL_VERTEX_ARRAY)
+        else:
+            glDisableVertexAttribArray(attributes[1])
+            glDisableVertexAttribArray(attributes[0])
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw_elements(self, vertex_name, normal_name, index_name, mode=GL_TRIANGLES, attributes=None):
+        """
+        Малює індексовану геометрію з VBO одним викликом glDrawElements.
+        """
+        indices = self.buffers.get(index_name)
+        if vertex_name not in self.buffers or indices is None:
+            return
+        self._bind_attributes(vertex_name, normal_name, attributes)
+        indices.bind()
+        glDrawElements(mode, indices.count, indices.gl_type, None)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        self._unbind_attributes(attributes)
+
+    def draw_ranges(self, vertex_name, normal_name, index_name, starts, counts, mode=GL_TRIANGLES,
+                    attributes=None):
+        """
+        Малює лише діапазони індексного буфера (starts/counts — у трикутниках)
+        одним викликом glMultiDrawElements.
+        """
+        indices = self.buffers.get(index_name)
+        if vertex_name not in self.buffers or indices is None or len(starts) == 0:
+            return
+        item_size = 1 if indices.gl_type == GL_UNSIGNED_BYTE else (2 if indices.gl_type == GL_UNSIGNED_SHORT else 4)
+        offsets = (np.asarray(starts, dtype=np.intp) * 3 * item_size)
+        counts = np.asarray(counts, dtype=np.int32) * 3
+        self._bind_attributes(vertex_name, normal_name, attributes)
+        indices.bind()
+        glMultiDrawElements(mode, counts, indices.gl_type, offsets, len(counts))
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        self._unbind_attributes(attributes)
+
+    def draw_arrays(self, mode, vertex_name, normal_name, attributes=None):
+        """
+        Малює неіндексовані (дубльовані) вершини з VBO.
+        """
+        if vertex_name not in self.buffers:
+            return
+        self._bind_attributes(vertex_name, normal_name, attributes)
+        glDrawArrays(mode, 0, self.buffers[vertex_name].count)
+        self._unbind_attributes(attributes)
+
+
+class Framebuffer:
+    """
+    Кадровий буфер (FBO) width x height: колір RGBA8 + глибина, для рендера поза екраном.
+    """
+
+    def __init__(self, width, height):
+        self.framebuffer = None
+        self.renderbuffers = None
+        self.resize(width, height)
+
+    def resize(self, width, height):
+        """
+        Перестворює буфери під новий розмір (FBO лишається прив'язаним).
+        """
+        self.release()
+        self.width, self.height = width, height
+        self.framebuffer = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+        self.renderbuffers = glGenRenderbuffers(2)
+        for renderbuffer, storage, attachment in zip(
+                self.renderbuffers, (GL_RGBA8, GL_DEPTH_COMPONENT24), (GL_COLOR_ATTACHMENT0, GL_DEPTH_ATTACHMENT)):
+            glBindRenderbuffer(GL_RENDERBUFFER, renderbuffer)
+            glRenderbufferStorage(GL_RENDERBUFFER, storage, width, height)
+            glFramebufferRenderbuffer(GL_FRAMEBUFFER, attachment, GL_RENDERBUFFER, renderbuffer)
+        glBindRenderbuffer(GL_RENDERBUFFER, 0)
+        self.complete = glCheckFramebufferStatus(GL_FRAMEBUFFER) == GL_FRAMEBUFFER_COMPLETE
+
+    def bind(self):
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+        glViewport(0, 0, self.width, self.height)
+
+    def read_pixels(self):
+        """
+        Вміст кадру: масив (height, width, 4) uint8, перший рядок — верх зображення.
+        """
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.framebuffer)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        data = glReadPixels(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE)
+        return np.frombuffer(data, dtype=np.uint8).reshape(self.height, self.width, 4)[::-1].copy()
+
+    def release(self):
+        if self.framebuffer is not None:
+            glDeleteRenderbuffers(2, self.renderbuffers)
+            glDeleteFramebuffers(1, [self.framebuffer])
+            self.framebuffer = self.renderbuffers = None
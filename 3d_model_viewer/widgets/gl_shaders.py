@@ -0,0 +1,101 @@
+import os
+import sys
+import functools
+import numpy as np
+from OpenGL.GL import *
+
+# Фіксовані номери атрибутів вершин (прив'язуються до лінкування програми)
+POSITION_ATTRIB = 0
+NORMAL_ATTRIB = 1
+
+
+def shader_dir():
+    """
+    Тека з GLSL-шейдерами (працює і з PyInstaller).
+    """
+    base = getattr(sys, "_MEIPASS", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(base, "vertex")
+
+
+@functools.lru_cache(maxsize=None)
+def load_shader_source(name):
+    """
+    Текст шейдера з теки vertex/ (читається один раз).
+    """
+    with open(os.path.join(shader_dir(), name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class ShaderError(RuntimeError):
+    """
+    Помилка компіляції або лінкування шейдерної програми.
+    """
+
+
+def _compile_shader(source, shader_type):
+    shader = glCreateShader(shader_type)
+    glShaderSource(shader, source)
+    glCompileShader(shader)
+    if not glGetShaderiv(shader, GL_COMPILE_STATUS):
+        log = glGetShaderInfoLog(shader)
+        glDeleteShader(shader)
+        raise ShaderError(log.decode("utf-8", "replace") if isinstance(log, bytes) else str(log))
+    return shader
+
+
+class ShaderProgram:
+    """
+    Скомпільована програма з vertex/fragment шейдерів і кешем розташувань uniform-змінних.
+    Створюється один раз на GL-контекст.
+    """
+
+    def __init__(self, vertex_name="vertex_shader.glsl", fragment_name="fragment_shader.glsl"):
+        vertex = _compile_shader(load_shader_source(vertex_name), GL_VERTEX_SHADER)
+        try:
+            fragment = _compile_shader(load_shader_source(fragment_name), GL_FRAGMENT_SHADER)
+        except ShaderError:
+            glDeleteShader(vertex)
+            raise
+        program = glCreateProgram()
+        glAttachShader(program, vertex)
+        glAttachShader(program, fragment)
+        glBindAttribLocation(program, POSITION_ATTRIB, "position")
+        glBindAttribLocation(program, NORMAL_ATTRIB, "normal")
+        glLinkProgram(program)
+        glDeleteShader(vertex)
+        glDeleteShader(fragment)
+        if not glGetProgramiv(program, GL_LINK_STATUS):
+            log = glGetProgramInfoLog(program)
+            glDeleteProgram(program)
+            raise ShaderError(log.decode("utf-8", "replace") if isinstance(log, bytes) else str(log))
+        self.program_id = program
+        self._locations = {}
+
+    def use(self):
+        glUseProgram(self.program_id)
+
+    @staticmethod
+    def stop():
+        glUseProgram(0)
+
+    def location(self, name):
+        if name not in self._locations:
+            self._locations[name] = glGetUniformLocation(self.program_id, name)
+        return self._locations[name]
+
+    def set_matrix(self, name, matrix):
+        """
+        mat4 з рядкової (row-major) NumPy-матриці.
+        """
+        glUniformMatrix4fv(self.location(name), 1, GL_TRUE, np.asarray(matrix, dtype=np.float32))
+
+    def set_vec3(self, name, value):
+        glUniform3f(self.location(name), *[float(v) for v in value])
+
+    def set_int(self, name, value):
+        glUniform1i(self.location(name), int(value))
+
+    def release(self):
+        if self.program_id:
+            glDeleteProgram(self.program_id)
+            self.program_id = 0
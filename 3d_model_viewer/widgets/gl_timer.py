@@ -0,0 +1,60 @@
+from OpenGL.GL import *
+from OpenGL.error import GLError, NullFunctionError
+
+# Кількість запитів у кільці: результат читається через кілька кадрів, без очікування GPU
+QUERY_RING = 4
+
+
+class GpuTimer:
+    """
+    Час виконання кадру на GPU через запити GL_TIME_ELAPSED (ARB_timer_query).
+    Запити використовуються по колу, результати забираються лише коли вже готові,
+    тож вимір не зупиняє конвеєр. Якщо запити не підтримуються — supported = False.
+    """
+
+    def __init__(self, ring=QUERY_RING):
+        self.queries = []
+        self.supported = False
+        self._pending = []
+        self._active = None
+        try:
+            if glGetQueryiv(GL_TIME_ELAPSED, GL_QUERY_COUNTER_BITS) > 0:
+                self.queries = list(glGenQueries(ring))
+                self.supported = True
+        except (GLError, NullFunctionError) as e:
+            print(f"[DEBUG] GPU-таймер недоступний: {e}")
+
+    def begin(self):
+        """
+        Починає вимір кадру (якщо вільного запиту немає — кадр пропускається).
+        """
+        if not self.supported or not self.queries:
+            return
+        self._active = self.queries.pop()
+        glBeginQuery(GL_TIME_ELAPSED, self._active)
+
+    def end(self):
+        if self._active is None:
+            return
+        glEndQuery(GL_TIME_ELAPSED)
+        self._pending.append(self._active)
+        self._active = None
+
+    def collect(self):
+        """
+        Готові виміри у секундах (від найстаріших), запити повертаються у кільце.
+        """
+        results = []
+        while self._pending and glGetQueryObjectiv(self._pending[0], GL_QUERY_RESULT_AVAILABLE):
+            query = self._pending.pop(0)
+            # 32-бітний результат (нс) вміщує кадри до ~4 с; ui64-варіант PyOpenGL не конвертує
+            results.append(int(glGetQueryObjectuiv(query, GL_QUERY_RESULT)) / 1e9)
+            self.queries.append(query)
+        return results
+
+    def release(self):
+        queries = self.queries + self._pending + ([self._active] if self._active is not None else [])
+        if queries:
+            glDeleteQueries(len(queries), queries)
+        self.queries, self._pending, self._active = [], [], None
+        self.supported = False
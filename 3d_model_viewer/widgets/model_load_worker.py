@@ -0,0 +1,132 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from utils.load_pipeline import load_render_model, build_flat_arrays, LoadCancelled
+from utils.lod import build_lod_pyramid
+from utils.instrumentation import instruments
+from utils.exporters import export_mesh, ExportCancelled
+
+
+class ModelLoadWorker(QThread):
+    """
+    Фоновий потік завантаження моделі: розбір, нормалі та кеш поза GUI-потоком.
+    Результат передається сигналом loaded; GPU-передачу виконує віджет.
+    """
+
+    progress = pyqtSignal(str, float)      # етап, частка 0..1
+    loaded = pyqtSignal(str, object, object)  # шлях, Mesh, масиви для рендера
+    failed = pyqtSignal(str, str)          # шлях, текст помилки
+    cancelled = pyqtSignal(str)            # шлях
+
+    def __init__(self, path, weighting="area", cache=None, parent=None, workers=1):
+        super().__init__(parent)
+        self.path = path
+        self.weighting = weighting
+        self.cache = cache
+        self.workers = workers
+        self._cancel_requested = False
+
+    def cancel(self):
+        """
+        Просить потік зупинитися на найближчій контрольній точці.
+        """
+        self._cancel_requested = True
+
+    def is_cancelled(self):
+        return self._cancel_requested
+
+    def run(self):
+        try:
+            mesh, arrays = load_render_model(
+                self.path, self.weighting, self.cache,
+                progress=self.progress.emit, is_cancelled=self.is_cancelled, workers=self.workers)
+        except LoadCancelled:
+            self.cancelled.emit(self.path)
+            return
+        except Exception as e:
+            self.failed.emit(self.path, str(e))
+            return
+        if self._cancel_requested:
+            self.cancelled.emit(self.path)
+            return
+        self.loaded.emit(self.path, mesh, arrays)
+
+
+class FlatArraysWorker(QThread):
+    """
+    Фоновий потік побудови потоків плоского шейдингу для вже завантаженої моделі.
+    """
+
+    built = pyqtSignal(object, object)     # Mesh, словник flat-масивів
+
+    def __init__(self, mesh, parent=None):
+        super().__init__(parent)
+        self.mesh = mesh
+
+    def run(self):
+        with instruments.timer("flat.build"):
+            arrays = build_flat_arrays(self.mesh)
+        self.built.emit(self.mesh, arrays)
+
+
+class LodBuildWorker(QThread):
+    """
+    Фоновий потік побудови піраміди рівнів деталізації (LOD) після завантаження моделі.
+    """
+
+    built = pyqtSignal(object, object)     # Mesh, список LodLevel (від детального до грубого)
+
+    def __init__(self, mesh, normals, indices, parent=None):
+        super().__init__(parent)
+        self.mesh = mesh
+        self.normals = normals
+        self.indices = indices
+        self._cancel_requested = False
+
+    def cancel(self):
+        self._cancel_requested = True
+
+    def is_cancelled(self):
+        return self._cancel_requested
+
+    def run(self):
+        with instruments.timer("lod.build"):
+            levels = build_lod_pyramid(self.mesh.positions, self.normals, self.indices.reshape(-1, 3),
+                                       self.mesh.bbox(), is_cancelled=self.is_cancelled)
+        if not self._cancel_requested:
+            self.built.emit(self.mesh, levels)
+
+
+class ExportWorker(QThread):
+    """
+    Фоновий потік експорту моделі у файл (блоками, з прогресом і скасуванням).
+    """
+
+    progress = pyqtSignal(float)           # частка 0..1
+    exported = pyqtSignal(str)             # шлях
+    failed = pyqtSignal(str, str)          # шлях, текст помилки
+    cancelled = pyqtSignal(str)            # шлях
+
+    def __init__(self, mesh, path, options=None, parent=None):
+        super().__init__(parent)
+        self.mesh = mesh
+        self.path = path
+        self.options = options or {}
+        self._cancel_requested = False
+
+    def cancel(self):
+        self._cancel_requested = True
+
+    def is_cancelled(self):
+        return self._cancel_requested
+
+    def run(self):
+        try:
+            with instruments.timer("export"):
+                export_mesh(self.mesh, self.path, progress=self.progress.emit,
+                            is_cancelled=self.is_cancelled, **self.options)
+        except ExportCancelled:
+            self.cancelled.emit(self.path)
+            return
+        except Exception as e:
+            self.failed.emit(self.path, str(e))
+            return
+        self.exported.emit(self.path)
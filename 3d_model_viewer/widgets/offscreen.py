@@ -0,0 +1,250 @@
+"""
+Рендер без вікна (бенчмарки, пакетні мініатюри): GL-контекст EGL (surfaceless)
+або OSMesa з кадровим буфером (FBO) і той самий рендер, що у SimpleGLWidget.
+Без робочого OpenGL create_renderer повертає програмний рендер на NumPy.
+
+Платформа PyOpenGL обирається під час першого імпорту OpenGL, тож цей модуль
+треба імпортувати раніше за інші модулі, що імпортують OpenGL.
+"""
+import os
+import sys
+
+if sys.platform.startswith("linux"):
+    # Без дисплея EGL працює на surfaceless-платформі Mesa (llvmpipe) або драйвері GPU
+    os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+
+import numpy as np
+from utils.transforms import orbit_matrices, light_vector, frame_bbox
+from utils.software_rasterizer import (SoftwareRenderer, DEFAULT_BACKGROUND, DEFAULT_AZIMUTH,
+                                       DEFAULT_ELEVATION, DEFAULT_LIGHT)
+
+try:
+    from OpenGL.GL import *
+    from OpenGL.error import GLError, NullFunctionError
+    from widgets.gl_buffers import MeshBuffers, Framebuffer
+    from widgets.gl_shaders import ShaderProgram, ShaderError, POSITION_ATTRIB, NORMAL_ATTRIB
+    from widgets.simple_gl_widget import setup_materials, setup_light, set_scene_uniforms
+    GL_IMPORT_ERROR = None
+except (ImportError, OSError, AttributeError) as e:
+    # Немає бібліотек OpenGL (або Qt) — лишається лише програмний рендер
+    GL_IMPORT_ERROR = e
+
+
+class OffscreenError(RuntimeError):
+    """
+    Не вдалося створити GL-контекст без вікна.
+    """
+
+
+class OffscreenContext:
+    """
+    GL-контекст без вікна з FBO width x height (колір RGBA8 + глибина).
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.platform = os.environ.get("PYOPENGL_PLATFORM", "")
+        self._display = self._context = self._osmesa_buffer = None
+        if GL_IMPORT_ERROR is not None:
+            raise OffscreenError(f"OpenGL недоступний: {GL_IMPORT_ERROR}")
+        try:
+            if self.platform == "osmesa":
+                self._create_osmesa()
+            elif self.platform == "egl":
+                self._create_egl()
+            else:
+                raise OffscreenError(f"Платформа PyOpenGL '{self.platform}' не підтримує рендер без вікна")
+        except (GLError, NullFunctionError, ImportError, AttributeError) as e:
+            raise OffscreenError(f"GL-контекст недоступний: {e}") from e
+        self._framebuffer = None
+        self.resize(width, height)
+
+    def _create_egl(self):
+        from OpenGL import EGL
+        display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        if not EGL.eglInitialize(display, None, None):
+            raise OffscreenError("eglInitialize")
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        attributes = [EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+                      EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT, EGL.EGL_NONE]
+        if not EGL.eglChooseConfig(display, attributes, config, 1, count) or count.value == 0:
+            raise OffscreenError("eglChooseConfig")
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, None)
+        if not context or not EGL.eglMakeCurrent(display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, context):
+            raise OffscreenError("eglMakeCurrent")
+        self._display, self._context = display, context
+
+    def _create_osmesa(self):
+        from OpenGL import osmesa
+        context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        if not context:
+            raise OffscreenError("OSMesaCreateContextExt")
+        # OSMesa малює у буфер у пам'яті; рендер однаково йде у FBO нижче
+        self._osmesa_buffer = np.zeros((1, 1, 4), dtype=np.uint8)
+        if not osmesa.OSMesaMakeCurrent(context, self._osmesa_buffer, GL_UNSIGNED_BYTE, 1, 1):
+            raise OffscreenError("OSMesaMakeCurrent")
+        self._context = context
+
+    def resize(self, width, height):
+        """
+        Перестворює FBO під новий розмір кадру.
+        """
+        self.width, self.height = width, height
+        if self._framebuffer is None:
+            self._framebuffer = Framebuffer(width, height)
+        elif (self._framebuffer.width, self._framebuffer.height) != (width, height):
+            self._framebuffer.resize(width, height)
+        if not self._framebuffer.complete:
+            raise OffscreenError(f"Неповний кадровий буфер {width}x{height}")
+        self._framebuffer.bind()
+
+    def read_pixels(self):
+        """
+        Вміст кадру: масив (height, width, 4) uint8, перший рядок — верх зображення.
+        """
+        return self._framebuffer.read_pixels()
+
+    def release(self):
+        if self._framebuffer is not None:
+            self._framebuffer.release()
+            self._framebuffer = None
+        if self._display is not None:
+            from OpenGL import EGL
+            EGL.eglMakeCurrent(self._display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroyContext(self._display, self._context)
+        elif self._context is not None:
+            from OpenGL import osmesa
+            osmesa.OSMesaDestroyContext(self._context)
+        self._display = self._context = None
+
+
+class OffscreenRenderer:
+    """
+    Рендер моделі у масив пікселів без вікна: ті самі буфери, шейдери, матеріал
+    і світло, що у SimpleGLWidget; камера кадрується по bbox, як reset_view_to_model.
+    """
+
+    def __init__(self, width=512, height=512, background=DEFAULT_BACKGROUND, use_shaders=True):
+        self.context = OffscreenContext(width, height)
+        self.background = background
+        self.buffers = MeshBuffers()
+        self.target = [0.0, 0.0, 0.0]
+        self.distance = 5.0
+        self.light = DEFAULT_LIGHT
+        self.quantization = None
+        glEnable(GL_DEPTH_TEST)
+        glEnable(GL_LIGHTING)
+        glEnable(GL_LIGHT0)
+        glEnable(GL_NORMALIZE)
+        setup_materials()
+        self.shader_program = None
+        if use_shaders:
+            try:
+                self.shader_program = ShaderProgram()
+            except (ShaderError, OSError, GLError) as e:
+                print(f"[DEBUG] Шейдери недоступні, fixed-function рендер: {e}")
+
+    @property
+    def renderer_name(self):
+        return glGetString(GL_RENDERER).decode("utf-8", "replace")
+
+    def set_model(self, mesh, arrays):
+        """
+        Передає модель у GPU-буфери (arrays — з prepare_render_arrays) і кадрує камеру.
+        Квантовані масиви .qmesh шейдерний шлях передає як є.
+        """
+        self.buffers.release()
+        self.quantization = None
+        quantized = arrays.get("quantized_positions")
+        if self.shader_program is not None and quantized is not None:
+            normals = arrays.get("quantized_normals")
+            self.buffers.upload("vertices", quantized)
+            self.buffers.upload("normals", arrays.get("vertex_normals") if normals is None else normals)
+            self.quantization = (*arrays["position_quantization"], normals is not None)
+        else:
+            self.buffers.upload("vertices", np.ascontiguousarray(mesh.positions))
+            self.buffers.upload("normals", arrays.get("vertex_normals"))
+        self.buffers.upload_indices("indices", arrays.get("indices"))
+        bbox = mesh.bbox()
+        if bbox is not None:
+            self.target, self.distance = frame_bbox(bbox)
+
+    @property
+    def width(self):
+        return self.context.width
+
+    @property
+    def height(self):
+        return self.context.height
+
+    def resize(self, width, height):
+        self.context.resize(width, height)
+
+    def camera_matrices(self, azimuth=DEFAULT_AZIMUTH, elevation=DEFAULT_ELEVATION, rotation=0.0):
+        """
+        Матриці (model, view, projection) для кута огляду — як SimpleGLWidget.camera_matrices.
+        """
+        return orbit_matrices(self.target, self.distance, azimuth, elevation, rotation, self.width / self.height)
+
+    def draw(self, model, view, projection, smooth=True):
+        """
+        Малює кадр у поточний FBO із заданими матрицями (без читання пікселів).
+        """
+        glClearColor(*self.background)
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        light = light_vector(*self.light)
+        program = self.shader_program
+        if program is not None:
+            program.use()
+            set_scene_uniforms(program, model, view, projection, light, flat=not smooth,
+                               quantization=self.quantization)
+            self.buffers.draw_elements("vertices", "normals", "indices", attributes=(POSITION_ATTRIB, NORMAL_ATTRIB))
+            program.stop()
+            return
+        # Fixed-function: матриці рядкові, OpenGL чекає стовпцеві
+        glShadeModel(GL_SMOOTH if smooth else GL_FLAT)
+        glMatrixMode(GL_PROJECTION)
+        glLoadMatrixf(np.ascontiguousarray(projection.T))
+        glMatrixMode(GL_MODELVIEW)
+        glLoadMatrixf(np.ascontiguousarray(view.T))
+        setup_light(light)
+        glMultMatrixf(np.ascontiguousarray(model.T))
+        self.buffers.draw_elements("vertices", "normals", "indices")
+
+    def render_view(self, model, view, projection, smooth=True):
+        """
+        Кадр із заданими матрицями: масив (height, width, 4) uint8.
+        """
+        self.draw(model, view, projection, smooth=smooth)
+        return self.context.read_pixels()
+
+    def render(self, azimuth=DEFAULT_AZIMUTH, elevation=DEFAULT_ELEVATION, rotation=0.0, smooth=True):
+        """
+        Кадр моделі: масив (height, width, 4) uint8.
+        """
+        return self.render_view(*self.camera_matrices(azimuth, elevation, rotation), smooth=smooth)
+
+    def release(self):
+        self.buffers.release()
+        if self.shader_program is not None:
+            self.shader_program.release()
+            self.shader_program = None
+        self.context.release()
+
+
+def create_renderer(width=512, height=512, background=DEFAULT_BACKGROUND, software=False):
+    """
+    Рендерер без вікна: OffscreenRenderer, а якщо GL-контекст створити не вдалося
+    (або software=True) — програмний SoftwareRenderer з тим самим інтерфейсом.
+    """
+    if not software:
+        try:
+            return OffscreenRenderer(width, height, background=background)
+        except OffscreenError as e:
+            print(f"[DEBUG] {e}; програмний рендер")
+    return SoftwareRenderer(width, height, background=background)
@@ -1,24 +1,91 @@
-import os
 import math
+import time
 import numpy as np
-from PyQt5.QtWidgets import QOpenGLWidget, QMessageBox
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QOpenGLWidget, QMessageBox, QLabel
+from PyQt5.QtCore import Qt, QCoreApplication, QTimer, pyqtSignal
 from OpenGL.GL import *
 from OpenGL.GLU import *
-from utils.model_loader import load_obj_with_texture, load_ply
+from utils.mesh import Mesh
+from utils.mesh_cache import MeshCache
+from utils.load_pipeline import prepare_render_arrays
+from utils.memory import available_memory
+from utils.normals import flat_arrays_nbytes
+from utils.lod import LOD_MIN_TRIANGLES, select_lod
+from utils.culling import chunk_offsets, frustum_planes, visible_chunks, visible_ranges
+from utils.bvh import TriangleBVH
+from utils.edges import FEATURE_ANGLE, feature_edges
+from utils.instrumentation import instruments
+from widgets.model_load_worker import ModelLoadWorker, FlatArraysWorker, LodBuildWorker
+from widgets.gl_buffers import MeshBuffers, Framebuffer
+from widgets.gl_shaders import ShaderProgram, ShaderError, POSITION_ATTRIB, NORMAL_ATTRIB
+from widgets.gl_timer import GpuTimer
+from utils.transforms import orbit_position, orbit_matrices, light_vector, frame_bbox
+from utils.lighting import MATERIAL_DIFFUSE, MATERIAL_AMBIENT, LIGHT_AMBIENT, ambient_color
+from utils.software_rasterizer import rasterize
+
+# Як часто (с) оновлюється оверлей зі статистикою кадрів
+OVERLAY_INTERVAL = 0.5
+
+
+def setup_materials():
+    """
+    Встановлює матеріали для fixed-function рендеру (diffuse/ambient).
+    """
+    glMaterialfv(GL_FRONT_AND_BACK, GL_DIFFUSE, [*MATERIAL_DIFFUSE, 1.0])
+    glMaterialfv(GL_FRONT_AND_BACK, GL_AMBIENT, [*MATERIAL_AMBIENT, 1.0])
+    glMaterialfv(GL_FRONT_AND_BACK, GL_SPECULAR, [0.0, 0.0, 0.0, 1.0])
+    glMaterialf(GL_FRONT_AND_BACK, GL_SHININESS, 1)
+
+
+def setup_light(direction):
+    """
+    Напрямок і колір світла GL_LIGHT0 (fixed-function).
+    """
+    glLightfv(GL_LIGHT0, GL_POSITION, [*direction, 0.0])
+    glLightfv(GL_LIGHT0, GL_DIFFUSE, [1.0, 1.0, 1.0, 1.0])
+    glLightfv(GL_LIGHT0, GL_AMBIENT, [*LIGHT_AMBIENT, 1.0])
+    glLightfv(GL_LIGHT0, GL_SPECULAR, [0.0, 0.0, 0.0, 1.0])
+
+
+def set_scene_uniforms(program, model, view, projection, light_dir, flat=False, quantization=None):
+    """
+    Матриці, світло й матеріал шейдерної програми — те саме освітлення, що у fixed-function.
+    quantization — (offset, scale, oct_normals) для квантованих буферів (.qmesh), інакше float-буфери.
+    """
+    offset, scale, oct_normals = quantization or ((0.0, 0.0, 0.0), (1.0, 1.0, 1.0), False)
+    program.set_matrix("modelMatrix", model)
+    program.set_matrix("viewMatrix", view)
+    program.set_matrix("projectionMatrix", projection)
+    program.set_vec3("lightDir", light_dir)
+    program.set_vec3("diffuseColor", MATERIAL_DIFFUSE)
+    program.set_vec3("ambientColor", ambient_color())
+    program.set_int("flatShading", flat)
+    program.set_vec3("positionOffset", offset)
+    program.set_vec3("positionScale", scale)
+    program.set_int("octNormals", oct_normals)
 
 class SimpleGLWidget(QOpenGLWidget):
     """
     OpenGL-віджет для відображення, обертання і управління 3D-моделлю.
     """
 
+    # Сигнали фонового завантаження моделі
+    load_started = pyqtSignal(str)          # шлях
+    load_progress = pyqtSignal(str, float)  # етап (utils.load_pipeline.LOAD_STAGES), частка 0..1
+    load_finished = pyqtSignal(str)         # шлях
+    load_cancelled = pyqtSignal(str)        # шлях
+    load_failed = pyqtSignal(str, str)      # шлях, текст помилки
+
     def __init__(self, info_label):
         super().__init__()
-        # Модель: кортеж (vertices, faces)
-        self.model = ([], [])
+        # Модель: Mesh (масиви вершин та CSR-грані)
+        self.model = Mesh.empty()
         self.texture_id = None             # ID текстури (зарезервовано)
         self.wireframe = False             # Режим "каркас/заливка"
+        self.feature_edges_only = False    # Каркас лише з граничних ребер і ребер-зламів
+        self.feature_angle = FEATURE_ANGLE # Поріг двогранного кута для ребер-зламів, градуси
         self.smooth_shading = True         # Гладкий чи плоский шейдинг
+        self.normal_weighting = "area"     # Зважування гладких нормалей: uniform/area/angle
         self.background_color = (0.93, 1, 0.93, 1.0)  # Початковий фон
         self.target = [0.0, 0.0, 0.0]      # Центр орбіти камери
         self.distance = 5.0                # Відстань від моделі (масштаб)
@@ -31,24 +98,90 @@ class SimpleGLWidget(QOpenGLWidget):
         self.last_x = 0                    # Остання позиція миші (X)
         self.last_y = 0                    # Остання позиція миші (Y)
         self.info_label = info_label       # Qlabel для інфи про модель
+        self.mesh_cache = MeshCache()      # Дисковий кеш оброблених моделей (None — вимкнено)
+        self.parse_workers = 1             # Процесів розбору OBJ (None — усі ядра для файлів від 64 МБ)
+        self._load_worker = None           # Поточний потік завантаження
+        self._workers = set()              # Усі ще запущені потоки (включно зі скасованими)
         self.model_rotation_y = 0.0        # Кут автоповороту навколо Y
 
         # Геометричні масиви для рендера
         self._vertex_array = None
         self._normal_array = None
-        self._tri_index_array = None
-        self._quad_index_array = None
-        # Для плоского шейдингу (flat)
-        self._flat_tri_vertex_array = None
-        self._flat_tri_normal_array = None
-        self._flat_quad_vertex_array = None
-        self._flat_quad_normal_array = None
+        self._index_array = None          # Єдиний потік індексів трикутників (uint16/uint32)
+        self._chunk_bounds = None         # AABB фрагментів потоку індексів (C, 2, 3)
+        self._chunk_offsets = None        # Межі фрагментів у трикутниках (C + 1)
+        self.frustum_culling = True       # Відсікання фрагментів пірамідою видимості
+        self._edge_array = None           # Унікальні ребра (потік індексів GL_LINES)
+        self._edge_angles = None          # Двогранний кут при кожному ребрі
+        self._edges_dirty = False         # Буфер ребер треба передати заново (режим/поріг)
+        self._triangle_faces = None       # Грань для кожного трикутника потоку індексів
+        self._quantized = None            # Квантовані позиції/нормалі .qmesh (для шейдерного шляху)
+        self._vertex_quantization = None  # (offset, scale, oct) квантованих буферів у GPU
+        self._bvh = None                  # BVH для вибору точки на моделі
+        self.hover_picking = False        # Вибір під курсором без кліку
+        self.pick_result = None           # Остання вибрана точка (див. pick)
+        self._press_x = self._press_y = 0
+        # Статистика останнього кадру (для інструментування)
+        self.render_stats = {"chunks_visible": 0, "chunks_total": 0,
+                             "triangles_visible": 0, "triangles_total": 0}
+        # Для плоского шейдингу (flat) у fixed-function шляху: будуються на вимогу
+        self._flat_vertex_array = None
+        self._flat_normal_array = None
+        self._flat_worker = None
+        self._flat_refused = False                 # Побудову відхилено через нестачу пам'яті
+        self.flat_release_timeout = 60.0           # с простою в smooth до звільнення (None — ніколи)
+        self.flat_memory_reserve = 512 * 1024 ** 2 # мінімум вільної пам'яті, нижче — звільняємо
+        self._flat_release_timer = QTimer(self)
+        self._flat_release_timer.setSingleShot(True)
+        self._flat_release_timer.timeout.connect(self.release_flat_arrays)
+        self._memory_timer = QTimer(self)
+        self._memory_timer.setInterval(5000)
+        self._memory_timer.timeout.connect(self.check_memory_pressure)
+        # GPU-буфери (VBO/IBO): заповнюються один раз на модель/режим шейдингу
+        self.gpu_buffers = MeshBuffers()
+        self._buffers_dirty = False
+        # Шейдерний шлях рендера; при помилці компіляції — fixed-function
+        self.use_shaders = True
+        self.shader_program = None
+        self._aspect = 1.0
+        # Рендер у FBO із заданими матрицями (знімки високої роздільності)
+        self._capture_framebuffer = None
+        self._view_override = None
+
+        # Рівні деталізації (LOD): грубші рівні під час взаємодії з камерою
+        self.lod_enabled = True
+        self.lod_levels = []               # LodLevel від детального до грубого (без повної моделі)
+        self.target_frame_time = 1 / 30    # Бажаний час кадру під час взаємодії, с
+        self.current_lod = 0               # 0 — повна модель, i — lod_levels[i - 1]
+        self._lod_budget = None            # Поточний бюджет трикутників на кадр
+        self._lod_worker = None
+        self._lod_dirty = False
+        self._triangles_per_second = None  # Оцінка пропускної здатності рендера
+        self._interacting = False
+        self._interaction_timer = QTimer(self)
+        self._interaction_timer.setSingleShot(True)
+        self._interaction_timer.setInterval(250)
+        self._interaction_timer.timeout.connect(self.end_interaction)
+
+        # Інструментування: GPU-таймер кадру та оверлей зі статистикою (F3)
+        self.gpu_timer = None
+        self.show_overlay = False
+        self._overlay = QLabel(self)
+        self._overlay.setStyleSheet("background: rgba(0, 0, 0, 150); color: white; padding: 4px;"
+                                    " font-family: monospace;")
+        self._overlay.move(8, 8)
+        self._overlay.hide()
+        self._overlay_updated = 0.0
 
         self.view_mode = 0                 # 0 — перспектива, 1 — top, 2 — bottom, 3 — side
 
         self.setFocusPolicy(Qt.StrongFocus)
         self.setMouseTracking(True)
 
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown_loading)
+
     def set_background_color(self, r, g, b, a=1.0):
         """
         Встановлює колір фону для сцени.
@@ -58,128 +191,410 @@ class SimpleGLWidget(QOpenGLWidget):
 
     def load_model(self, path):
         """
-        Завантажує модель з файлу (OBJ/PLY) і готує масиви вершин/граней.
+        Запускає фонове завантаження моделі (OBJ/PLY/STL): розбір і нормалі — у потоці,
+        GUI не блокується. Незавершене попереднє завантаження скасовується.
         """
-        ext = os.path.splitext(path)[1].lower()
-        try:
-            if ext == ".obj":
-                self.model, _ = load_obj_with_texture(path)
-            elif ext == ".ply":
-                self.model = load_ply(path)
-            else:
-                raise ValueError("Непідтримуваний формат файлу.")
-            self.reset_view_to_model()     # Камера — на центр моделі
-            self.prepare_arrays()          # Готуємо масиви для OpenGL
-            self.update_info()
-            self.update()
-        except Exception as e:
-            QMessageBox.critical(self, "Помилка моделі", str(e))
+        self.cancel_loading()
+        worker = ModelLoadWorker(path, self.normal_weighting, self.mesh_cache, self, workers=self.parse_workers)
+        worker.progress.connect(lambda stage, fraction, w=worker: self._on_load_progress(w, stage, fraction))
+        worker.loaded.connect(lambda path, mesh, arrays, w=worker: self._on_model_loaded(w, path, mesh, arrays))
+        worker.failed.connect(lambda path, message, w=worker: self._on_load_failed(w, path, message))
+        worker.finished.connect(lambda w=worker: self._on_worker_finished(w))
+        self._load_worker = worker
+        self._workers.add(worker)
+        self.load_started.emit(path)
+        worker.start()
+
+    def cancel_loading(self):
+        """
+        Скасовує поточне фонове завантаження (якщо воно є).
+        Результат скасованого потоку буде проігноровано.
+        """
+        worker = self._load_worker
+        if worker is None:
+            return
+        self._load_worker = None
+        worker.cancel()
+        self.load_cancelled.emit(worker.path)
+
+    def is_loading(self):
+        return self._load_worker is not None
+
+    def shutdown_loading(self):
+        """
+        Зупиняє всі потоки завантаження (при виході з програми).
+        """
+        self.cancel_loading()
+        for worker in list(self._workers):
+            worker.cancel()
+            worker.wait()
+        if self._flat_worker is not None:
+            self._flat_worker.wait()
+        if self._lod_worker is not None:
+            self._lod_worker.cancel()
+            self._lod_worker.wait()
+        instruments.flush()
+
+    def _on_load_progress(self, worker, stage, fraction):
+        if worker is self._load_worker:
+            self.load_progress.emit(stage, fraction)
+
+    def _on_model_loaded(self, worker, path, mesh, arrays):
+        if worker is not self._load_worker:
+            return
+        self._load_worker = None
+        self.apply_loaded_model(mesh, arrays)
+        self.load_finished.emit(path)
+
+    def _on_load_failed(self, worker, path, message):
+        if worker is not self._load_worker:
+            return
+        self._load_worker = None
+        self.load_failed.emit(path, message)
+        QMessageBox.critical(self, "Помилка моделі", message)
+
+    def _on_worker_finished(self, worker):
+        self._workers.discard(worker)
+        worker.deleteLater()
+
+    def apply_loaded_model(self, mesh, arrays=None):
+        """
+        Атомарно підміняє модель уже підготовленими масивами (у GUI-потоці).
+        """
+        self.load_progress.emit("upload", 0.0)
+        self.model = mesh
+        self.reset_view_to_model()     # Камера — на центр моделі
+        with instruments.timer("load.prepare_arrays"):
+            self.prepare_arrays(arrays)    # Масиви для OpenGL (готові — лише призначаються)
+        self._buffers_dirty = True
+        self.start_lod_build()
+        if self.isValid():
+            # Передача на GPU одразу; без контексту — при першому paintGL
+            self.makeCurrent()
+            self.upload_buffers()
+            self.doneCurrent()
+        instruments.log("model", vertices=mesh.vertex_count, faces=mesh.face_count)
+        self.update_info()
+        self.update()
+        self.load_progress.emit("upload", 1.0)
+
+    def upload_buffers(self):
+        """
+        Передає масиви поточної моделі у GPU-буфери (потрібен активний GL-контекст).
+        Буфери попередньої моделі звільняються; потоки плоского шейдингу
+        передаються лише для fixed-function шляху і лише коли цей режим увімкнено
+        (шейдер рахує плоскі нормалі сам).
+        """
+        buffers = self.gpu_buffers
+        if self._buffers_dirty:
+            with instruments.timer("gl.upload"):
+                buffers.release()
+                self._vertex_quantization = None
+                if self.shader_program is not None and self._quantized is not None:
+                    # Квантовані дані .qmesh ідуть на GPU як є, розпаковує вершинний шейдер
+                    positions, normals, (offset, scale) = self._quantized
+                    buffers.upload("vertices", positions)
+                    buffers.upload("normals", self._normal_array if normals is None else normals)
+                    self._vertex_quantization = (offset, scale, normals is not None)
+                else:
+                    buffers.upload("vertices", self._vertex_array)
+                    buffers.upload("normals", self._normal_array)
+                buffers.upload_indices("indices", self._index_array)
+            instruments.count("gl.upload_bytes", buffers.nbytes)
+            self._buffers_dirty = False
+            self._edges_dirty = True
+        if self._edges_dirty:
+            buffers.upload_indices("edges", self.wireframe_edges())
+            self._edges_dirty = False
+        if self._lod_dirty:
+            for level, lod in enumerate(self.lod_levels, start=1):
+                buffers.upload(f"lod{level}_vertices", lod.positions)
+                buffers.upload(f"lod{level}_normals", lod.normals)
+                buffers.upload_indices(f"lod{level}_indices", lod.indices)
+            self._lod_dirty = False
+        if self.shader_program is not None or self.smooth_shading:
+            return
+        if not buffers.has("flat_vertices"):
+            buffers.upload("flat_vertices", self._flat_vertex_array)
+            buffers.upload("flat_normals", self._flat_normal_array)
+
+    def release_gl_resources(self):
+        """
+        Звільняє GPU-буфери та шейдерну програму (при знищенні GL-контексту).
+        """
+        self.makeCurrent()
+        self.gpu_buffers.release()
+        self._buffers_dirty = True
+        if self.gpu_timer is not None:
+            self.gpu_timer.release()
+            self.gpu_timer = None
+        if self.shader_program is not None:
+            self.shader_program.release()
+            self.shader_program = None
+        if self._capture_framebuffer is not None:
+            self._capture_framebuffer.release()
+            self._capture_framebuffer = None
+        self.doneCurrent()
 
-    def prepare_arrays(self):
+    def prepare_arrays(self, render_arrays=None):
         """
         Формує numpy-масиви для швидкого рендера (vertex, normal, indices).
-        Окремо для гладких (smooth) і плоских (flat) нормалей.
+        render_arrays — готові масиви (з фонового потоку або кешу); відсутні обчислюються.
+        Потоки плоского шейдингу тут не будуються — див. ensure_flat_arrays.
         """
-        vertices, faces = self.model
-        if not vertices or not faces:
+        mesh = self.model
+        self._flat_refused = False
+        self._set_flat_arrays(render_arrays if render_arrays and "flat_vertices" in render_arrays else None)
+        if mesh.is_empty():
             # Очищення, якщо модель пуста
             self._vertex_array = None
             self._normal_array = None
-            self._tri_index_array = None
-            self._quad_index_array = None
-            self._flat_tri_vertex_array = None
-            self._flat_tri_normal_array = None
-            self._flat_quad_vertex_array = None
-            self._flat_quad_normal_array = None
+            self._index_array = None
+            self._chunk_bounds = None
+            self._chunk_offsets = None
+            self._edge_array = None
+            self._edge_angles = None
+            self._triangle_faces = None
+            self._quantized = None
+            self._bvh = None
+            self.pick_result = None
             return
 
-        self._vertex_array = np.array(vertices, dtype=np.float32)
-        triangles = []
-        quads = []
-        for f in faces:
-            if len(f) == 3:
-                triangles.append(f)
-            elif len(f) == 4:
-                quads.append(f)
-            elif len(f) > 4:
-                # Тріангуляція багатокутників (fan)
-                for i in range(1, len(f)-1):
-                    triangles.append([f[0], f[i], f[i+1]])
-        self._tri_index_array = np.array(triangles, dtype=np.uint32).flatten() if triangles else None
-        self._quad_index_array = np.array(quads, dtype=np.uint32).flatten() if quads else None
-
-        # Гладкі нормалі — сума нормалей по кожній вершині
-        vertex_normals = [np.zeros(3, dtype=np.float32) for _ in vertices]
-        for f in faces:
-            verts = [np.array(vertices[i]) for i in f]
-            if len(verts) < 3: continue
-            v1 = verts[1] - verts[0]
-            v2 = verts[2] - verts[0]
-            n = np.cross(v1, v2)
-            n = n / (np.linalg.norm(n) if np.linalg.norm(n) > 0 else 1)
-            for idx in f:
-                vertex_normals[idx] += n
-        vertex_normals = [n / (np.linalg.norm(n) if np.linalg.norm(n) > 0 else 1) for n in vertex_normals]
-        self._normal_array = np.array(vertex_normals, dtype=np.float32)
-
-        # Flat shading — дублювання вершин для трикутників/чотирикутників
-        flat_tri_vertices = []
-        flat_tri_normals = []
-        flat_quad_vertices = []
-        flat_quad_normals = []
-        for f in faces:
-            verts = [np.array(vertices[i]) for i in f]
-            if len(f) == 3:
-                v1 = verts[1] - verts[0]
-                v2 = verts[2] - verts[0]
-                n = np.cross(v1, v2)
-                n = n / (np.linalg.norm(n) if np.linalg.norm(n) > 0 else 1)
-                for i in range(3):
-                    flat_tri_vertices.append(vertices[f[i]])
-                    flat_tri_normals.append(n)
-            elif len(f) == 4:
-                v1 = verts[1] - verts[0]
-                v2 = verts[2] - verts[0]
-                n = np.cross(v1, v2)
-                n = n / (np.linalg.norm(n) if np.linalg.norm(n) > 0 else 1)
-                for i in range(4):
-                    flat_quad_vertices.append(vertices[f[i]])
-                    flat_quad_normals.append(n)
-            elif len(f) > 4:
-                # Багатокутники (fan)
-                for i in range(1, len(f)-1):
-                    tri = [f[0], f[i], f[i+1]]
-                    tri_verts = [np.array(vertices[idx]) for idx in tri]
-                    v1 = tri_verts[1] - tri_verts[0]
-                    v2 = tri_verts[2] - tri_verts[0]
-                    n = np.cross(v1, v2)
-                    n = n / (np.linalg.norm(n) if np.linalg.norm(n) > 0 else 1)
-                    for idx in tri:
-                        flat_tri_vertices.append(vertices[idx])
-                        flat_tri_normals.append(n)
-        self._flat_tri_vertex_array = np.array(flat_tri_vertices, dtype=np.float32) if flat_tri_vertices else None
-        self._flat_tri_normal_array = np.array(flat_tri_normals, dtype=np.float32) if flat_tri_normals else None
-        self._flat_quad_vertex_array = np.array(flat_quad_vertices, dtype=np.float32) if flat_quad_vertices else None
-        self._flat_quad_normal_array = np.array(flat_quad_normals, dtype=np.float32) if flat_quad_normals else None
+        arrays = prepare_render_arrays(mesh, self.normal_weighting, render_arrays)
+        self._vertex_array = np.ascontiguousarray(mesh.positions)
+        # Гладкі нормалі та трикутники (усі грані тріангульовані, порядок — під кеш вершин)
+        self._normal_array = arrays["vertex_normals"]
+        self._index_array = arrays["indices"]
+        self._chunk_bounds = arrays.get("chunk_bounds")
+        self._chunk_offsets = None
+        if self._chunk_bounds is not None and self._index_array is not None:
+            self._chunk_offsets = chunk_offsets(len(self._index_array) // 3)
+        self._edge_array = arrays.get("edges")
+        self._edge_angles = arrays.get("edge_angles")
+        self._triangle_faces = arrays.get("triangle_faces")
+        quantized = arrays.get("quantized_positions")
+        self._quantized = None
+        if quantized is not None:
+            self._quantized = (quantized, arrays.get("quantized_normals"), arrays["position_quantization"])
+        self._bvh = None
+        if self._index_array is not None:
+            self._bvh = TriangleBVH(self._vertex_array, self._index_array, arrays.get("bvh_bounds"))
+        self.pick_result = None
+
+    def render_arrays(self):
+        """
+        Масиви рендера поточної моделі: гладкі нормалі й оптимізований потік трикутників
+        (напр. для експорту .qmesh).
+        """
+        return {"vertex_normals": self._normal_array, "indices": self._index_array,
+                "triangle_faces": self._triangle_faces}
+
+    def _set_flat_arrays(self, arrays=None):
+        """
+        Призначає (або при arrays=None скидає) потоки плоского шейдингу.
+        """
+        arrays = arrays or {}
+        self._flat_vertex_array = arrays.get("flat_vertices")
+        self._flat_normal_array = arrays.get("flat_normals")
+        if arrays:
+            self._memory_timer.start()
+        else:
+            self._memory_timer.stop()
+            self._flat_release_timer.stop()
+
+    def has_flat_arrays(self):
+        return self._flat_vertex_array is not None
+
+    def ensure_flat_arrays(self):
+        """
+        Запускає фонову побудову потоків плоского шейдингу (потрібні лише fixed-function
+        шляху: шейдер рахує плоскі нормалі сам). Поки вони будуються,
+        плоский режим малюється з гладких буферів через glShadeModel(GL_FLAT).
+        Відмова через нестачу пам'яті запам'ятовується до зміни моделі
+        або до перевірки пам'яті таймером (check_memory_pressure).
+        """
+        if (self.has_flat_arrays() or self._flat_worker is not None or self._flat_refused
+                or self.model.is_empty()):
+            return
+        if not self._flat_memory_available():
+            instruments.log("flat_arrays_refused", bytes=flat_arrays_nbytes(self.model.face_offsets))
+            self._flat_refused = True
+            self._memory_timer.start()
+            self.update_info()
+            return
+        worker = FlatArraysWorker(self.model, self)
+        worker.built.connect(self._on_flat_arrays_built)
+        worker.finished.connect(lambda w=worker: self._on_flat_worker_finished(w))
+        self._flat_worker = worker
+        worker.start()
+
+    def _flat_memory_available(self):
+        """
+        Чи лишиться після побудови flat-масивів щонайменше flat_memory_reserve вільної пам'яті.
+        """
+        available = available_memory()
+        return available is None or available - flat_arrays_nbytes(self.model.face_offsets) >= self.flat_memory_reserve
+
+    def _on_flat_arrays_built(self, mesh, arrays):
+        if mesh is not self.model:
+            return
+        self._set_flat_arrays(arrays)
+        self.update()
+
+    def _on_flat_worker_finished(self, worker):
+        if worker is self._flat_worker:
+            self._flat_worker = None
+        worker.deleteLater()
+
+    def release_flat_arrays(self):
+        """
+        Звільняє потоки плоского шейдингу (CPU та GPU), якщо вони зараз не відображаються.
+        """
+        if not self.has_flat_arrays() or (not self.smooth_shading and self.shader_program is None):
+            return
+        self._set_flat_arrays(None)
+        if self.isValid():
+            self.makeCurrent()
+            self.gpu_buffers.release("flat_vertices")
+            self.gpu_buffers.release("flat_normals")
+            self.doneCurrent()
+        instruments.log("flat_arrays_released")
+
+    def check_memory_pressure(self):
+        """
+        Періодична перевірка: при нестачі вільної пам'яті звільняє невикористані flat-масиви;
+        після відмови в побудові — знімає її, щойно пам'яті знову досить.
+        """
+        if self._flat_refused:
+            if self._flat_memory_available():
+                self._flat_refused = False
+                self._memory_timer.stop()
+                self.update_info()
+                self.update()
+            return
+        available = available_memory()
+        if available is not None and available < self.flat_memory_reserve:
+            self.release_flat_arrays()
+
+    # --- Рівні деталізації (LOD) ---
+    def start_lod_build(self):
+        """
+        Скидає піраміду LOD попередньої моделі і запускає фонову побудову нової
+        (лише для великих моделей).
+        """
+        if self._lod_worker is not None:
+            self._lod_worker.cancel()
+            self._lod_worker = None
+        self.lod_levels = []
+        self.current_lod = 0
+        self._lod_budget = None
+        self._triangles_per_second = None
+        if not self.lod_enabled or self._index_array is None or len(self._index_array) // 3 < LOD_MIN_TRIANGLES:
+            return
+        worker = LodBuildWorker(self.model, self._normal_array, self._index_array, self)
+        worker.built.connect(self._on_lod_built)
+        worker.finished.connect(lambda w=worker: self._on_lod_worker_finished(w))
+        self._lod_worker = worker
+        worker.start()
+
+    def _on_lod_built(self, mesh, levels):
+        if mesh is not self.model:
+            return
+        self.lod_levels = levels
+        self._lod_dirty = True
+        instruments.log("lod", levels=[lod.triangle_count for lod in levels])
+        self.update_info()
+        self.update()
+
+    def _on_lod_worker_finished(self, worker):
+        if worker is self._lod_worker:
+            self._lod_worker = None
+        worker.deleteLater()
+
+    def lod_triangle_counts(self):
+        """
+        Кількість трикутників на кожному рівні, починаючи з повної моделі.
+        """
+        full = 0 if self._index_array is None else len(self._index_array) // 3
+        return [full] + [lod.triangle_count for lod in self.lod_levels]
+
+    def begin_interaction(self):
+        """
+        Камера або модель рухається: до паузи малюємо грубший рівень LOD.
+        """
+        self._interacting = True
+        self._interaction_timer.start()
+
+    def end_interaction(self):
+        """
+        Взаємодія завершилась — перемальовуємо у повній деталізації.
+        """
+        self._interacting = False
+        self.update()
+
+    def choose_lod(self):
+        """
+        Рівень для кадру: під час взаємодії — найдетальніший, що вкладається у бюджет
+        трикутників (пропускна здатність * target_frame_time); інакше — повна модель.
+        """
+        if not self._interacting or not self.lod_levels or self._triangles_per_second is None:
+            return 0
+        self._lod_budget = int(self._triangles_per_second * self.target_frame_time)
+        return select_lod(self.lod_triangle_counts(), self._lod_budget)
+
+    def _lod_buffer_names(self, level):
+        if level == 0:
+            return "vertices", "normals", "indices"
+        return f"lod{level}_vertices", f"lod{level}_normals", f"lod{level}_indices"
+
+    def wireframe_edges(self):
+        """
+        Потік індексів ребер для каркаса: усі унікальні ребра або, у режимі
+        feature_edges_only, лише граничні та ребра-злами (кут >= feature_angle).
+        """
+        if self._edge_array is None or not self.feature_edges_only or self._edge_angles is None:
+            return self._edge_array
+        return feature_edges(self._edge_array, self._edge_angles, self.feature_angle)
+
+    def set_feature_edges(self, enabled, angle=None):
+        """
+        Перемикає каркас між усіма ребрами та ребрами-зламами (і змінює поріг кута).
+        """
+        self.feature_edges_only = enabled
+        if angle is not None:
+            self.feature_angle = angle
+        self._edges_dirty = True
+        self.update()
 
     def update_info(self):
         """
-        Оновлює інформаційний напис про модель (кількість вершин/граней).
+        Оновлює інформаційний напис про модель (кількість вершин/граней, рівень LOD).
         """
-        vertices, faces = self.model
-        self.info_label.setText(f"Вершин: {len(vertices)} | Граней: {len(faces)}")
+        text = f"Вершин: {self.model.vertex_count} | Граней: {self.model.face_count}"
+        if self.lod_levels:
+            counts = self.lod_triangle_counts()
+            text += f" | LOD: {self.current_lod}/{len(self.lod_levels)} ({counts[self.current_lod]} трикутників"
+            if self._lod_budget is not None:
+                text += f", бюджет {self._lod_budget}"
+            text += ")"
+        if self._flat_refused:
+            text += " | Плоский шейдинг: недостатньо пам'яті"
+        hit = self.pick_result
+        if hit is not None:
+            x, y, z = hit["position"]
+            w0, w1, w2 = hit["barycentric"]
+            text += (f" | Грань {hit['face']}: ({x:.4f}, {y:.4f}, {z:.4f}),"
+                     f" бар. ({w0:.2f}, {w1:.2f}, {w2:.2f}), вершина {hit['vertex']}")
+        self.info_label.setText(text)
 
     def reset_view_to_model(self):
         """
         Автоматично налаштовує положення та масштаб камери по bounding box моделі.
         """
-        vertices, _ = self.model
-        if not vertices:
+        bbox = self.model.bbox()
+        if bbox is None:
             return
-        xs, ys, zs = zip(*vertices)
-        self.target = [(min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2, (min(zs) + max(zs)) / 2]
-        size = max(max(xs) - min(xs), max(ys) - min(ys), max(zs) - min(zs))
-        self.distance = size * 1.5 if size > 0 else 5.0
+        self.target, self.distance = frame_bbox(bbox)
 
     # --- OpenGL life-cycle ---
     def initializeGL(self):
@@ -192,78 +607,309 @@ class SimpleGLWidget(QOpenGLWidget):
         glEnable(GL_LIGHT0)
         glEnable(GL_NORMALIZE)
         glShadeModel(GL_SMOOTH if self.smooth_shading else GL_FLAT)
-        self.setup_materials()
-
-    def setup_materials(self):
-        """
-        Встановлює матеріали для рендеру (diffuse/ambient).
-        """
-        diffuse = [0.82, 0.82, 0.82, 1.0]
-        ambient = [0.32, 0.32, 0.32, 1.0]
-        glMaterialfv(GL_FRONT_AND_BACK, GL_DIFFUSE, diffuse)
-        glMaterialfv(GL_FRONT_AND_BACK, GL_AMBIENT, ambient)
-        glMaterialfv(GL_FRONT_AND_BACK, GL_SPECULAR, [0.0, 0.0, 0.0, 1.0])
-        glMaterialf(GL_FRONT_AND_BACK, GL_SHININESS, 1)
+        setup_materials()
+        self._buffers_dirty = True
+        self.shader_program = None
+        if self.use_shaders:
+            try:
+                self.shader_program = ShaderProgram()
+            except (ShaderError, OSError, GLError) as e:
+                print(f"[DEBUG] Шейдери недоступні, fixed-function рендер: {e}")
+        self.context().aboutToBeDestroyed.connect(self.release_gl_resources)
 
     def resizeGL(self, w, h):
         """
         Зміна розміру вікна — оновлюємо viewport та перспективу.
         """
         glViewport(0, 0, w, h)
+        self._aspect = w / h if h != 0 else 1
         glMatrixMode(GL_PROJECTION)
         glLoadIdentity()
-        gluPerspective(45.0, w / h if h != 0 else 1, 0.1, 1000.0)
+        gluPerspective(45.0, self._aspect, 0.1, 1000.0)
         glMatrixMode(GL_MODELVIEW)
 
     def paintGL(self):
         """
         Основний рендер OpenGL. Відображення моделі, тіней, зміна шейдингу.
         """
+        profiling = instruments.enabled
+        if profiling:
+            frame_start = self.begin_frame_timing()
         self.set_clear_color()
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glLoadIdentity()
-        eye = self.get_camera_position()
-        gluLookAt(*eye, *self.target, 0, 1, 0)
-        self.update_light()
-        glRotatef(self.model_rotation_y, 0, 1, 0)
-        glShadeModel(GL_SMOOTH if self.smooth_shading else GL_FLAT)
+        self.upload_buffers()
+        level = self.choose_lod()
+        if level != self.current_lod:
+            self.current_lod = level
+            self.update_info()
+        start = time.perf_counter()
+        lines = self.draw_model(level)
+        if self._interacting and self.lod_levels and not lines and self.render_stats["triangles_visible"]:
+            # Для вибору LOD потрібен реальний час малювання (чекаємо на GPU);
+            # міряємо лише кадри взаємодії — у спокої LOD не обирається, і конвеєр не зупиняємо
+            glFinish()
+            elapsed = max(time.perf_counter() - start, 1e-6)
+            rate = self.render_stats["triangles_visible"] / elapsed
+            previous = self._triangles_per_second
+            self._triangles_per_second = rate if previous is None else 0.7 * previous + 0.3 * rate
+        if profiling:
+            self.end_frame_timing(frame_start)
 
-        if self.smooth_shading:
-            # Гладкий шейдинг: vertex + normal + indices
-            if self._vertex_array is not None:
-                glEnableClientState(GL_VERTEX_ARRAY)
-                glVertexPointer(3, GL_FLOAT, 0, self._vertex_array)
-                glEnableClientState(GL_NORMAL_ARRAY)
-                glNormalPointer(GL_FLOAT, 0, self._normal_array)
-                glPolygonMode(GL_FRONT_AND_BACK, GL_LINE if self.wireframe else GL_FILL)
-                if self._tri_index_array is not None:
-                    glDrawElements(GL_TRIANGLES, len(self._tri_index_array), GL_UNSIGNED_INT, self._tri_index_array)
-                if self._quad_index_array is not None:
-                    glDrawElements(GL_QUADS, len(self._quad_index_array), GL_UNSIGNED_INT, self._quad_index_array)
-                glDisableClientState(GL_NORMAL_ARRAY)
-                glDisableClientState(GL_VERTEX_ARRAY)
-                glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+    def draw_model(self, level=0):
+        """
+        Малює модель рівня level поточним шляхом (шейдери або fixed-function).
+        Повертає True, якщо каркас малювався лініями з буфера ребер.
+        """
+        # Каркас повної моделі — з буфера унікальних ребер; рівні LOD — через GL_LINE
+        lines = self.wireframe and level == 0 and self.gpu_buffers.has("edges")
+        glPolygonMode(GL_FRONT_AND_BACK, GL_LINE if self.wireframe and not lines else GL_FILL)
+        ranges = None if lines else self.cull_chunks(level)
+        if self.shader_program is not None:
+            self.paint_shaded(level, ranges, lines)
         else:
-            # Плоский шейдинг: дубльовані нормалі для кожного полігону
-            if self._flat_tri_vertex_array is not None:
-                glEnableClientState(GL_VERTEX_ARRAY)
-                glEnableClientState(GL_NORMAL_ARRAY)
-                glVertexPointer(3, GL_FLOAT, 0, self._flat_tri_vertex_array)
-                glNormalPointer(GL_FLOAT, 0, self._flat_tri_normal_array)
-                glPolygonMode(GL_FRONT_AND_BACK, GL_LINE if self.wireframe else GL_FILL)
-                glDrawArrays(GL_TRIANGLES, 0, len(self._flat_tri_vertex_array))
-                glDisableClientState(GL_NORMAL_ARRAY)
-                glDisableClientState(GL_VERTEX_ARRAY)
-            if self._flat_quad_vertex_array is not None:
-                glEnableClientState(GL_VERTEX_ARRAY)
-                glEnableClientState(GL_NORMAL_ARRAY)
-                glVertexPointer(3, GL_FLOAT, 0, self._flat_quad_vertex_array)
-                glNormalPointer(GL_FLOAT, 0, self._flat_quad_normal_array)
-                glPolygonMode(GL_FRONT_AND_BACK, GL_LINE if self.wireframe else GL_FILL)
-                glDrawArrays(GL_QUADS, 0, len(self._flat_quad_vertex_array))
-                glDisableClientState(GL_NORMAL_ARRAY)
-                glDisableClientState(GL_VERTEX_ARRAY)
-            glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+            self.paint_fixed_function(level, ranges, lines)
+        glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        return lines
+
+    # --- Інструментування кадру ---
+    def begin_frame_timing(self):
+        """
+        Початок виміру кадру: позначка для FPS і GPU-запит (якщо підтримується).
+        """
+        instruments.frame()
+        if self.gpu_timer is None:
+            self.gpu_timer = GpuTimer()
+        self.gpu_timer.begin()
+        return time.perf_counter()
+
+    def end_frame_timing(self, frame_start):
+        """
+        Кінець виміру кадру: час CPU, готові GPU-виміри попередніх кадрів, лічильники.
+        """
+        self.gpu_timer.end()
+        instruments.record("frame.cpu", time.perf_counter() - frame_start)
+        for elapsed in self.gpu_timer.collect():
+            instruments.record("frame.gpu", elapsed)
+        instruments.count("frame.triangles", self.render_stats["triangles_visible"])
+        if self.show_overlay and time.perf_counter() - self._overlay_updated >= OVERLAY_INTERVAL:
+            self.update_overlay()
+
+    def update_overlay(self):
+        """
+        Текст оверлею: FPS, перцентилі часу кадру (CPU/GPU), видима геометрія.
+        """
+        self._overlay_updated = time.perf_counter()
+        summary = instruments.summary()
+        fps = summary["fps"]
+        lines = [f"FPS: {fps:.1f}" if fps is not None else "FPS: -"]
+        for name, title in (("frame.cpu", "CPU"), ("frame.gpu", "GPU")):
+            stats = summary["timers"].get(name)
+            if stats and "p50_ms" in stats:
+                lines.append(f"{title}: p50 {stats['p50_ms']:.2f} | p95 {stats['p95_ms']:.2f}"
+                             f" | p99 {stats['p99_ms']:.2f} мс")
+        stats = self.render_stats
+        lines.append(f"Трикутників: {stats['triangles_visible']}/{stats['triangles_total']}"
+                     f" | фрагментів: {stats['chunks_visible']}/{stats['chunks_total']} | LOD: {self.current_lod}")
+        self._overlay.setText("\n".join(lines))
+        self._overlay.adjustSize()
+
+    def toggle_overlay(self):
+        """
+        Показує/ховає оверлей статистики. Поки оверлей видно, інструментування увімкнене
+        (якщо метрики не пишуться у файл, при закритті оверлею воно знову вимикається).
+        """
+        self.show_overlay = not self.show_overlay
+        if self.show_overlay:
+            instruments.enabled = True
+            self._overlay.setText("FPS: -")
+            self._overlay.adjustSize()
+            self._overlay.show()
+        else:
+            if instruments.path is None:
+                instruments.enabled = False
+                instruments.reset()
+            self._overlay.hide()
+        self.update()
+
+    def camera_matrices(self):
+        """
+        Матриці (model, view, projection) поточного стану камери, рядкові float32
+        (під час render_view — задані матриці кадру).
+        """
+        if self._view_override is not None:
+            return self._view_override
+        return orbit_matrices(self.target, self.distance, self.azimuth, self.elevation,
+                              self.model_rotation_y, self._aspect)
+
+    def software_snapshot(self, width=None, height=None):
+        """
+        Знімок поточного вигляду програмним рендером (без GL-контексту):
+        масив (height, width, 4) uint8 з тією ж камерою, світлом і шейдингом.
+        """
+        width = width or max(self.width(), 1)
+        height = height or max(self.height(), 1)
+        matrices = orbit_matrices(self.target, self.distance, self.azimuth, self.elevation,
+                                  self.model_rotation_y, width / height)
+        return self._software_view(*matrices, width, height)
+
+    def _software_view(self, model, view, projection, width, height):
+        if self._index_array is None:
+            return rasterize(np.empty((0, 3)), None, np.empty((0, 3), dtype=np.uint32), model, view, projection,
+                             width, height, self.light_direction(), self.background_color)
+        return rasterize(self._vertex_array, self._normal_array, self._index_array, model, view, projection,
+                         width, height, self.light_direction(), self.background_color, self.smooth_shading)
+
+    def render_view(self, model, view, projection, width, height):
+        """
+        Кадр повної моделі (без LOD) із заданими матрицями у FBO контексту віджета:
+        масив (height, width, 4) uint8, перший рядок — верх. Без GL-контексту —
+        програмним рендером.
+        """
+        if not self.isValid():
+            return self._software_view(model, view, projection, width, height)
+        self.makeCurrent()
+        try:
+            framebuffer = self._capture_framebuffer
+            if framebuffer is None:
+                framebuffer = self._capture_framebuffer = Framebuffer(width, height)
+            elif (framebuffer.width, framebuffer.height) != (width, height):
+                framebuffer.resize(width, height)
+            if not framebuffer.complete:
+                raise RuntimeError(f"Неповний кадровий буфер {width}x{height}")
+            framebuffer.bind()
+            self._view_override = (model, view, projection)
+            self.set_clear_color()
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+            self.upload_buffers()
+            self.draw_model(0)
+            return framebuffer.read_pixels()
+        finally:
+            self._view_override = None
+            glBindFramebuffer(GL_FRAMEBUFFER, self.defaultFramebufferObject())
+            self.resizeGL(self.width(), self.height())
+            self.doneCurrent()
+
+    def pick(self, x, y):
+        """
+        Промінь з камери через точку (x, y) віджета -> перетин з моделлю через BVH.
+        Повертає словник: face (номер грані), triangle, barycentric (відносно вершин
+        трикутника; для n-кутника — його fan-трикутника), position (світові координати),
+        vertex (найближча вершина трикутника) і vertex_position; або None.
+        """
+        if self._bvh is None or self.width() == 0 or self.height() == 0:
+            return None
+        model, view, projection = self.camera_matrices()
+        inverse = np.linalg.inv((projection @ view @ model).astype(np.float64))
+        ndc_x = 2.0 * x / self.width() - 1.0
+        ndc_y = 1.0 - 2.0 * y / self.height()
+        near = inverse @ np.array([ndc_x, ndc_y, -1.0, 1.0])
+        far = inverse @ np.array([ndc_x, ndc_y, 1.0, 1.0])
+        near, far = near[:3] / near[3], far[:3] / far[3]
+        hit = self._bvh.intersect(near, far - near)
+        if hit is None:
+            return None
+        triangle, t, barycentric = hit
+        corners = self._bvh.triangles[triangle]
+        local = near + t * (far - near)
+        vertex = int(corners[int(np.argmax(barycentric))])
+        to_world = lambda p: (model[:3, :3].astype(np.float64) @ p).tolist()
+        return {
+            "face": int(self._triangle_faces[triangle]) if self._triangle_faces is not None else triangle,
+            "triangle": triangle,
+            "barycentric": barycentric,
+            "position": to_world(local),
+            "vertex": vertex,
+            "vertex_position": to_world(self._vertex_array[vertex].astype(np.float64)),
+        }
+
+    def pick_at(self, x, y):
+        """
+        Вибирає точку під курсором і показує її в інформаційному написі.
+        """
+        start = time.perf_counter()
+        self.pick_result = self.pick(x, y)
+        instruments.record("pick", time.perf_counter() - start)
+        self.update_info()
+
+    def cull_chunks(self, level=0):
+        """
+        Відсікає фрагменти повної моделі пірамідою видимості камери.
+        Повертає (starts, counts) видимих діапазонів у трикутниках або None — малювати все
+        (рівні LOD не фрагментуються). Оновлює render_stats.
+        """
+        total = self.lod_triangle_counts()[level]
+        stats = self.render_stats
+        stats["triangles_total"] = total
+        if level > 0 or self._chunk_offsets is None or not self.frustum_culling:
+            chunks = 0 if level > 0 or self._chunk_offsets is None else len(self._chunk_offsets) - 1
+            stats.update(chunks_visible=chunks, chunks_total=chunks, triangles_visible=total)
+            return None
+        model, view, projection = self.camera_matrices()
+        mask = visible_chunks(frustum_planes(projection @ view @ model), self._chunk_bounds)
+        starts, counts = visible_ranges(mask, self._chunk_offsets)
+        stats.update(chunks_visible=int(mask.sum()), chunks_total=len(mask),
+                     triangles_visible=int(counts.sum()))
+        return starts, counts
+
+    def _draw_indexed(self, level, ranges, attributes=None, lines=False):
+        names = self._lod_buffer_names(level)
+        if lines:
+            self.gpu_buffers.draw_elements(names[0], names[1], "edges", GL_LINES, attributes=attributes)
+        elif ranges is None:
+            self.gpu_buffers.draw_elements(*names, attributes=attributes)
+        else:
+            self.gpu_buffers.draw_ranges(*names, *ranges, attributes=attributes)
+
+    def paint_shaded(self, level=0, ranges=None, lines=False):
+        """
+        Програмований шлях: матриці та світло — uniform-змінні шейдера,
+        плоский шейдинг — у фрагментному шейдері через похідні (ті самі буфери).
+        Лінії (lines=True) освітлюються гладкими нормалями: похідні на них вироджені.
+        """
+        program = self.shader_program
+        program.use()
+        set_scene_uniforms(program, *self.camera_matrices(), self.light_direction(),
+                           flat=not self.smooth_shading and not lines,
+                           quantization=self._vertex_quantization if level == 0 else None)
+        self._draw_indexed(level, ranges, (POSITION_ATTRIB, NORMAL_ATTRIB), lines)
+        program.stop()
+
+    def paint_fixed_function(self, level=0, ranges=None, lines=False):
+        """
+        Запасний fixed-function шлях (GL_LIGHTING), якщо шейдери недоступні.
+        Рівні LOD і каркас малюються лише індексовано (плоский режим — через GL_FLAT).
+        """
+        if self._view_override is None:
+            glLoadIdentity()
+            eye = self.get_camera_position()
+            gluLookAt(*eye, *self.target, 0, 1, 0)
+            self.update_light()
+            glRotatef(self.model_rotation_y, 0, 1, 0)
+        else:
+            # Задані матриці кадру: рядкові, OpenGL чекає стовпцеві
+            model, view, projection = self._view_override
+            glMatrixMode(GL_PROJECTION)
+            glLoadMatrixf(np.ascontiguousarray(projection.T))
+            glMatrixMode(GL_MODELVIEW)
+            glLoadMatrixf(np.ascontiguousarray(view.T))
+            self.update_light()
+            glMultMatrixf(np.ascontiguousarray(model.T))
+        glShadeModel(GL_SMOOTH if self.smooth_shading else GL_FLAT)
+        buffers = self.gpu_buffers
+        if lines:
+            self._draw_indexed(level, ranges, lines=True)
+            return
+        if not self.smooth_shading:
+            self.ensure_flat_arrays()
+        if self.smooth_shading or level > 0 or not self.has_flat_arrays():
+            # Гладкий шейдинг: спільні вершини + нормалі, індекси з IBO
+            # (у плоскому режимі — поки flat-масиви ще будуються)
+            self._draw_indexed(level, ranges)
+        else:
+            # Плоский шейдинг: дубльовані нормалі для кожного полігону (без відсікання)
+            buffers.draw_arrays(GL_TRIANGLES, "flat_vertices", "flat_normals")
+            stats = self.render_stats
+            stats.update(chunks_visible=stats["chunks_total"], triangles_visible=stats["triangles_total"])
 
     def set_clear_color(self):
         """
@@ -276,12 +922,7 @@ class SimpleGLWidget(QOpenGLWidget):
         """
         Розраховує позицію камери в залежності від azimuth, elevation та distance.
         """
-        phi = math.radians(self.azimuth)
-        theta = math.radians(self.elevation)
-        x = self.distance * math.cos(theta) * math.sin(phi)
-        y = self.distance * math.sin(theta)
-        z = self.distance * math.cos(theta) * math.cos(phi)
-        return [self.target[0] + x, self.target[1] + y, self.target[2] + z]
+        return orbit_position(self.target, self.distance, self.azimuth, self.elevation)
 
     def compute_face_normal(self, verts):
         """
@@ -298,20 +939,17 @@ class SimpleGLWidget(QOpenGLWidget):
         length = math.sqrt(sum(n * n for n in normal))
         return [n / length for n in normal] if length else [0, 0, 1]
 
+    def light_direction(self):
+        """
+        Напрямок на джерело світла у світових координатах (з азимуту та висоти).
+        """
+        return light_vector(self.light_azimuth, self.light_elevation)
+
     def update_light(self):
         """
         Оновлює напрямок і колір світла у сцені (GL_LIGHT0).
         """
-        az = math.radians(self.light_azimuth)
-        el = math.radians(self.light_elevation)
-        x = math.cos(el) * math.cos(az)
-        y = math.sin(el)
-        z = math.cos(el) * math.sin(az)
-        direction = [x, y, z, 0.0]
-        glLightfv(GL_LIGHT0, GL_POSITION, direction)
-        glLightfv(GL_LIGHT0, GL_DIFFUSE, [1.0, 1.0, 1.0, 1.0])
-        glLightfv(GL_LIGHT0, GL_AMBIENT, [0.23, 0.23, 0.23, 1.0])
-        glLightfv(GL_LIGHT0, GL_SPECULAR, [0.0, 0.0, 0.0, 1.0])
+        setup_light(self.light_direction())
 
     # --- Управління камерою (мишка, колесо, клавіші) ---
     def mousePressEvent(self, event):
@@ -322,6 +960,7 @@ class SimpleGLWidget(QOpenGLWidget):
             self.middle_button_pressed = True
         self.last_x = event.x()
         self.last_y = event.y()
+        self._press_x, self._press_y = event.x(), event.y()
 
     def mouseReleaseEvent(self, event):
         """
@@ -329,6 +968,10 @@ class SimpleGLWidget(QOpenGLWidget):
         """
         if event.button() == Qt.MiddleButton or event.button() == Qt.LeftButton:
             self.middle_button_pressed = False
+        # Клік лівою кнопкою без перетягування — вибір точки на моделі
+        if event.button() == Qt.LeftButton and \
+                abs(event.x() - self._press_x) + abs(event.y() - self._press_y) <= 3:
+            self.pick_at(event.x(), event.y())
 
     def mouseMoveEvent(self, event):
         """
@@ -347,7 +990,10 @@ class SimpleGLWidget(QOpenGLWidget):
                 else:
                     self.elevation += dy * 0.5
                     self.elevation = max(-89, min(89, self.elevation))
+            self.begin_interaction()
             self.update()
+        elif self.hover_picking:
+            self.pick_at(event.x(), event.y())
         self.last_x = event.x()
         self.last_y = event.y()
 
@@ -366,14 +1012,17 @@ class SimpleGLWidget(QOpenGLWidget):
         Зміна масштабу (наближення/віддалення) коліщатком миші.
         """
         self.distance *= 0.9 if event.angleDelta().y() > 0 else 1.1
+        self.begin_interaction()
         self.update()
 
     def keyPressEvent(self, event):
         """
-        Запам'ятовуємо натискання Shift для панорамування.
+        Запам'ятовуємо натискання Shift для панорамування; F3 — оверлей статистики.
         """
         if event.key() == Qt.Key_Shift:
             self.shift_pressed = True
+        elif event.key() == Qt.Key_F3:
+            self.toggle_overlay()
 
     def keyReleaseEvent(self, event):
         """
@@ -393,6 +1042,7 @@ class SimpleGLWidget(QOpenGLWidget):
         Обертає модель навколо осі Y (автовертіння).
         """
         self.model_rotation_y = (self.model_rotation_y + angle) % 360
+        self.begin_interaction()
         self.update()
 
     def set_view_mode(self, mode):
@@ -448,4 +1098,9 @@ class SimpleGLWidget(QOpenGLWidget):
         Перемикає режим шейдингу (гладкий/плоский).
         """
         self.smooth_shading = not self.smooth_shading
+        if self.smooth_shading and self.has_flat_arrays() and self.flat_release_timeout is not None:
+            # Невикористані flat-масиви звільняються після простою
+            self._flat_release_timer.start(int(self.flat_release_timeout * 1000))
+        else:
+            self._flat_release_timer.stop()
         self.update()